@@ -0,0 +1,219 @@
+"""
+Admission control for expensive endpoints.
+Each policy combines a per-user token bucket with a per-route concurrency limit
+that has a bounded wait queue, so overload is answered with a fast 429 instead of
+tying up every worker. Token buckets live in process memory or, with
+RATE_LIMIT_BACKEND=redis, in a Redis-compatible store shared by all workers;
+concurrency slots are always per worker process.
+
+Configuration per policy NAME (assistant, checkout, admin):
+  RATE_LIMIT_<NAME>       "<requests>/<seconds>" bucket size and refill window
+  MAX_CONCURRENCY_<NAME>  requests handled at once per worker
+  MAX_QUEUE_<NAME>        requests allowed to wait for a slot
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import Callable
+
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException, status
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+MAX_TRACKED_BUCKETS = 100_000
+
+if RATE_LIMIT_BACKEND not in ("memory", "redis"):
+    raise Exception("RATE_LIMIT_BACKEND must be memory or redis")
+
+
+def too_many_requests(detail: str, retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class MemoryTokenBuckets:
+    """Token buckets in a dict; only touched from the event loop thread.
+
+    Entries are (tokens, updated, full_after) in least recently used order, so
+    at most max_keys buckets are kept whatever mix of policies fills them.
+    """
+
+    def __init__(self, max_keys: int = MAX_TRACKED_BUCKETS) -> None:
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """Take one token; return 0 when allowed, else seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated, _ = self._buckets.pop(key, (capacity, now, 0.0))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / refill_per_second
+        if len(self._buckets) >= self.max_keys:
+            self._evict(now)
+        self._buckets[key] = (tokens, now, capacity / refill_per_second)
+        return wait
+
+    def _evict(self, now: float) -> None:
+        # Buckets idle long enough to have refilled carry no state worth keeping.
+        for key, (_, updated, full_after) in list(self._buckets.items()):
+            if now - updated >= full_after:
+                del self._buckets[key]
+        # Otherwise drop the least recently used tenth; those users start with a
+        # full bucket again, which only errs towards admitting them.
+        overflow = len(self._buckets) - self.max_keys + 1
+        if overflow > 0:
+            for key in list(islice(self._buckets, max(overflow, self.max_keys // 10))):
+                del self._buckets[key]
+
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * refill)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / refill
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill * 1000))
+return tostring(wait)
+"""
+
+
+class RedisTokenBuckets:
+    """Token buckets shared by all workers, updated atomically by a Lua script."""
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise Exception("RATE_LIMIT_BACKEND=redis requires the redis package") from exc
+        self._script = redis.from_url(url).register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        try:
+            wait = await self._script(
+                keys=[f"ratelimit:{key}"], args=[capacity, refill_per_second]
+            )
+        except Exception:
+            # Fail open: an unavailable limiter store must not take the API down.
+            logger.warning("Rate limit store unavailable, admitting request", exc_info=True)
+            return 0.0
+        return float(wait)
+
+
+class ConcurrencyLimiter:
+    """Semaphore with a bounded number of waiters; excess requests are rejected."""
+
+    def __init__(self, limit: int, max_queue: int, timeout: float) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.waiting = 0
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        elif self.waiting >= self.max_queue:
+            raise too_many_requests("Server busy, try again shortly", self.timeout)
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                raise too_many_requests("Server busy, try again shortly", self.timeout)
+            finally:
+                self.waiting -= 1
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+class AdmissionPolicy:
+    """Rate and concurrency limits for one group of routes."""
+
+    def __init__(self, name: str, rate: str, max_concurrency: int, max_queue: int):
+        env_name = name.upper()
+        requests, seconds = os.getenv(f"RATE_LIMIT_{env_name}", rate).split("/")
+        self.name = name
+        self.capacity = int(requests)
+        self.refill_per_second = int(requests) / float(seconds)
+        self.concurrency = ConcurrencyLimiter(
+            limit=int(os.getenv(f"MAX_CONCURRENCY_{env_name}", max_concurrency)),
+            max_queue=int(os.getenv(f"MAX_QUEUE_{env_name}", max_queue)),
+            timeout=ADMISSION_QUEUE_TIMEOUT,
+        )
+
+
+buckets = (
+    RedisTokenBuckets(REDIS_URL)
+    if RATE_LIMIT_BACKEND == "redis"
+    else MemoryTokenBuckets()
+)
+
+policies = {
+    policy.name: policy
+    for policy in (
+        AdmissionPolicy("assistant", rate="20/60", max_concurrency=8, max_queue=16),
+        AdmissionPolicy("checkout", rate="10/60", max_concurrency=16, max_queue=32),
+        AdmissionPolicy("admin", rate="60/60", max_concurrency=4, max_queue=8),
+    )
+}
+
+
+def principal_key(principal) -> str:
+    """Stable id of a User, extracted token data or raw Auth0 claims."""
+    if isinstance(principal, dict):
+        return str(principal["sub"])
+    return str(getattr(principal, "id", None) or principal.sub)
+
+
+def admission_control(policy_name: str, identity: Callable):
+    """Create a dependency enforcing policy_name for the principal returned by identity.
+
+    Use the same identity dependency as the route so FastAPI resolves it only once.
+    """
+    policy = policies[policy_name]
+
+    async def dependency(principal=Depends(identity)):
+        wait = await buckets.take(
+            f"{policy.name}:{principal_key(principal)}",
+            policy.capacity,
+            policy.refill_per_second,
+        )
+        if wait:
+            raise too_many_requests("Rate limit exceeded", wait)
+        async with policy.concurrency.slot():
+            yield
+
+    return dependency
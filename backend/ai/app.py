@@ -1,4 +1,7 @@
 import os
+import json
+import logging
+import time
 
 from dotenv import load_dotenv
 
@@ -9,64 +12,121 @@ from langsmith import Client
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import ToolMessage
 from langgraph.prebuilt import ToolNode
 
 from backend.ai.prompts import few_shot_examples, system_prompt
-from backend.ai.vectorstore import vectorstore_add_items, vectorstore_search_text
-from backend.ai.tools import tools
+from backend.ai.indexer import INDEX_BATCH_SIZE, index_items, indexer
+from backend.ai.metrics import (
+    finish_turn,
+    metrics_snapshot,
+    record_llm_call,
+    start_turn,
+    timed_node,
+)
+from backend.ai.memory import compact_history, is_summary
+from backend.ai.retrieval import retrieve_context
+from backend.ai.tools import tools, apply_cart_tool_calls, LOCAL_CART_TOOLS
 from backend.ai.models import Search, State, Cart
-from backend.ai.utils import format_cart
+from backend.ai.utils import format_cart, estimate_tokens, fit_to_budget
 from backend.ai.session import (
     get_items,
     get_items_dict,
     get_session_history,
     set_session_history,
 )
+from backend.ai.shared_state import start_sync_thread
+from backend.services.events import subscribe, publish, ITEMS_CHANGED
 
 
 load_dotenv()
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.1)
+logger = logging.getLogger(__name__)
+
+chat_model = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.1)
 LANGSMITH_API_KEY = os.getenv("LANGSMITH_API_KEY")
 
 MAX_CONTEXT_MESSAGES = 8
+# Model calls with tool results per turn before the reply is composed locally.
+MAX_TOOL_ROUNDS = 3
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2000"))
+
+# System prompt and few-shot examples, built and measured once instead of per turn.
+# Not a provider cache prefix: the Gemini client merges every SystemMessage (cart,
+# summary, product info) into the system instruction, and the static part alone
+# (~600 tokens) is below Gemini 2.5 Flash's 1024-token implicit caching minimum.
+STATIC_PREFIX = [SystemMessage(content=system_prompt.strip()), *few_shot_examples]
+STATIC_PREFIX_TOKENS = sum(estimate_tokens(msg.content) for msg in STATIC_PREFIX)
+FEW_SHOT_IDS = frozenset(id(msg) for msg in few_shot_examples)
 
 client = Client(api_key=LANGSMITH_API_KEY)
 
-vectorstore_add_items(get_items())
+
+def build_index(on_progress=None) -> None:
+    """Embed the catalog in batches, reporting (indexed, total) after each batch.
+
+    Later changes are picked up by the background indexer, started at the end.
+    """
+    catalog = get_items()
+    for start in range(0, len(catalog), INDEX_BATCH_SIZE):
+        index_items(catalog[start : start + INDEX_BATCH_SIZE])
+        if on_progress:
+            on_progress(min(start + INDEX_BATCH_SIZE, len(catalog)), len(catalog))
+    indexer.start()
+    start_sync_thread(on_stale=lambda item_ids: publish(ITEMS_CHANGED, item_ids))
+
+
+def indexing_status() -> dict:
+    return indexer.status()
+
+
+def assistant_metrics() -> dict:
+    return metrics_snapshot()
+
+
+# Only queues the ids; the background indexer embeds them off the request path.
+subscribe(ITEMS_CHANGED, indexer.enqueue)
 
 tool_node = ToolNode(tools=tools)
 
-llm = llm.bind_tools(tools=tools)
+# Both runnables are derived once; building them converts the schema and tool
+# specs, which cost ~1.5 ms per turn when done inside the nodes.
+llm = chat_model.bind_tools(tools=tools)
+query_llm = chat_model.with_structured_output(Search)
 
 
+@timed_node
 def analyze_query(state: State) -> State:
-    structured_llm = llm.with_structured_output(Search)
-    query = structured_llm.invoke(state["question"])
+    query = query_llm.invoke(state["question"])
+    # Structured output does not surface usage metadata, so tokens are estimated.
+    record_llm_call(estimate_tokens(state["question"]), estimate_tokens(query))
     state["query"] = query
     return state
 
 
+@timed_node
 def retrieve(state: State) -> State:
     query_text = state["query"].get("query", "")
-    retrieved = vectorstore_search_text(query_text, k=3)
-    state["context"] = retrieved
+    section = state["query"].get("section")
+    state["context"] = retrieve_context(query_text, section=section)
     return state
 
 
+@timed_node
 def generate(state: State) -> State:
-    system_prompt_msg = SystemMessage(content=system_prompt.strip())
     cart_msg = SystemMessage(
         content=format_cart(cart=state.get("cart", []), item_lookup=get_items_dict())
     )
 
     raw_history = state.get("messages", []) or []
+    summary = next((msg for msg in raw_history if is_summary(msg)), None)
+    tool_exchange = pending_tool_exchange(raw_history, state["question"])
+    raw_history = raw_history[: len(raw_history) - len(tool_exchange)]
 
-    few_shot_ids = {id(msg) for msg in few_shot_examples}
     conversation_history = [
         msg
         for msg in raw_history
-        if isinstance(msg, (HumanMessage, AIMessage)) and id(msg) not in few_shot_ids
+        if isinstance(msg, (HumanMessage, AIMessage)) and id(msg) not in FEW_SHOT_IDS
     ]
 
     selected_history = conversation_history[-MAX_CONTEXT_MESSAGES:]
@@ -77,9 +137,19 @@ def generate(state: State) -> State:
     ):
         selected_history = selected_history + [HumanMessage(content=state["question"])]
 
-    messages = [system_prompt_msg, cart_msg] + list(few_shot_examples)
+    dynamic_budget = PROMPT_TOKEN_BUDGET - STATIC_PREFIX_TOKENS
+    dynamic_budget -= estimate_tokens(cart_msg.content)
+    if summary:
+        dynamic_budget -= estimate_tokens(summary.content)
+    dynamic_budget -= sum(estimate_tokens(msg.content) for msg in tool_exchange)
+    selected_history, context_docs = fit_to_budget(
+        selected_history, state.get("context", []), dynamic_budget
+    )
+
+    messages = STATIC_PREFIX + [cart_msg]
+    if summary:
+        messages.append(summary)
 
-    context_docs = state.get("context", [])
     if context_docs:
         context_text = "\n".join(
             f"ID {doc.metadata['id']}, {doc.page_content}" for doc in context_docs
@@ -89,9 +159,26 @@ def generate(state: State) -> State:
         )
 
     messages.extend(selected_history)
+    messages.extend(tool_exchange)
 
     response = llm.invoke(messages)
 
+    usage = getattr(response, "usage_metadata", None) or {}
+    estimated_tokens = sum(estimate_tokens(msg.content) for msg in messages)
+    record_llm_call(
+        usage.get("input_tokens") or estimated_tokens,
+        usage.get("output_tokens") or estimate_tokens(response.content),
+    )
+    logger.info(
+        "generate prompt: ~%d tokens estimated, %s input / %s output tokens reported, "
+        "%d history messages, %d context docs",
+        estimated_tokens,
+        usage.get("input_tokens"),
+        usage.get("output_tokens"),
+        len(selected_history),
+        len(context_docs),
+    )
+
     state["messages"] = selected_history + [response]
     state["tool_calls"] = getattr(response, "tool_calls", []) or []
     if not state["tool_calls"]:
@@ -99,20 +186,125 @@ def generate(state: State) -> State:
     return state
 
 
+def current_turn_messages(messages: list, question: str) -> list:
+    """Messages after this turn's question, or [] if the question is not the last one asked."""
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return messages[index + 1 :] if messages[index].content == question else []
+    return []
+
+
+def pending_tool_exchange(messages: list, question: str) -> list:
+    """This turn's tool calls and results, when the model still has to answer them."""
+    if not messages or not isinstance(messages[-1], ToolMessage):
+        return []
+    return current_turn_messages(messages, question)
+
+
+@timed_node
 def generate_final_reply(state: State) -> State:
     if not state.get("answer"):
         state["answer"] = "Thanks for asking! Your request has been processed."
     return state
 
 
+def describe_items(item_ids: list[int], item_lookup: dict) -> str:
+    names = [item_lookup[item_id].name for item_id in item_ids if item_id in item_lookup]
+    return ", ".join(dict.fromkeys(names))
+
+
+def compose_tool_reply(added, removed, unknown, recommended, item_lookup) -> str:
+    """Build the confirmation locally instead of asking the model to summarize."""
+    if unknown and not (added or removed or recommended):
+        return "Thanks for asking! Unfortunately, we don't have that product."
+    if not (added or removed or recommended):
+        return "Thanks for asking! Your cart already matches your request."
+    parts = []
+    if recommended:
+        parts.append(f"I recommend {describe_items(recommended, item_lookup)}.")
+    if added:
+        parts.append(f"Added {describe_items(added, item_lookup)} to your cart.")
+    if removed:
+        parts.append(f"Removed {describe_items(removed, item_lookup)} from your cart.")
+    if unknown:
+        parts.append("Some requested products are unavailable.")
+    return " ".join(["Thanks for asking!"] + parts)
+
+
+def recommended_ids(tool_messages: list[ToolMessage]) -> list[int]:
+    ids = []
+    for message in tool_messages:
+        try:
+            ids.extend(int(item["id"]) for item in json.loads(message.content))
+        except (TypeError, ValueError, KeyError):
+            continue
+    return ids
+
+
+def cart_call_result(added: list, removed: list, unknown: list) -> str:
+    if unknown:
+        return f"failed: unknown or invalid item ids {unknown}"
+    return "done"
+
+
+@timed_node
 def tool_execution(state: State) -> State:
-    new_state = tool_node.invoke(state)
-    new_state["tool_calls"] = []
-    return new_state
+    """Apply cart tools locally and run the remaining tool calls concurrently.
+
+    When every call is a cart edit the reply is composed from the results, so no
+    follow-up model call is needed. Results of other tools go back to the model.
+    """
+    response = state["messages"][-1]
+    calls = state["tool_calls"]
+    local_calls = [call for call in calls if call["name"] in LOCAL_CART_TOOLS]
+    remote_calls = [call for call in calls if call["name"] not in LOCAL_CART_TOOLS]
+    item_lookup = get_items_dict()
+
+    tool_messages = []
+    if remote_calls:
+        # ToolNode runs the calls of a single message concurrently in a thread pool.
+        remote_message = AIMessage(content="", tool_calls=remote_calls)
+        tool_messages = tool_node.invoke({**state, "messages": [remote_message]})[
+            "messages"
+        ]
+
+    added, removed, unknown = [], [], []
+    for call in local_calls:
+        result = apply_cart_tool_calls(state["cart"], [call], set(item_lookup))
+        added += result[0]
+        removed += result[1]
+        unknown += result[2]
+        tool_messages.append(
+            ToolMessage(
+                content=cart_call_result(*result),
+                tool_call_id=call["id"],
+                name=call["name"],
+            )
+        )
+
+    # Counted before state["messages"] is replaced by this node's update.
+    rounds = tool_rounds(state)
+    state["messages"] = tool_messages
+    state["tool_calls"] = []
+    if remote_calls and rounds < MAX_TOOL_ROUNDS:
+        return state
+    state["answer"] = response.content or compose_tool_reply(
+        added, removed, unknown, recommended_ids(tool_messages), item_lookup
+    )
+    return state
+
+
+def tool_rounds(state: State) -> int:
+    """Model responses with tool calls so far in this turn."""
+    return sum(
+        1
+        for msg in current_turn_messages(state["messages"], state["question"])
+        if isinstance(msg, AIMessage) and msg.tool_calls
+    )
 
 
 def after_tool_execution(state: State) -> str:
-    return "generate" if state.get("tool_calls") else "generate_final_reply"
+    return "generate_final_reply" if state.get("answer") else "generate"
 
 
 def after_generate(state: State):
@@ -148,8 +340,11 @@ graph_builder.add_edge("generate_final_reply", END)
 graph = graph_builder.compile()
 
 
-def ask_question(question: str, user_id: str, cart: Cart = Cart(items=[])) -> dict:
+def ask_question(question: str, user_id: str, cart: Cart | None = None) -> dict:
+    turn = start_turn()
+    started = time.perf_counter()
     history = get_session_history(user_id)
+    cart = cart if cart is not None else Cart(items=[])
 
     initial_state: State = {
         "question": question,
@@ -164,6 +359,11 @@ def ask_question(question: str, user_id: str, cart: Cart = Cart(items=[])) -> di
 
     final_state = graph.invoke(initial_state)
 
-    set_session_history(user_id=user_id, messages=final_state.get("messages"))
+    # Older turns are folded into a summary so stored history and prompts stay bounded.
+    set_session_history(
+        user_id=user_id,
+        messages=compact_history(final_state.get("messages"), get_items_dict()),
+    )
+    finish_turn(turn, time.perf_counter() - started)
 
     return {"answer": final_state["answer"], "cart": final_state["cart"]}
@@ -0,0 +1,249 @@
+"""
+Load-test harness for the assistant graph.
+Replays a corpus of chat scripts against backend.ai.app at a given concurrency and
+reports per-node latency, LLM usage per turn and end-to-end throughput.
+
+Model modes:
+  stub   - fixed-latency fake model and embeddings, no API calls
+  record - live model; every response and its latency is saved to the recording
+  replay - responses and latencies come from a recording, no API calls
+
+Assistant state always stays in process memory so a run never writes chat
+histories or embeddings into the shared database.
+
+Corpus format: a JSON list of scripts, each a list of turns (or {"turns": [...]}).
+A turn is a message string or {"message": ..., "tool_calls": [{"name", "args"}]};
+tool_calls are what the stub model answers with for that turn.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.messages import (
+    AIMessage,
+    ToolMessage,
+    message_to_dict,
+    messages_from_dict,
+)
+
+from backend.ai.models import Search
+from backend.ai.metrics import current_turn, metrics_snapshot, percentile, reset_metrics
+from backend.models import Cart
+
+_scripted_calls: ContextVar[list] = ContextVar("scripted_calls", default=[])
+_recording_lock = threading.Lock()
+
+
+def load_corpus(path: str) -> list[list[dict]]:
+    with open(path) as corpus:
+        raw = json.load(corpus)
+    scripts = []
+    for script in raw:
+        turns = script["turns"] if isinstance(script, dict) else script
+        scripts.append([{"message": t} if isinstance(t, str) else t for t in turns])
+    return scripts
+
+
+def prompt_key(kind: str, prompt) -> str:
+    text = prompt if isinstance(prompt, str) else "\n".join(str(m.content) for m in prompt)
+    return hashlib.sha256(f"{kind}\n{text}".encode()).hexdigest()
+
+
+class StubEmbeddings(DeterministicFakeEmbedding):
+    """Deterministic vectors returned after a fixed delay per call."""
+
+    latency: float = 0.0
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+
+class StubLLM:
+    """Answers after a fixed delay with the tool calls scripted for the current turn."""
+
+    def __init__(self, latency: float, kind: str = "chat") -> None:
+        self.latency = latency
+        self.kind = kind
+
+    def with_structured_output(self, schema, **kwargs):
+        return StubLLM(self.latency, kind="query")
+
+    def invoke(self, prompt, *args, **kwargs):
+        time.sleep(self.latency)
+        if self.kind == "query":
+            return {"query": prompt, "section": "middle"}
+        # Scripted calls answer the question; once tool results are back, reply.
+        scripted = [] if isinstance(prompt[-1], ToolMessage) else _scripted_calls.get()
+        calls = [
+            {"name": call["name"], "args": call.get("args", {}), "id": f"call-{n}"}
+            for n, call in enumerate(scripted)
+        ]
+        return AIMessage(content="" if calls else "Stub answer.", tool_calls=calls)
+
+
+class RecordingLLM:
+    """Passes calls to the live model and stores each response with its latency."""
+
+    def __init__(self, inner, recording: dict, kind: str = "chat") -> None:
+        self.inner = inner
+        self.recording = recording
+        self.kind = kind
+
+    def with_structured_output(self, schema, **kwargs):
+        structured = self.inner.with_structured_output(schema, **kwargs)
+        return RecordingLLM(structured, self.recording, kind="query")
+
+    def invoke(self, prompt, *args, **kwargs):
+        started = time.perf_counter()
+        result = self.inner.invoke(prompt, *args, **kwargs)
+        entry = {
+            "latency": time.perf_counter() - started,
+            "response": result if self.kind == "query" else message_to_dict(result),
+        }
+        with _recording_lock:
+            self.recording[prompt_key(self.kind, prompt)] = entry
+        return result
+
+
+class ReplayLLM:
+    """Returns recorded responses after their recorded latency; misses use the stub."""
+
+    def __init__(
+        self, recording: dict, fallback: StubLLM, kind: str = "chat", misses=None
+    ) -> None:
+        self.recording = recording
+        self.fallback = fallback
+        self.kind = kind
+        self.misses = misses if misses is not None else Counter()
+
+    def with_structured_output(self, schema, **kwargs):
+        structured = self.fallback.with_structured_output(schema)
+        return ReplayLLM(self.recording, structured, kind="query", misses=self.misses)
+
+    def invoke(self, prompt, *args, **kwargs):
+        entry = self.recording.get(prompt_key(self.kind, prompt))
+        if entry is None:
+            self.misses[self.kind] += 1
+            return self.fallback.invoke(prompt)
+        time.sleep(entry["latency"])
+        if self.kind == "query":
+            return entry["response"]
+        return messages_from_dict([entry["response"]])[0]
+
+
+def prepare_assistant(mode: str, llm_latency: float, embed_latency: float, recording: dict):
+    """Load the assistant with the model and embeddings selected by mode."""
+    os.environ["ASSISTANT_STATE_BACKEND"] = "memory"
+    if mode != "record":
+        # The Google clients are constructed at import but never called in these modes.
+        os.environ.setdefault("GOOGLE_API_KEY", "benchmark-stub")
+        from backend.ai import vectorstore
+
+        vectorstore.embeddings = StubEmbeddings(size=256, latency=embed_latency)
+        vectorstore.vector_store.embedding = vectorstore.embeddings
+
+    from backend.ai.loader import warm_up
+
+    assistant = warm_up()
+    stub = StubLLM(llm_latency)
+    if mode == "stub":
+        assistant.llm = stub
+        assistant.query_llm = stub.with_structured_output(Search)
+    elif mode == "replay":
+        assistant.llm = ReplayLLM(recording, stub)
+        assistant.query_llm = assistant.llm.with_structured_output(Search)
+    else:
+        assistant.llm = RecordingLLM(assistant.llm, recording)
+        assistant.query_llm = RecordingLLM(assistant.query_llm, recording, kind="query")
+    return assistant
+
+
+def run_script(assistant, script: list[dict]) -> list[dict]:
+    """Play one script as a fresh user and return the usage of each turn."""
+    user_id = f"bench-{uuid.uuid4().hex}"
+    cart = Cart(items=[])
+    turns = []
+    for turn in script:
+        _scripted_calls.set(turn.get("tool_calls") or [])
+        reply = assistant.ask_question(turn["message"], user_id=user_id, cart=cart)
+        cart = reply["cart"]
+        turns.append(dict(current_turn()))
+    assistant.set_session_history(user_id=user_id, messages=[])
+    return turns
+
+
+def run_benchmark(assistant, scripts: list[list[dict]], concurrency: int, repeat: int = 1):
+    reset_metrics()
+    jobs = [script for _ in range(repeat) for script in scripts]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda script: run_script(assistant, script), jobs))
+    elapsed = time.perf_counter() - started
+
+    turns = [turn for script_turns in results for turn in script_turns]
+    seconds = [turn["seconds"] for turn in turns]
+    count = len(turns) or 1
+    snapshot = metrics_snapshot()
+    return {
+        "scripts": len(jobs),
+        "turns": len(turns),
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "turns_per_second": round(len(turns) / elapsed, 3) if elapsed else None,
+        "turn_p50_ms": round(percentile(seconds, 50) * 1000, 2) if seconds else None,
+        "turn_p95_ms": round(percentile(seconds, 95) * 1000, 2) if seconds else None,
+        "llm_calls_per_turn": round(sum(t["llm_calls"] for t in turns) / count, 3),
+        "tokens_per_turn": round(
+            sum(t["input_tokens"] + t["output_tokens"] for t in turns) / count, 1
+        ),
+        "nodes": snapshot["nodes"],
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{report['scripts']} scripts, {report['turns']} turns at concurrency "
+        f"{report['concurrency']} in {report['elapsed_seconds']}s "
+        f"({report['turns_per_second']} turns/s)",
+        f"turn latency p50 {report['turn_p50_ms']} ms, p95 {report['turn_p95_ms']} ms",
+        f"llm calls/turn {report['llm_calls_per_turn']}, "
+        f"tokens/turn {report['tokens_per_turn']}",
+        "",
+        f"{'node':<22}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}",
+    ]
+    for name, stats in report["nodes"].items():
+        lines.append(
+            f"{name:<22}{stats['count']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main(args) -> int:
+    recording = {}
+    if args.llm == "replay":
+        with open(args.recording) as recorded:
+            recording = json.load(recorded)
+    assistant = prepare_assistant(args.llm, args.llm_latency, args.embed_latency, recording)
+    report = run_benchmark(
+        assistant, load_corpus(args.corpus), args.concurrency, args.repeat
+    )
+    if args.llm == "replay":
+        report["replay_misses"] = dict(assistant.llm.misses)
+    if args.llm == "record":
+        with open(args.recording, "w") as recorded:
+            json.dump(recording, recorded)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
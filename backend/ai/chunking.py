@@ -0,0 +1,53 @@
+"""
+Text chunking for the vector index.
+Kept free of model and database imports so it can run in worker processes;
+items travel as plain (id, name, description, price) rows.
+"""
+
+from typing import List, Tuple
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+ItemRow = Tuple[int, str, str | None, float]
+Chunk = Tuple[str, dict]
+
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+MIN_CHUNK_LENGTH = 300
+
+
+def get_section(x: int, n_splits: int):
+    if n_splits == 1:
+        return "middle"
+    elif x < n_splits // 3:
+        return "beginning"
+    elif x < 2 * n_splits // 3:
+        return "middle"
+    else:
+        return "end"
+
+
+def chunk_item_rows(rows: List[ItemRow]) -> List[Chunk]:
+    """
+    Only chunk descriptions longer than MIN_CHUNK_LENGTH; shorter ones are left as single chunks.
+    """
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+    )
+    chunks = []
+    for item_id, name, description, price in rows:
+        desc = description or ""
+        base_text = f"Item Name: {name}, Item Description: {desc}"
+        if len(desc) > MIN_CHUNK_LENGTH:
+            splits = text_splitter.split_text(base_text)
+        else:
+            splits = [base_text]
+        for x, text in enumerate(splits):
+            metadata = {
+                "id": item_id,
+                "name": name,
+                "section": get_section(x, len(splits)),
+                "price": price,
+            }
+            chunks.append((text, metadata))
+    return chunks
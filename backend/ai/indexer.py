@@ -0,0 +1,213 @@
+"""
+Background indexing pipeline for the assistant's vector index.
+Item change events only enqueue ids; a worker thread drains the queue in batches,
+chunks text in a process pool, embeds in batches with backoff on rate limits and
+commits each batch to the vector store atomically.
+"""
+
+import logging
+import multiprocessing
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Iterable, List
+
+from backend.ai import vectorstore as vs
+from backend.ai.chunking import Chunk, chunk_item_rows
+from backend.ai.session import refresh_items
+from backend.ai.shared_state import ItemChunks, forget_items, load_or_embed
+from backend.models import Item
+from backend.services.utils import chunked
+
+logger = logging.getLogger(__name__)
+
+INDEX_BATCH_SIZE = int(os.getenv("INDEX_BATCH_SIZE", "100"))
+INDEX_CHUNK_WORKERS = int(os.getenv("INDEX_CHUNK_WORKERS", "2"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "100"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "5"))
+EMBED_RETRY_BASE_SECONDS = float(os.getenv("EMBED_RETRY_BASE_SECONDS", "1"))
+ITEMS_PER_CHUNK_TASK = 50
+THROUGHPUT_WINDOW_SECONDS = 60
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _chunk_pool() -> ProcessPoolExecutor:
+    # spawn, not fork: the parent runs several threads when the pool is created.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=INDEX_CHUNK_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _discard_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def chunk_items(items: List[Item]) -> List[Chunk]:
+    """Split item text into chunks, in worker processes when the batch is large enough."""
+    rows = [(item.id, item.name, item.description, item.price) for item in items]
+    if INDEX_CHUNK_WORKERS <= 0 or len(rows) <= ITEMS_PER_CHUNK_TASK:
+        return chunk_item_rows(rows)
+    try:
+        parts = _chunk_pool().map(chunk_item_rows, chunked(rows, ITEMS_PER_CHUNK_TASK))
+        return [chunk for part in parts for chunk in part]
+    except BrokenProcessPool:
+        logger.exception("Chunking pool failed; chunking inline and recreating the pool")
+        _discard_pool()
+        return chunk_item_rows(rows)
+
+
+def is_rate_limited(exc: Exception) -> bool:
+    text = f"{type(exc).__name__} {exc}"
+    return any(
+        marker in text for marker in ("429", "ResourceExhausted", "RESOURCE_EXHAUSTED")
+    )
+
+
+def embed_with_retry(texts: List[str]) -> List[List[float]]:
+    """Embed one batch, backing off exponentially (longer when rate limited)."""
+    for attempt in range(EMBED_MAX_RETRIES + 1):
+        try:
+            return vs.embeddings.embed_documents(texts)
+        except Exception as exc:
+            if attempt == EMBED_MAX_RETRIES:
+                raise
+            delay = EMBED_RETRY_BASE_SECONDS * 2**attempt
+            if is_rate_limited(exc):
+                delay *= 2
+            delay += random.uniform(0, delay / 2)
+            indexer.record_retry()
+            logger.warning(
+                "Embedding %d texts failed (%s), retrying in %.1fs", len(texts), exc, delay
+            )
+            time.sleep(delay)
+
+
+def embed_item_chunks(items: List[Item]) -> ItemChunks:
+    chunks = chunk_items(items)
+    texts = [text for text, _ in chunks]
+    vectors = [
+        vector for batch in chunked(texts, EMBED_BATCH_SIZE) for vector in embed_with_retry(batch)
+    ]
+    item_chunks: ItemChunks = {}
+    for (text, metadata), vector in zip(chunks, vectors):
+        item_chunks.setdefault(metadata["id"], []).append(
+            {"text": text, "metadata": metadata, "vector": vector}
+        )
+    return item_chunks
+
+
+def index_items(items: List[Item], removed_ids: Iterable[int] = ()) -> None:
+    """Embed items (reusing shared embeddings) and commit them with removals in one swap."""
+    item_chunks = load_or_embed(items, embed_item_chunks) if items else {}
+    vs.vectorstore_commit(item_chunks, removed_ids)
+
+
+class IndexingWorker:
+    """Coalescing queue of changed item ids drained by a single daemon thread."""
+
+    def __init__(self, batch_size: int = INDEX_BATCH_SIZE) -> None:
+        self.batch_size = batch_size
+        self._pending: dict[int, None] = {}
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._in_flight = 0
+        self._indexed_items = 0
+        self._failed_items = 0
+        self._retries = 0
+        self._recent: deque[tuple[float, int]] = deque()
+        self._last_batch_seconds: float | None = None
+        self._last_error: str | None = None
+
+    def enqueue(self, item_ids: Iterable[int]) -> None:
+        """Queue items for re-indexing; ids already waiting are not queued twice."""
+        with self._condition:
+            self._pending.update(dict.fromkeys(item_ids))
+            self._condition.notify()
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="ai-indexer", daemon=True
+                )
+                self._thread.start()
+
+    def record_retry(self) -> None:
+        with self._condition:
+            self._retries += 1
+
+    def process(self, item_ids: List[int]) -> None:
+        fresh_items = refresh_items(item_ids)
+        fresh_ids = {item.id for item in fresh_items}
+        deleted_ids = [item_id for item_id in item_ids if item_id not in fresh_ids]
+        forget_items(deleted_ids)
+        index_items(fresh_items, removed_ids=deleted_ids)
+
+    def _take_batch(self) -> List[int]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            batch = list(islice(self._pending, self.batch_size))
+            for item_id in batch:
+                del self._pending[item_id]
+            self._in_flight = len(batch)
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            started = time.monotonic()
+            try:
+                self.process(batch)
+            except Exception as exc:
+                logger.exception("Indexing %d items failed", len(batch))
+                with self._condition:
+                    self._failed_items += len(batch)
+                    self._last_error = str(exc)
+            else:
+                finished = time.monotonic()
+                with self._condition:
+                    self._indexed_items += len(batch)
+                    self._recent.append((finished, len(batch)))
+                    self._last_batch_seconds = round(finished - started, 3)
+            finally:
+                with self._condition:
+                    self._in_flight = 0
+
+    def status(self) -> dict:
+        """Queue depth and throughput over the last THROUGHPUT_WINDOW_SECONDS."""
+        now = time.monotonic()
+        with self._condition:
+            while self._recent and now - self._recent[0][0] > THROUGHPUT_WINDOW_SECONDS:
+                self._recent.popleft()
+            recent_items = sum(count for _, count in self._recent)
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "queue_depth": len(self._pending),
+                "in_flight": self._in_flight,
+                "indexed_items": self._indexed_items,
+                "failed_items": self._failed_items,
+                "embed_retries": self._retries,
+                "items_per_second": round(recent_items / THROUGHPUT_WINDOW_SECONDS, 3),
+                "last_batch_seconds": self._last_batch_seconds,
+                "last_error": self._last_error,
+            }
+
+
+indexer = IndexingWorker()
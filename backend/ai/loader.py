@@ -0,0 +1,86 @@
+"""
+Lazy loader for the AI assistant subsystem.
+Importing backend.ai.app pulls in LangGraph/LangChain and embeds the catalog, so it is
+deferred to a background warm-up thread or the first assistant request.
+This module must stay free of heavy imports.
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from types import ModuleType
+
+logger = logging.getLogger(__name__)
+
+AI_WARMUP_ON_STARTUP = os.getenv("AI_WARMUP_ON_STARTUP", "true").lower() == "true"
+
+_load_lock = threading.Lock()
+_assistant: ModuleType | None = None
+_status = {
+    "state": "idle",
+    "step": None,
+    "indexed_items": 0,
+    "total_items": None,
+    "error": None,
+    "elapsed_seconds": None,
+}
+
+
+def _update_progress(indexed: int, total: int) -> None:
+    _status["indexed_items"] = indexed
+    _status["total_items"] = total
+
+
+def warm_up() -> ModuleType:
+    """Import the assistant and build its index once; concurrent callers wait for it."""
+    global _assistant
+    if _assistant is not None:
+        return _assistant
+    with _load_lock:
+        if _assistant is not None:
+            return _assistant
+        started = time.monotonic()
+        _status.update(state="loading", step="import", error=None)
+        try:
+            module = importlib.import_module("backend.ai.app")
+            _status["step"] = "index"
+            module.build_index(on_progress=_update_progress)
+        except Exception as exc:
+            _status.update(state="failed", error=str(exc))
+            logger.exception("Assistant warm-up failed")
+            raise
+        finally:
+            _status["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        _status.update(state="ready", step=None)
+        _assistant = module
+        return module
+
+
+def start_warmup() -> None:
+    """Warm up the assistant in a daemon thread so startup does not wait for it."""
+    if _status["state"] in ("idle", "failed"):
+        _status["state"] = "loading"
+        threading.Thread(target=_safe_warm_up, name="ai-warmup", daemon=True).start()
+
+
+def _safe_warm_up() -> None:
+    try:
+        warm_up()
+    except Exception:
+        pass
+
+
+def get_assistant() -> ModuleType:
+    """Return the loaded assistant module, loading it on first use."""
+    return _assistant if _assistant is not None else warm_up()
+
+
+def is_assistant_loaded() -> bool:
+    return _assistant is not None
+
+
+def get_warmup_status() -> dict:
+    """Snapshot of warm-up progress for the readiness endpoint."""
+    return {"ready": _assistant is not None, **_status}
@@ -0,0 +1,103 @@
+"""
+Rolling conversation memory for the assistant.
+Stored chat histories keep the last HISTORY_RECENT_MESSAGES user and assistant
+messages verbatim; older turns are folded into a single summary message of at
+most HISTORY_SUMMARY_TOKENS, so the prompt stays about the same size however
+long a session runs. The summary is built locally from the turns (no model
+call): one line per turn with the question, the reply and the cart actions,
+dropping the oldest lines once over budget. Tool outputs are not kept.
+"""
+
+import os
+from typing import Dict, List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+from backend.ai.utils import estimate_tokens
+from backend.models import Item
+
+HISTORY_RECENT_MESSAGES = int(os.getenv("HISTORY_RECENT_MESSAGES", "8"))
+HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", "300"))
+SUMMARY_LINE_CHARS = 160
+
+SUMMARY_NAME = "conversation_summary"
+SUMMARY_HEADER = "Earlier in this conversation:"
+
+
+def is_summary(message: BaseMessage) -> bool:
+    return isinstance(message, SystemMessage) and message.name == SUMMARY_NAME
+
+
+def clip(text, limit: int = SUMMARY_LINE_CHARS) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def describe_call(call: dict, item_lookup: Dict[int, Item]) -> str:
+    """A tool call with item IDs annotated by name, e.g. add_item_to_cart(item_id=3 Pen)."""
+
+    def describe(item_id) -> str:
+        try:
+            item = item_lookup.get(int(item_id))
+        except (TypeError, ValueError):
+            item = None
+        return f"{int(item_id)} {item.name}" if item else str(item_id)
+
+    args = []
+    for key, value in call.get("args", {}).items():
+        if key == "item_id":
+            value = describe(value)
+        elif key == "item_ids" and isinstance(value, list):
+            value = "[" + ", ".join(describe(item_id) for item_id in value) + "]"
+        args.append(f"{key}={value}")
+    return f"{call['name']}({', '.join(args)})"
+
+
+def summarize_turns(messages: List[BaseMessage], item_lookup: Dict[int, Item]) -> List[str]:
+    """One line per user turn with the assistant's replies and tool calls."""
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {clip(message.content)}")
+            continue
+        if not isinstance(message, AIMessage) or not lines:
+            continue
+        if message.content:
+            lines[-1] += f" | Assistant: {clip(message.content)}"
+        calls = [describe_call(call, item_lookup) for call in message.tool_calls]
+        if calls:
+            lines[-1] += f" | Actions: {'; '.join(calls)}"
+    return lines
+
+
+def compact_history(
+    messages: List[BaseMessage],
+    item_lookup: Dict[int, Item],
+    keep: int = HISTORY_RECENT_MESSAGES,
+    budget: int = HISTORY_SUMMARY_TOKENS,
+) -> List[BaseMessage]:
+    """Keep the recent turns and fold older ones into the summary message.
+
+    The recent window always starts at a user message so a tool-calling reply
+    is never separated from its question.
+    """
+    lines = []
+    dialogue = []
+    for message in messages or []:
+        if is_summary(message):
+            lines.extend(message.content.splitlines()[1:])
+        elif isinstance(message, (HumanMessage, AIMessage)):
+            dialogue.append(message)
+
+    start = max(0, len(dialogue) - keep)
+    while start < len(dialogue) and not isinstance(dialogue[start], HumanMessage):
+        start += 1
+    lines.extend(summarize_turns(dialogue[:start], item_lookup))
+    recent = dialogue[start:]
+
+    while lines and estimate_tokens("\n".join([SUMMARY_HEADER, *lines])) > budget:
+        lines.pop(0)
+    if not lines:
+        return recent
+    summary = SystemMessage(content="\n".join([SUMMARY_HEADER, *lines]), name=SUMMARY_NAME)
+    return [summary, *recent]
@@ -0,0 +1,146 @@
+"""
+In-process latency and usage metrics for the assistant graph.
+Each graph node is timed, and every chat turn records its LLM calls and tokens.
+Served by GET /assistant/metrics and read by the benchmark harness.
+"""
+
+import functools
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+logger = logging.getLogger(__name__)
+
+METRICS_SAMPLE_SIZE = int(os.getenv("METRICS_SAMPLE_SIZE", "2048"))
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of values (q in 0..100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyRecorder:
+    """Counts and a bounded window of recent samples per name."""
+
+    def __init__(self, sample_size: int = METRICS_SAMPLE_SIZE) -> None:
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=sample_size))
+        self._counts: defaultdict[str, int] = defaultdict(int)
+        self._totals: defaultdict[str, float] = defaultdict(float)
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples[name].append(seconds)
+            self._counts[name] += 1
+            self._totals[name] += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._totals.clear()
+
+    def snapshot(self) -> dict:
+        """Per-name count, mean, p50 and p95 in milliseconds."""
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+            counts, totals = dict(self._counts), dict(self._totals)
+        return {
+            name: {
+                "count": counts[name],
+                "mean_ms": round(totals[name] / counts[name] * 1000, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+            }
+            for name, values in samples.items()
+        }
+
+
+node_latency = LatencyRecorder()
+turn_latency = LatencyRecorder()
+
+_usage_lock = threading.Lock()
+_usage_totals = {"turns": 0, "llm_calls": 0, "input_tokens": 0, "output_tokens": 0}
+_current_turn: ContextVar[dict | None] = ContextVar("assistant_turn", default=None)
+
+
+def start_turn() -> dict:
+    """Begin usage accounting for a chat turn in the current context."""
+    turn = {"llm_calls": 0, "input_tokens": 0, "output_tokens": 0, "seconds": None}
+    _current_turn.set(turn)
+    return turn
+
+
+def current_turn() -> dict | None:
+    """Usage of the most recent turn started in this context."""
+    return _current_turn.get()
+
+
+def record_llm_call(input_tokens: int, output_tokens: int) -> None:
+    turn = _current_turn.get()
+    if turn is not None:
+        turn["llm_calls"] += 1
+        turn["input_tokens"] += input_tokens
+        turn["output_tokens"] += output_tokens
+
+
+def finish_turn(turn: dict, seconds: float) -> None:
+    turn["seconds"] = seconds
+    turn_latency.observe("turn", seconds)
+    with _usage_lock:
+        _usage_totals["turns"] += 1
+        for key in ("llm_calls", "input_tokens", "output_tokens"):
+            _usage_totals[key] += turn[key]
+    logger.info(
+        "assistant turn: %.1f ms, %d llm calls, %d input / %d output tokens",
+        seconds * 1000,
+        turn["llm_calls"],
+        turn["input_tokens"],
+        turn["output_tokens"],
+    )
+
+
+def timed_node(fn):
+    """Record the wall time of a graph node under its function name."""
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        started = time.perf_counter()
+        try:
+            return fn(state)
+        finally:
+            node_latency.observe(fn.__name__, time.perf_counter() - started)
+
+    return wrapper
+
+
+def reset_metrics() -> None:
+    node_latency.reset()
+    turn_latency.reset()
+    with _usage_lock:
+        for key in _usage_totals:
+            _usage_totals[key] = 0
+
+
+def metrics_snapshot() -> dict:
+    """Node and turn latency percentiles plus average LLM usage per turn."""
+    with _usage_lock:
+        totals = dict(_usage_totals)
+    turns = totals["turns"] or 1
+    return {
+        "nodes": node_latency.snapshot(),
+        "turn": turn_latency.snapshot().get("turn"),
+        "turns": totals["turns"],
+        "llm_calls_per_turn": round(totals["llm_calls"] / turns, 3),
+        "tokens_per_turn": round(
+            (totals["input_tokens"] + totals["output_tokens"]) / turns, 1
+        ),
+    }
@@ -1,13 +1,8 @@
-from pydantic import BaseModel
 from typing import TypedDict, Literal
 from typing_extensions import Annotated
 from langgraph.graph.message import add_messages
 from langchain_core.documents import Document
-from backend.models import CartItem
-
-
-class Cart(BaseModel):
-    items: list[CartItem]
+from backend.models import Cart
 
 
 class Search(TypedDict):
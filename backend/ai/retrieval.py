@@ -0,0 +1,86 @@
+"""
+Retrieval stage for the RAG pipeline.
+Fuses BM25 lexical results from the shared catalog index with vector results
+(reciprocal rank fusion), keeps one chunk per item (preferring the requested
+section), and answers exact product-name queries without an embedding call.
+"""
+
+import os
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from backend.ai.vectorstore import vectorstore_search_scored, vectorstore_get_item_docs
+from backend.database import get_db_session
+from backend.services.search_index import catalog_index, tokenize
+
+RETRIEVAL_K = int(os.getenv("RETRIEVAL_K", "3"))
+OVERFETCH_FACTOR = 4
+LEXICAL_WEIGHT = 0.3
+SECTION_BONUS = 0.05
+RRF_K = 60
+
+
+def lexical_overlap(query_terms: set[str], text: str) -> float:
+    """Fraction of query terms present in text."""
+    if not query_terms:
+        return 0.0
+    return len(query_terms & set(tokenize(text))) / len(query_terms)
+
+
+def rerank(
+    query: str,
+    scored_docs: List[tuple[Document, float]],
+    section: Optional[str] = None,
+    k: int = RETRIEVAL_K,
+) -> List[Document]:
+    """Group chunks by item id, keep each item's best chunk and return the top k items."""
+    query_terms = set(tokenize(query))
+    best: dict[int, tuple[float, Document]] = {}
+    for doc, vector_score in scored_docs:
+        metadata = doc.metadata
+        score = vector_score + LEXICAL_WEIGHT * lexical_overlap(
+            query_terms, f"{metadata.get('name', '')} {doc.page_content}"
+        )
+        if section and metadata.get("section") == section:
+            score += SECTION_BONUS
+        current = best.get(metadata["id"])
+        if current is None or score > current[0]:
+            best[metadata["id"]] = (score, doc)
+    ranked = sorted(best.values(), key=lambda entry: entry[0], reverse=True)
+    return [doc for _, doc in ranked[:k]]
+
+
+def reciprocal_rank_fusion(*rankings: List[int], k: int = RRF_K) -> List[int]:
+    """Merge ranked id lists by summing 1 / (k + rank) per id."""
+    scores: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def retrieve_context(
+    query: str, section: Optional[str] = None, k: int = RETRIEVAL_K
+) -> List[Document]:
+    """Return up to k distinct items' most relevant chunks for query."""
+    if not query:
+        return []
+    with get_db_session() as db:
+        catalog_index.ensure_loaded(db)
+
+    exact_ids = catalog_index.exact_name_matches(query)
+    if exact_ids:
+        return vectorstore_get_item_docs(exact_ids[:k], section)
+
+    fetch = k * OVERFETCH_FACTOR
+    lexical_ids = [item_id for item_id, _ in catalog_index.search(query, limit=fetch)]
+    vector_docs = rerank(
+        query, vectorstore_search_scored(query, k=fetch), section=section, k=fetch
+    )
+    docs_by_id = {doc.metadata["id"]: doc for doc in vector_docs}
+    fused_ids = reciprocal_rank_fusion(lexical_ids, list(docs_by_id))[:k]
+    missing = [item_id for item_id in fused_ids if item_id not in docs_by_id]
+    for doc in vectorstore_get_item_docs(missing, section):
+        docs_by_id[doc.metadata["id"]] = doc
+    return [docs_by_id[item_id] for item_id in fused_ids if item_id in docs_by_id]
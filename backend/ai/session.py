@@ -1,12 +1,11 @@
-from collections import defaultdict
-from langchain.schema import BaseMessage
 from typing import List, Dict
+from sqlmodel import select
 from backend.models import Item
 from backend.services.item_services import get_items_service
 from backend.database import get_db_session
+from backend.ai.shared_state import history_store
 
 
-session_histories: defaultdict[str, list[BaseMessage]] = defaultdict(list)
 items: List[Item] = []
 items_dict: Dict[int, Item] = {}
 
@@ -17,14 +16,24 @@ def get_items():
     return items
 
 
+def refresh_items(item_ids: List[int]) -> List[Item]:
+    """Reload the given items into the snapshot, dropping ones that were deleted."""
+    with get_db_session() as db:
+        fresh = db.exec(select(Item).where(Item.id.in_(item_ids))).all()
+    if items:
+        changed = set(item_ids)
+        items[:] = [item for item in items if item.id not in changed] + list(fresh)
+    return list(fresh)
+
+
 def get_items_dict() -> Dict[int, Item]:
     current_items = get_items()
     return {item.id: item for item in current_items}
 
 
 def get_session_history(user_id: str):
-    return session_histories.get(user_id, [])
+    return history_store.get(user_id)
 
 
 def set_session_history(user_id: str, messages: list):
-    session_histories[user_id] = messages
\ No newline at end of file
+    history_store.set(user_id, messages)
\ No newline at end of file
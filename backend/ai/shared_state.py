@@ -0,0 +1,188 @@
+"""
+Backing stores for assistant state that must survive across worker processes.
+ASSISTANT_STATE_BACKEND=memory keeps everything in module globals (single worker);
+ASSISTANT_STATE_BACKEND=database keeps chat histories and item embeddings in the
+shared database so every worker sees the same conversations and index.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from langchain_core.messages import BaseMessage, messages_from_dict, messages_to_dict
+from sqlmodel import select
+
+from backend.database import get_db_session
+from backend.models import ChatSession, Item, ItemEmbedding, utc_now
+
+logger = logging.getLogger(__name__)
+
+ASSISTANT_STATE_BACKEND = os.getenv("ASSISTANT_STATE_BACKEND", "memory")
+ASSISTANT_SYNC_SECONDS = float(os.getenv("ASSISTANT_SYNC_SECONDS", "15"))
+# Polls re-read this much before the newest seen update, covering clock skew
+# between workers and rows committed shortly after their updated_at.
+SYNC_OVERLAP = timedelta(seconds=60)
+# content_hash of a deleted item's row, kept so other workers see the deletion.
+DELETED_HASH = ""
+
+if ASSISTANT_STATE_BACKEND not in ("memory", "database"):
+    raise Exception("ASSISTANT_STATE_BACKEND must be memory or database")
+
+ItemChunks = Dict[int, List[dict]]
+
+
+class MemoryHistoryStore:
+    """Per-process chat histories."""
+
+    def __init__(self) -> None:
+        self._histories: Dict[str, List[BaseMessage]] = {}
+
+    def get(self, user_id: str) -> List[BaseMessage]:
+        return self._histories.get(user_id, [])
+
+    def set(self, user_id: str, messages: List[BaseMessage]) -> None:
+        self._histories[user_id] = messages
+
+
+class DatabaseHistoryStore:
+    """Chat histories serialized into the chatsession table."""
+
+    def get(self, user_id: str) -> List[BaseMessage]:
+        with get_db_session() as db:
+            session = db.get(ChatSession, user_id)
+            return messages_from_dict(json.loads(session.messages)) if session else []
+
+    def set(self, user_id: str, messages: List[BaseMessage]) -> None:
+        payload = json.dumps(messages_to_dict(messages or []))
+        with get_db_session() as db:
+            db.merge(
+                ChatSession(user_id=user_id, messages=payload, updated_at=utc_now())
+            )
+            db.commit()
+
+
+history_store = (
+    DatabaseHistoryStore()
+    if ASSISTANT_STATE_BACKEND == "database"
+    else MemoryHistoryStore()
+)
+
+indexed_hashes: Dict[int, str] = {}
+
+
+def item_content_hash(item: Item) -> str:
+    """Hash of every item field that ends up in the vector index."""
+    content = json.dumps([item.name, item.description, item.price])
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def load_or_embed(
+    items: List[Item], embed: Callable[[List[Item]], ItemChunks]
+) -> ItemChunks:
+    """Return embedded chunks per item, reusing shared embeddings whose hash still matches."""
+    hashes = {item.id: item_content_hash(item) for item in items}
+    if ASSISTANT_STATE_BACKEND != "database":
+        indexed_hashes.update(hashes)
+        return embed(items)
+
+    with get_db_session() as db:
+        rows = db.exec(
+            select(ItemEmbedding).where(ItemEmbedding.item_id.in_(list(hashes)))
+        ).all()
+        chunks: ItemChunks = {
+            row.item_id: json.loads(row.chunks)
+            for row in rows
+            if row.content_hash == hashes[row.item_id]
+        }
+        missing = [item for item in items if item.id not in chunks]
+        if missing:
+            embedded = embed(missing)
+            for item in missing:
+                chunks[item.id] = embedded.get(item.id, [])
+                db.merge(
+                    ItemEmbedding(
+                        item_id=item.id,
+                        content_hash=hashes[item.id],
+                        chunks=json.dumps(chunks[item.id]),
+                        updated_at=utc_now(),
+                    )
+                )
+            db.commit()
+    indexed_hashes.update(hashes)
+    return chunks
+
+
+def forget_items(item_ids: List[int]) -> None:
+    """Mark shared embeddings of deleted items so other workers remove them too."""
+    for item_id in item_ids:
+        indexed_hashes.pop(item_id, None)
+    if ASSISTANT_STATE_BACKEND == "database" and item_ids:
+        with get_db_session() as db:
+            for item_id in item_ids:
+                db.merge(
+                    ItemEmbedding(
+                        item_id=item_id,
+                        content_hash=DELETED_HASH,
+                        chunks="[]",
+                        updated_at=utc_now(),
+                    )
+                )
+            db.commit()
+
+
+def find_stale_items(since: datetime | None) -> tuple[List[int], datetime | None]:
+    """IDs whose shared embeddings another worker changed or deleted since a poll.
+
+    Returns the stale IDs and the watermark to pass to the next call.
+    """
+    query = select(
+        ItemEmbedding.item_id, ItemEmbedding.content_hash, ItemEmbedding.updated_at
+    )
+    if since is not None:
+        query = query.where(ItemEmbedding.updated_at > since - SYNC_OVERLAP)
+    with get_db_session() as db:
+        rows = db.exec(query).all()
+    stale = []
+    for item_id, content_hash, _ in rows:
+        if content_hash == DELETED_HASH:
+            if item_id in indexed_hashes:
+                stale.append(item_id)
+        elif indexed_hashes.get(item_id) != content_hash:
+            stale.append(item_id)
+    newest = max((updated_at for _, _, updated_at in rows), default=since)
+    return stale, newest
+
+
+_sync_lock = threading.Lock()
+_sync_started = False
+
+
+def start_sync_thread(on_stale: Callable[[List[int]], None]) -> None:
+    """Poll the shared index and hand stale item IDs to on_stale (database backend only).
+
+    Starts at most one thread per process, however often the index is rebuilt.
+    """
+    global _sync_started
+    if ASSISTANT_STATE_BACKEND != "database":
+        return
+    with _sync_lock:
+        if _sync_started:
+            return
+        _sync_started = True
+
+    def run() -> None:
+        stop = threading.Event()
+        since = None
+        while not stop.wait(ASSISTANT_SYNC_SECONDS):
+            try:
+                stale, since = find_stale_items(since)
+                if stale:
+                    on_stale(stale)
+            except Exception:
+                logger.exception("Shared assistant index sync failed")
+
+    threading.Thread(target=run, name="ai-index-sync", daemon=True).start()
@@ -2,9 +2,12 @@ from typing import Annotated
 
 from langchain_core.tools import tool
 from langgraph.prebuilt import InjectedState
-from backend.ai.utils import add_item_cart_service, remove_item_cart_service
-from backend.ai.vectorstore import vectorstore_search_text
+from backend.ai.utils import add_items_cart_service, remove_items_cart_service
+from backend.ai.retrieval import retrieve_context
 from backend.ai.models import Cart
+from backend.ai.session import get_items_dict
+from backend.database import get_db_session
+from backend.services.recommendations import copurchase_index
 
 
 @tool
@@ -24,7 +27,7 @@ def recommend_similar_items(
     Returns:
         A list of dicts, each with keys 'id', 'name', 'description'.
     """
-    results = vectorstore_search_text(query, k=top_k)
+    results = retrieve_context(query, k=top_k)
     similar_items = [
         {
             "id": doc.metadata["id"],
@@ -34,15 +37,43 @@ def recommend_similar_items(
         for doc in results
     ]
     if add_to_cart:
-        for item in similar_items:
-            add_item_cart_service(cart=cart, item_id=item["id"])
+        add_items_cart_service(
+            cart=cart, item_quantities=[(item["id"], 1) for item in similar_items]
+        )
     return similar_items
 
 
 @tool
-def recommend_item():
-    """Recommends popular items in the form of a list of their integer IDs."""
-    return [1, 2]  # hardcoded for now.
+def recommend_item(
+    cart: Annotated[Cart, InjectedState("cart")],
+    item_ids: list[int] | None = None,
+    top_k: int = 3,
+) -> list[dict]:
+    """Recommends items frequently bought together with the given items, or popular items.
+
+    Args:
+        item_ids: Item IDs to find companions for; defaults to the items in the user's cart.
+        top_k: Number of items to return.
+
+    Returns:
+        A list of dicts, each with keys 'id', 'name', 'description'.
+    """
+    with get_db_session() as db:
+        copurchase_index.ensure_loaded(db)
+    anchors = item_ids or [cart_item.id for cart_item in cart.items]
+    # Over-fetch so deleted items can be skipped; fill up with popular items.
+    candidates = copurchase_index.bought_with(anchors, limit=2 * top_k) if anchors else []
+    candidates += copurchase_index.popular(2 * top_k + len(anchors))
+    item_lookup = get_items_dict()
+    picks = [
+        item_lookup[item_id]
+        for item_id in dict.fromkeys(candidates)
+        if item_id in item_lookup and item_id not in anchors
+    ][:top_k]
+    return [
+        {"id": item.id, "name": item.name, "description": item.description}
+        for item in picks
+    ]
 
 
 @tool
@@ -52,7 +83,7 @@ def add_item_to_cart(
     """
     Adds the specified item (by ID) in the given quantity to the user's cart.
     """
-    return add_item_cart_service(cart=cart, item_id=item_id, quantity=quantity)
+    return add_items_cart_service(cart=cart, item_quantities=[(item_id, quantity)])
 
 
 @tool
@@ -60,14 +91,63 @@ def remove_items_from_cart(
     item_ids: list[int], cart: Annotated[Cart, InjectedState("cart")]
 ) -> Cart:
     """Removes the specified items (by ID) from the user's cart."""
-    new_cart = cart
-    for item_id in item_ids:
-        new_cart = remove_item_cart_service(cart=cart, item_id=item_id) 
-    return new_cart
+    return remove_items_cart_service(cart=cart, item_ids=item_ids)
+
+
+def as_positive_int(value) -> int | None:
+    """A model-supplied ID or quantity as a positive int, or None if it is not one."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        return None
+    return value if value > 0 else None
+
+
+def apply_cart_tool_calls(
+    cart: Cart, tool_calls: list[dict], known_item_ids: set[int]
+) -> tuple[list[int], list[int], list]:
+    """Apply add/remove tool calls to the cart in order without invoking the tools.
+
+    Returns the (added, removed, unknown) item IDs so a reply can be composed locally.
+    Malformed arguments and unknown items end up in unknown; removed only lists
+    items that were in the cart.
+    """
+    added, removed, unknown = [], [], []
+    for call in tool_calls:
+        args = call.get("args") or {}
+        if call["name"] == add_item_to_cart.name:
+            item_id = as_positive_int(args.get("item_id"))
+            quantity = as_positive_int(args.get("quantity", 1))
+            if item_id not in known_item_ids or quantity is None:
+                unknown.append(args.get("item_id"))
+                continue
+            add_items_cart_service(cart=cart, item_quantities=[(item_id, quantity)])
+            added.append(item_id)
+        elif call["name"] == remove_items_from_cart.name:
+            raw_ids = args.get("item_ids")
+            if not isinstance(raw_ids, list):
+                unknown.append(raw_ids)
+                continue
+            in_cart = {cart_item.id for cart_item in cart.items}
+            item_ids = []
+            for raw_id in raw_ids:
+                item_id = as_positive_int(raw_id)
+                if item_id is None:
+                    unknown.append(raw_id)
+                elif item_id in in_cart:
+                    item_ids.append(item_id)
+            remove_items_cart_service(cart=cart, item_ids=item_ids)
+            removed.extend(item_ids)
+    return added, removed, unknown
+
 
+LOCAL_CART_TOOLS = {add_item_to_cart.name, remove_items_from_cart.name}
 
 tools = [
     recommend_similar_items,
+    recommend_item,
     add_item_to_cart,
     remove_items_from_cart,
 ]
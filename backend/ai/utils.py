@@ -1,20 +1,30 @@
+from threading import Lock
 from typing import Dict
-from backend.models import Item, CartItem
+from backend.models import Item
 from backend.ai.models import Cart
 
-def add_item_cart_service(cart:Cart, item_id: int, quantity: int = 1) -> Cart:
-    for cart_item in cart.items:
-        if cart_item.id == item_id:
-            cart_item.qty += quantity
-            break
-    else:
-        cart.items.append(CartItem(id=item_id,qty=quantity))
-    return cart
+# Tool calls may run concurrently, so cart mutations are serialized.
+cart_lock = Lock()
+
+
+def add_item_cart_service(cart: Cart, item_id: int, quantity: int = 1) -> Cart:
+    return add_items_cart_service(cart=cart, item_quantities=[(item_id, quantity)])
+
+
+def add_items_cart_service(
+    cart: Cart, item_quantities: list[tuple[int, int]]
+) -> Cart:
+    with cart_lock:
+        return cart.add_items(item_quantities)
+
 
+def remove_item_cart_service(cart: Cart, item_id: int) -> Cart:
+    return remove_items_cart_service(cart=cart, item_ids=[item_id])
 
-def remove_item_cart_service(cart:Cart, item_id: int) -> Cart:
-    cart.items = [cart_item for cart_item in cart.items if cart_item.id != item_id]
-    return cart
+
+def remove_items_cart_service(cart: Cart, item_ids: list[int]) -> Cart:
+    with cart_lock:
+        return cart.remove_items(item_ids)
 
 
 def format_cart(cart: Cart, item_lookup: Dict[int, Item]) -> str:
@@ -23,5 +33,29 @@ def format_cart(cart: Cart, item_lookup: Dict[int, Item]) -> str:
     lines = ["User Cart:"]
     for cart_item in cart.items:
         item = item_lookup.get(cart_item.id)
-        lines.append(f"- {item.name} (ID: {item.id}), Quantity: {cart_item.qty}")
+        name = item.name if item else "Unknown item"
+        lines.append(f"- {name} (ID: {cart_item.id}), Quantity: {cart_item.qty}")
     return "\n".join(lines)
+
+
+def estimate_tokens(text) -> int:
+    """Cheap token estimate (~4 characters per token) used for prompt budgeting."""
+    return len(str(text)) // 4 + 1
+
+
+def fit_to_budget(history: list, context_docs: list, budget: int) -> tuple[list, list]:
+    """Trim oldest history, then lowest-ranked context, until both fit in budget tokens.
+
+    The latest history message (the current question) is always kept.
+    """
+    history, context_docs = list(history), list(context_docs)
+    history_tokens = [estimate_tokens(msg.content) for msg in history]
+    context_tokens = [estimate_tokens(doc.page_content) for doc in context_docs]
+    total = sum(history_tokens) + sum(context_tokens)
+    while total > budget and len(history) > 1:
+        history.pop(0)
+        total -= history_tokens.pop(0)
+    while total > budget and context_docs:
+        context_docs.pop()
+        total -= context_tokens.pop()
+    return history, context_docs
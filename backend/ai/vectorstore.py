@@ -1,65 +1,76 @@
+import threading
+from typing import Iterable, List
+
 from langchain_core.documents import Document
 from langchain_core.vectorstores import InMemoryVectorStore
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
-from backend.models import Item
-from typing import List
-
 
-def get_section(x: int, n_splits: int):
-    if n_splits == 1:
-        return "middle"
-    elif x < n_splits // 3:
-        return "beginning"
-    elif x < 2 * n_splits // 3:
-        return "middle"
-    else:
-        return "end"
+from backend.ai.shared_state import ItemChunks
 
 
 def vectorstore_search_text(query_text: str, k=3):
     return vector_store.similarity_search(query_text, k=k)
 
 
-def create_chunked_docs_from_items(
-    items, chunk_size=500, chunk_overlap=50, min_chunk_length=300
-):
+def vectorstore_search_scored(query_text: str, k=12):
+    return vector_store.similarity_search_with_score(query_text, k=k)
+
+
+def vectorstore_get_item_docs(item_ids: List[int], section: str | None = None):
+    """Fetch one indexed chunk per item without an embedding call, preferring section."""
+    store, doc_ids = vector_store.store, item_doc_ids
+    docs = []
+    for item_id in item_ids:
+        entries = [store[doc_id] for doc_id in doc_ids.get(item_id, []) if doc_id in store]
+        if not entries:
+            continue
+        entry = next(
+            (e for e in entries if e["metadata"].get("section") == section), entries[0]
+        )
+        docs.append(Document(page_content=entry["text"], metadata=entry["metadata"]))
+    return docs
+
+
+def vectorstore_commit(item_chunks: ItemChunks, removed_ids: Iterable[int] = ()):
     """
-    Only chunk descriptions longer than min_chunk_length; shorter ones are left as single docs.
+    Replace the chunks of the given items and drop removed_ids in one step.
+    The store is copied, updated and swapped in, so concurrent searches see either
+    the old or the new index, never a partially written item.
+
+    The copy is shallow but O(catalog) per commit: InMemoryVectorStore searches
+    iterate the live dict, so it cannot be updated in place. The indexer commits
+    once per batch of up to INDEX_BATCH_SIZE items, which keeps this to a small
+    fraction of the batch's embedding time.
     """
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size, chunk_overlap=chunk_overlap
-    )
-    all_docs = []
-    for item in items:
-        desc = item.description or ""
-        base_text = f"Item Name: {item.name}, Item Description: {desc}"
-        if len(desc) > min_chunk_length:
-            splits = text_splitter.split_text(base_text)
-        else:
-            splits = [base_text]
-        for x, chunk in enumerate(splits):
-            section = get_section(x, len(splits))
-            all_docs.append(
-                Document(
-                    page_content=chunk,
-                    metadata={
-                        "id": item.id,
-                        "name": item.name,
-                        "section": section,
-                        "price": item.price,
-                    },
-                )
-            )
-    return all_docs
-
-
-def vectorstore_add_items(items: List[Item]):
-    chunked_item_docs = create_chunked_docs_from_items(items=items)
-    vector_store.add_documents(chunked_item_docs)
+    global item_doc_ids
+    with _commit_lock:
+        store = dict(vector_store.store)
+        doc_ids = dict(item_doc_ids)
+        for item_id in [*removed_ids, *item_chunks]:
+            for doc_id in doc_ids.pop(item_id, []):
+                store.pop(doc_id, None)
+        for item_id, chunks in item_chunks.items():
+            doc_ids[item_id] = [f"item-{item_id}-{n}" for n in range(len(chunks))]
+            for doc_id, chunk in zip(doc_ids[item_id], chunks):
+                store[doc_id] = {
+                    "id": doc_id,
+                    "vector": chunk["vector"],
+                    "text": chunk["text"],
+                    "metadata": chunk["metadata"],
+                }
+        vector_store.store = store
+        item_doc_ids = doc_ids
+
+
+def vectorstore_remove_items(item_ids: List[int]):
+    if item_ids:
+        vectorstore_commit({}, item_ids)
 
 
 embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
 
 vector_store = InMemoryVectorStore(embeddings)
+
+item_doc_ids: dict[int, list[str]] = {}
+
+_commit_lock = threading.Lock()
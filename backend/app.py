@@ -3,8 +3,8 @@ FastAPI application for the e-commerce store backend.
 Handles authentication, payment processing, and order management.
 """
 
+import logging
 import os
-import json
 from contextlib import asynccontextmanager
 
 from fastapi import (
@@ -13,22 +13,43 @@ from fastapi import (
     Request,
     HTTPException,
     Header,
-    status,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, ORJSONResponse
 from dotenv import load_dotenv
 import stripe
-from .database import create_db_and_tables, get_db
+from .admission import admission_control
+from .compression import CompressionMiddleware
+from .database import (
+    READ_YOUR_WRITES_BACKEND,
+    engine,
+    get_db,
+    mark_recent_write,
+    write_markers,
+)
 from .routers import items, users, orders, admin, ai
-from .models import OrderItemCreate, User, OrderCreate
+from .ai.loader import AI_WARMUP_ON_STARTUP, start_warmup
+from .models import CartItem, User
+from .schema import log_missing_indexes
+from .services.cache import share_invalidations
+from .services.search_index import catalog_index
 from .auth import get_current_user
-from .services.order_services import create_order_service
-from .services.item_services import get_item_service
+from .services.checkout_services import (
+    build_line_items,
+    cart_quantities,
+    complete_checkout_service,
+    create_checkout_intent_service,
+    create_checkout_session_service,
+    discard_checkout_intent_service,
+)
+from .stripe_client import close_stripe_client, get_stripe_client
 from sqlmodel import Session
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 BASE_URL = os.getenv("BASE_URL")
@@ -37,17 +58,24 @@ FRONTEND_URL = os.getenv("FRONTEND_URL")
 if not all([STRIPE_SECRET_KEY, STRIPE_WEBHOOK_SECRET, BASE_URL, FRONTEND_URL]):
     raise Exception("Missing required Stripe configuration.")
 
-stripe.api_key = STRIPE_SECRET_KEY
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database tables on startup."""
-    create_db_and_tables()
+    """Report missing indexes, read the search index from the primary and warm up the assistant.
+
+    With shared write markers, response cache invalidations also reach the other
+    workers. No DDL runs here; apply migrations with `python -m backend.cli migrate`.
+    """
+    log_missing_indexes(engine)
+    catalog_index.set_primary(engine)
+    if READ_YOUR_WRITES_BACKEND == "redis":
+        share_invalidations(write_markers)
+    if AI_WARMUP_ON_STARTUP:
+        start_warmup()
     yield
+    await close_stripe_client()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 origins = [FRONTEND_URL]
 
@@ -58,6 +86,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(items.router)
 app.include_router(users.router)
@@ -78,55 +107,34 @@ async def auth_callback():
     return RedirectResponse(url="/myaccount")
 
 
-@app.post("/create-checkout-session/")
+@app.post(
+    "/create-checkout-session/",
+    dependencies=[Depends(admission_control("checkout", get_current_user))],
+)
 async def create_checkout_session(
-    request: Request,
+    cart: list[CartItem],
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """Create Stripe checkout session from user's cart."""
-    cart_items = await request.json()
-    item_id_to_qty = {item["id"]: item["qty"] for item in json.loads(cart_items)}
-    item_ids = list(item_id_to_qty.keys())
-
-    items = [get_item_service(item_id=item_id, db=db) for item_id in item_ids]
-
-    if len(items) != len(item_ids):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Some items in the cart do not exist.",
-        )
-
-    line_items = []
-    for item in items:
-        qty = item_id_to_qty.get(item.id, 1)
-        line_items.append(
-            {
-                "price_data": {
-                    "currency": "usd",
-                    "product_data": {"name": item.name},
-                    "unit_amount": int(item.price * 100),
-                },
-                "quantity": qty,
-            }
-        )
-
+    item_id_to_qty = cart_quantities(cart)
+    line_items = await run_in_threadpool(build_line_items, item_id_to_qty, db)
+    intent = await run_in_threadpool(
+        create_checkout_intent_service, current_user.id, item_id_to_qty, db
+    )
     try:
-        session = stripe.checkout.Session.create(
-            payment_method_types=["card"],
+        url = await create_checkout_session_service(
+            client=get_stripe_client(),
             line_items=line_items,
-            mode="payment",
-            success_url=f"{FRONTEND_URL}/callback/",
-            cancel_url=f"{FRONTEND_URL}/checkout",
-            metadata={
-                "user_id": str(current_user.id),
-                "cart_items": cart_items,
-            },
-            customer_email=current_user.email,
+            user=current_user,
+            metadata={"checkout_intent_id": intent.id},
+            frontend_url=FRONTEND_URL,
         )
-        return {"url": session.url}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Stripe error: " + str(e))
+    except Exception:
+        await run_in_threadpool(discard_checkout_intent_service, intent.id, db)
+        raise
+    mark_recent_write(current_user.id)
+    return {"url": url}
 
 
 @app.post("/webhook/")
@@ -150,22 +158,17 @@ async def stripe_webhook(
 
     if event["type"] == "checkout.session.completed":
         session = event["data"]["object"]
-        user_id = session["metadata"]["user_id"]
-        cart = session["metadata"]["cart_items"]
-        items = [
-            OrderItemCreate(item_id=item["id"], quantity=item["qty"])
-            for item in json.loads(cart)
-        ]
-        order_data = OrderCreate(
-            user_id=user_id,
-            items=items,
-            stripe_id=session["id"],
-            currency=session["currency"],
-            amount=session["amount_total"],
-            email=session["customer_email"],
-        )
         try:
-            create_order_service(order_data=order_data, db=db)
+            # Sync transaction (order, items and stats rollups): keep it off the event loop.
+            order = await run_in_threadpool(complete_checkout_service, session=session, db=db)
+            if order:
+                mark_recent_write(order["user_id"])
+        except HTTPException as exc:
+            if exc.status_code != 404:
+                raise
+            # Stripe retries every non-2xx answer for days; an unknown intent never appears.
+            logger.warning("Checkout session %s ignored: %s", session["id"], exc.detail)
+            return {"status": "ignored"}
         except Exception as exc:
             raise HTTPException(
                 status_code=500, detail="Order DB error: " + str(exc)
@@ -0,0 +1,148 @@
+"""
+Command line tools for store administration.
+Usage: python -m backend.cli <command> [options]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import httpx
+
+
+def import_items(args: argparse.Namespace) -> int:
+    """Stream a CSV/NDJSON catalog file to the bulk item endpoint."""
+    file_format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    with open(args.path, "rb") as feed:
+        response = httpx.post(
+            f"{args.url.rstrip('/')}/items/bulk",
+            params={"format": file_format},
+            content=iter(lambda: feed.read(64 * 1024), b""),
+            headers=headers,
+            timeout=None,
+        )
+    if response.is_error:
+        print(f"Import failed ({response.status_code}): {response.text}", file=sys.stderr)
+        return 1
+    print(json.dumps(response.json(), indent=2))
+    return 0
+
+
+def bench_assistant(args: argparse.Namespace) -> int:
+    """Replay chat scripts against the assistant graph and report latencies."""
+    if args.llm != "stub" and not args.recording:
+        print("--recording is required with --llm record/replay", file=sys.stderr)
+        return 2
+    from backend.ai.benchmark import main as run_benchmark
+
+    return run_benchmark(args)
+
+
+def migrate(args: argparse.Namespace) -> int:
+    """Apply database migrations, or print their SQL with --sql."""
+    from alembic import command
+    from backend.schema import alembic_config
+
+    command.upgrade(alembic_config(), args.revision, sql=args.sql)
+    return 0
+
+
+def check_indexes(args: argparse.Namespace) -> int:
+    """Report indexes that service queries rely on but the database lacks."""
+    from backend.database import engine
+    from backend.schema import missing_indexes
+
+    missing = missing_indexes(engine)
+    for entry in missing:
+        print(f"missing {entry['table']}({', '.join(entry['columns'])}): {entry['used_by']}")
+    if not missing:
+        print("All query indexes present.")
+    return 1 if missing else 0
+
+
+def archive_orders(args: argparse.Namespace) -> int:
+    """Move orders older than --days into the order archive."""
+    from datetime import datetime, timedelta, UTC
+
+    from backend.database import get_db_session
+    from backend.services.archive_services import archive_orders_service
+
+    before = datetime.now(UTC) - timedelta(days=args.days) if args.days else None
+    with get_db_session() as db:
+        print(json.dumps(archive_orders_service(db, before=before)))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="backend.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    items_parser = commands.add_parser(
+        "import-items", help="Bulk upsert items from a CSV or NDJSON file."
+    )
+    items_parser.add_argument("path", help="Path to the catalog file.")
+    items_parser.add_argument("--format", choices=["csv", "ndjson"])
+    items_parser.add_argument(
+        "--url", default=os.getenv("BASE_URL", "http://localhost:8000")
+    )
+    items_parser.add_argument(
+        "--token",
+        default=os.getenv("ADMIN_API_TOKEN"),
+        help="Bearer token with the modify:items permission.",
+    )
+    items_parser.set_defaults(handler=import_items)
+
+    bench_parser = commands.add_parser(
+        "bench-assistant", help="Load-test the assistant graph with chat scripts."
+    )
+    bench_parser.add_argument("corpus", help="JSON file of chat scripts.")
+    bench_parser.add_argument("--concurrency", type=int, default=4)
+    bench_parser.add_argument(
+        "--repeat", type=int, default=1, help="Times to replay the corpus."
+    )
+    bench_parser.add_argument(
+        "--llm", choices=["stub", "record", "replay"], default="stub"
+    )
+    bench_parser.add_argument("--recording", help="Recorded model responses (JSON).")
+    bench_parser.add_argument(
+        "--llm-latency", type=float, default=0.5, help="Stub model delay in seconds."
+    )
+    bench_parser.add_argument(
+        "--embed-latency", type=float, default=0.05, help="Stub embedding delay."
+    )
+    bench_parser.add_argument("--json", action="store_true", help="Print JSON.")
+    bench_parser.set_defaults(handler=bench_assistant)
+
+    migrate_parser = commands.add_parser(
+        "migrate", help="Apply database schema migrations."
+    )
+    migrate_parser.add_argument("--revision", default="head")
+    migrate_parser.add_argument(
+        "--sql", action="store_true", help="Print the SQL instead of running it."
+    )
+    migrate_parser.set_defaults(handler=migrate)
+
+    check_parser = commands.add_parser(
+        "check-indexes", help="List indexes missing for service queries."
+    )
+    check_parser.set_defaults(handler=check_indexes)
+
+    archive_parser = commands.add_parser(
+        "archive-orders", help="Move old orders out of the order tables."
+    )
+    archive_parser.add_argument(
+        "--days", type=int, help="Archive orders older than this (ORDER_ARCHIVE_AFTER_DAYS)."
+    )
+    archive_parser.set_defaults(handler=archive_orders)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
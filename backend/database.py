@@ -1,26 +1,102 @@
 """
 Database configuration and session management for the backend application.
 Provides SQLModel engine setup and session factories for dependency injection.
+Reads can optionally be routed to replicas listed in DATABASE_REPLICA_URLS.
+Read-your-writes markers live in process memory or, with
+READ_YOUR_WRITES_BACKEND=redis, in Redis so every worker honours them.
+The schema is managed by migrations (see backend/schema.py), not at startup.
 """
+import logging
 import os
+import time
+from itertools import cycle
+from threading import Lock
 
 from typing import Generator
-from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import Engine
+from sqlmodel import create_engine, Session
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+REPLICA_SELECTION = os.getenv("REPLICA_SELECTION", "round_robin")
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "300"))
+READ_YOUR_WRITES_BACKEND = os.getenv("READ_YOUR_WRITES_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+logger = logging.getLogger(__name__)
 
 if not DATABASE_URL:
     raise Exception("Missing DB URL")
 
+if REPLICA_SELECTION not in ("round_robin", "least_connections"):
+    raise Exception("REPLICA_SELECTION must be round_robin or least_connections")
+
+if READ_YOUR_WRITES_BACKEND not in ("memory", "redis"):
+    raise Exception("READ_YOUR_WRITES_BACKEND must be memory or redis")
+
 engine = create_engine(DATABASE_URL, echo=True)
+replica_engines = [create_engine(url, echo=True) for url in DATABASE_REPLICA_URLS]
+
+_replica_cycle = cycle(replica_engines)
+_replica_lock = Lock()
+
+
+class MemoryWriteMarkers:
+    """Per-process write markers; only correct with a single worker."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._until: dict[str, float] = {}
+
+    def mark(self, key: str, seconds: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for stale_key in [k for k, until in self._until.items() if until <= now]:
+                del self._until[stale_key]
+            self._until[key] = now + seconds
+
+    def is_marked(self, key: str) -> bool:
+        with self._lock:
+            return self._until.get(key, 0) > time.monotonic()
+
+
+class RedisWriteMarkers:
+    """Write markers shared by all workers as expiring Redis keys."""
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis
+        except ImportError as exc:
+            raise Exception("READ_YOUR_WRITES_BACKEND=redis requires the redis package") from exc
+        self._client = redis.from_url(url)
+
+    def mark(self, key: str, seconds: float) -> None:
+        try:
+            self._client.set(f"recentwrite:{key}", 1, px=int(seconds * 1000))
+        except Exception:
+            logger.warning("Write marker store unavailable", exc_info=True)
 
+    def is_marked(self, key: str) -> bool:
+        try:
+            return bool(self._client.exists(f"recentwrite:{key}"))
+        except Exception:
+            # Fail towards the primary: it is always up to date.
+            logger.warning("Write marker store unavailable, reading from primary", exc_info=True)
+            return True
 
-def create_db_and_tables():
-    """Create all database tables from SQLModel metadata."""
-    SQLModel.metadata.create_all(engine)
+
+write_markers = (
+    RedisWriteMarkers(REDIS_URL)
+    if READ_YOUR_WRITES_BACKEND == "redis"
+    else MemoryWriteMarkers()
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -31,4 +107,40 @@ def get_db() -> Generator[Session, None, None]:
 
 def get_db_session() -> Session:
     """Create a new database session for direct use."""
-    return Session(engine)
\ No newline at end of file
+    return Session(engine)
+
+
+def select_read_engine() -> Engine:
+    """Pick a replica engine for a read, falling back to the primary without replicas."""
+    if not replica_engines:
+        return engine
+    if REPLICA_SELECTION == "least_connections":
+        return min(
+            replica_engines,
+            key=lambda replica: getattr(replica.pool, "checkedout", lambda: 0)(),
+        )
+    with _replica_lock:
+        return next(_replica_cycle)
+
+
+def mark_recent_write(key: str) -> None:
+    """Pin reads for key (e.g. a user ID) to the primary for READ_YOUR_WRITES_SECONDS."""
+    write_markers.mark(key, READ_YOUR_WRITES_SECONDS)
+
+
+def has_recent_write(key: str) -> bool:
+    """Return whether key wrote recently enough that replicas may lag behind."""
+    return write_markers.is_marked(key)
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Dependency injection factory for read-only sessions, served by replicas if configured."""
+    with Session(select_read_engine()) as session:
+        yield session
+
+
+def get_read_db_for(key: str) -> Generator[Session, None, None]:
+    """Read-only session that stays on the primary while key has a recent write."""
+    read_engine = engine if has_recent_write(key) else select_read_engine()
+    with Session(read_engine) as session:
+        yield session
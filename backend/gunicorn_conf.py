@@ -0,0 +1,59 @@
+"""
+Gunicorn configuration for the multi-worker production launch mode.
+Usage: gunicorn -c backend/gunicorn_conf.py backend.app:app
+
+Workers are separate processes, so assistant chat histories and item
+embeddings are switched to the shared database backend (see
+backend/ai/shared_state.py) unless ASSISTANT_STATE_BACKEND is set explicitly.
+Response caches are per worker, so they are turned off (RESPONSE_CACHE_TTL=0)
+unless READ_YOUR_WRITES_BACKEND=redis shares their invalidations.
+The master applies database migrations once before forking workers; set
+MIGRATE_ON_START=false when a separate job runs them.
+"""
+
+import multiprocessing
+import os
+
+os.environ.setdefault("ASSISTANT_STATE_BACKEND", "database")
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "0"))
+accesslog = "-"
+
+if workers > 1 and os.getenv("READ_YOUR_WRITES_BACKEND", "memory") != "redis":
+    os.environ.setdefault("RESPONSE_CACHE_TTL", "0")
+migrate_on_start = os.getenv("MIGRATE_ON_START", "true").lower() == "true"
+
+
+def on_starting(server):
+    if (
+        workers > 1
+        and os.getenv("DATABASE_REPLICA_URLS")
+        and os.getenv("READ_YOUR_WRITES_BACKEND", "memory") != "redis"
+    ):
+        server.log.warning(
+            "Running %s workers with read replicas and READ_YOUR_WRITES_BACKEND=memory; "
+            "reads after a write may hit a lagging replica on another worker.",
+            workers,
+        )
+    if migrate_on_start:
+        from backend.database import engine
+        from backend.schema import upgrade_database
+
+        server.log.info("Applying database migrations")
+        upgrade_database()
+        # Workers are forked from the master; they must not inherit its connections.
+        engine.dispose()
+    if workers > 1 and os.environ["ASSISTANT_STATE_BACKEND"] != "database":
+        server.log.warning(
+            "Running %s workers with ASSISTANT_STATE_BACKEND=%s; chat history "
+            "will not be shared between workers.",
+            workers,
+            os.environ["ASSISTANT_STATE_BACKEND"],
+        )
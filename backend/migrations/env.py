@@ -0,0 +1,65 @@
+"""
+Alembic environment for the store database.
+Runs against the connection passed in config.attributes["connection"] when
+called from backend.schema, otherwise against DATABASE_URL.
+"""
+
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from dotenv import load_dotenv
+from sqlmodel import SQLModel
+
+from backend import models  # noqa: F401  (registers tables on SQLModel.metadata)
+
+config = context.config
+target_metadata = SQLModel.metadata
+
+if config.config_file_name and not config.attributes.get("connection"):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL for review instead of running it (alembic --sql)."""
+    load_dotenv()
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        raise Exception("Missing DB URL")
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=url.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is None:
+        from backend.database import engine
+
+        with engine.connect() as connection:
+            _run(connection)
+    else:
+        _run(connection)
+
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+        # Online index builds commit mid-migration, so keep each revision separate.
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
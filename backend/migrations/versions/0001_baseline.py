@@ -0,0 +1,135 @@
+"""Baseline schema, as previously created by SQLModel.metadata.create_all.
+
+Tables that already exist are left alone, so databases created by the old
+startup create_all are adopted by running this revision like any other.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _create_table(name: str, *columns, indexes=()) -> None:
+    """Create a table and its single-column (name, column, unique) indexes if missing."""
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table(name):
+        return
+    op.create_table(name, *columns)
+    for index_name, column, unique in indexes:
+        op.create_index(index_name, name, [column], unique=unique)
+
+
+def upgrade() -> None:
+    _create_table(
+        "item",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.String(length=500), nullable=True),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("image_src", sa.String(length=300), nullable=True),
+        indexes=[("ix_item_name", "name", False), ("ix_item_price", "price", False)],
+    )
+    _create_table(
+        "user",
+        sa.Column("id", sa.String(length=48), primary_key=True),
+        sa.Column("auth0_sub", sa.String(length=64), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        indexes=[
+            ("ix_user_auth0_sub", "auth0_sub", True),
+            ("ix_user_email", "email", False),
+        ],
+    )
+    _create_table(
+        "order",
+        sa.Column("id", sa.String(length=48), primary_key=True),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("stripe_id", sa.String(length=128), nullable=False),
+        sa.Column("currency", sa.String(length=10), nullable=True),
+        sa.Column("amount", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.String(length=48), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        indexes=[
+            ("ix_order_date", "date", False),
+            ("ix_order_stripe_id", "stripe_id", False),
+            ("ix_order_user_id", "user_id", False),
+            ("ix_order_email", "email", False),
+        ],
+    )
+    _create_table(
+        "orderitem",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("order_id", sa.String(length=48), sa.ForeignKey("order.id"), nullable=False),
+        sa.Column("item_id", sa.Integer(), sa.ForeignKey("item.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        indexes=[
+            ("ix_orderitem_order_id", "order_id", False),
+            ("ix_orderitem_item_id", "item_id", False),
+        ],
+    )
+    _create_table(
+        "chatsession",
+        sa.Column("user_id", sa.String(length=48), primary_key=True),
+        sa.Column("messages", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    _create_table(
+        "itemembedding",
+        sa.Column("item_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("chunks", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    _create_table(
+        "checkoutintent",
+        sa.Column("id", sa.String(length=48), primary_key=True),
+        sa.Column("user_id", sa.String(length=48), sa.ForeignKey("user.id"), nullable=False),
+        sa.Column("items", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        indexes=[("ix_checkoutintent_user_id", "user_id", False)],
+    )
+    _create_table(
+        "dailyrevenue",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("currency", sa.String(length=10), primary_key=True),
+        sa.Column("revenue", sa.Integer(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+    )
+    _create_table(
+        "itemsales",
+        sa.Column("item_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        indexes=[("ix_itemsales_units", "units", False)],
+    )
+    _create_table(
+        "customerspend",
+        sa.Column("user_id", sa.String(length=48), primary_key=True),
+        sa.Column("currency", sa.String(length=10), primary_key=True),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        indexes=[("ix_customerspend_total", "total", False)],
+    )
+
+
+def downgrade() -> None:
+    for name in (
+        "customerspend",
+        "itemsales",
+        "dailyrevenue",
+        "checkoutintent",
+        "itemembedding",
+        "chatsession",
+        "orderitem",
+        "order",
+        "user",
+        "item",
+    ):
+        op.drop_table(name)
@@ -0,0 +1,31 @@
+"""Composite indexes for per-user order listings and order item loads.
+
+(user_id, date) on order and (order_id, item_id) on orderitem replace the
+single-column user_id and order_id indexes, which are their prefixes. Both
+are built and dropped online (CONCURRENTLY on PostgreSQL).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from backend.schema import create_index_online, drop_index_online
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_online("ix_order_user_id_date", "order", ["user_id", "date"])
+    create_index_online("ix_orderitem_order_id_item_id", "orderitem", ["order_id", "item_id"])
+    drop_index_online("ix_order_user_id", "order")
+    drop_index_online("ix_orderitem_order_id", "orderitem")
+
+
+def downgrade() -> None:
+    create_index_online("ix_order_user_id", "order", ["user_id"])
+    create_index_online("ix_orderitem_order_id", "orderitem", ["order_id"])
+    drop_index_online("ix_order_user_id_date", "order")
+    drop_index_online("ix_orderitem_order_id_item_id", "orderitem")
@@ -0,0 +1,35 @@
+"""Archive table for orders moved out of order/orderitem.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "orderarchive",
+        sa.Column("id", sa.String(length=48), primary_key=True),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("user_id", sa.String(length=48), nullable=False),
+        sa.Column("stripe_id", sa.String(length=128), nullable=True),
+        sa.Column("currency", sa.String(length=10), nullable=True),
+        sa.Column("amount", sa.Integer(), nullable=True),
+        sa.Column("email", sa.String(length=255), nullable=True),
+        sa.Column("items", sa.LargeBinary(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_orderarchive_user_id_date", "orderarchive", ["user_id", "date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orderarchive_user_id_date", table_name="orderarchive")
+    op.drop_table("orderarchive")
@@ -0,0 +1,23 @@
+"""Widen the user email index to (email, id) for keyset-paginated listings.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from backend.schema import create_index_online, drop_index_online
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_online("ix_user_email_id", "user", ["email", "id"])
+    drop_index_online("ix_user_email", "user")
+
+
+def downgrade() -> None:
+    create_index_online("ix_user_email", "user", ["email"])
+    drop_index_online("ix_user_email_id", "user")
@@ -0,0 +1,21 @@
+"""Index itemembedding.updated_at for incremental shared index polling.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from backend.schema import create_index_online, drop_index_online
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_online("ix_itemembedding_updated_at", "itemembedding", ["updated_at"])
+
+
+def downgrade() -> None:
+    drop_index_online("ix_itemembedding_updated_at", "itemembedding")
@@ -0,0 +1,28 @@
+"""Add item.updated_at so search indexes can poll for changes from other workers.
+
+Existing rows keep NULL; they are picked up by full index loads.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.schema import create_index_online, drop_index_online
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("item", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    create_index_online("ix_item_updated_at", "item", ["updated_at"])
+
+
+def downgrade() -> None:
+    drop_index_online("ix_item_updated_at", "item")
+    op.drop_column("item", "updated_at")
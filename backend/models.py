@@ -5,9 +5,12 @@ Relationships between entities are established for ORM operations.
 """
 
 import uuid
-from datetime import datetime, UTC
+from datetime import date, datetime, UTC
 
-from pydantic import BaseModel
+from typing import Iterable
+
+from pydantic import BaseModel, PrivateAttr
+from sqlalchemy import Index, LargeBinary, Text
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -24,23 +27,33 @@ class Item(SQLModel, table=True):
     description: str | None = Field(default=None, max_length=500)
     price: float = Field(default=None, index=True)
     image_src: str | None = Field(default=None, max_length=300)
+    # Lets every worker's search index pick up changes made elsewhere (see search_index).
+    updated_at: datetime | None = Field(
+        default_factory=utc_now, index=True, sa_column_kwargs={"onupdate": utc_now}
+    )
     order_items: list["OrderItem"] = Relationship(back_populates="item")
 
 
 class User(SQLModel, table=True):
     """User model with Auth0 integration and order history."""
 
+    # (email, id) serves email lookups, prefix search and keyset pages in one index.
+    __table_args__ = (Index("ix_user_email_id", "email", "id"),)
+
     id: str = Field(
         default_factory=lambda: str(uuid.uuid4()), primary_key=True, max_length=48
     )
     auth0_sub: str = Field(index=True, unique=True, max_length=64)
-    email: str = Field(index=True, max_length=255)
+    email: str = Field(max_length=255)
     orders: list["Order"] = Relationship(back_populates="user")
 
 
 class Order(SQLModel, table=True):
     """Order model tracking purchases with Stripe id integration. Amount is in cents."""
 
+    # (user_id, date) serves per-user order listings and makes a user_id index redundant.
+    __table_args__ = (Index("ix_order_user_id_date", "user_id", "date"),)
+
     id: str = Field(
         default_factory=lambda: str(uuid.uuid4()), primary_key=True, max_length=48
     )
@@ -48,7 +61,7 @@ class Order(SQLModel, table=True):
     stripe_id: str = Field(default=None, index=True, max_length=128)
     currency: str | None = Field(default="USD", max_length=10)
     amount: int = Field(default=None)
-    user_id: str = Field(foreign_key="user.id", index=True, max_length=48)
+    user_id: str = Field(foreign_key="user.id", max_length=48)
     user: User = Relationship(back_populates="orders")
     order_items: list["OrderItem"] = Relationship(back_populates="order")
     email: str = Field(default=None, index=True, max_length=255)
@@ -57,14 +70,88 @@ class Order(SQLModel, table=True):
 class OrderItem(SQLModel, table=True):
     """Links orders to items with quantity."""
 
+    # (order_id, item_id) serves order item loads and makes an order_id index redundant.
+    __table_args__ = (Index("ix_orderitem_order_id_item_id", "order_id", "item_id"),)
+
     id: int | None = Field(default=None, primary_key=True)
-    order_id: str = Field(foreign_key="order.id", index=True, max_length=48)
+    order_id: str = Field(foreign_key="order.id", max_length=48)
     order: Order = Relationship(back_populates="order_items")
     item_id: int = Field(foreign_key="item.id", index=True)
     item: Item = Relationship(back_populates="order_items")
     quantity: int = Field(default=1)
 
 
+class OrderArchive(SQLModel, table=True):
+    """Order moved out of the hot order tables; items are a zlib-compressed JSON snapshot."""
+
+    __table_args__ = (Index("ix_orderarchive_user_id_date", "user_id", "date"),)
+
+    id: str = Field(primary_key=True, max_length=48)
+    date: datetime
+    user_id: str = Field(max_length=48)
+    stripe_id: str | None = Field(default=None, max_length=128)
+    currency: str | None = Field(default=None, max_length=10)
+    amount: int | None = Field(default=None)
+    email: str | None = Field(default=None, max_length=255)
+    items: bytes = Field(sa_type=LargeBinary)
+    archived_at: datetime = Field(default_factory=utc_now)
+
+
+class ChatSession(SQLModel, table=True):
+    """Serialized assistant conversation history shared across workers."""
+
+    user_id: str = Field(primary_key=True, max_length=48)
+    messages: str = Field(default="[]", sa_type=Text)
+    updated_at: datetime = Field(default_factory=utc_now)
+
+
+class ItemEmbedding(SQLModel, table=True):
+    """Cached embedding chunks for an item, keyed by a hash of its indexed content."""
+
+    item_id: int = Field(primary_key=True)
+    content_hash: str = Field(max_length=64)
+    chunks: str = Field(default="[]", sa_type=Text)
+    updated_at: datetime = Field(default_factory=utc_now, index=True)
+
+
+class CheckoutIntent(SQLModel, table=True):
+    """Cart captured at checkout; Stripe metadata carries only this id."""
+
+    id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()), primary_key=True, max_length=48
+    )
+    user_id: str = Field(foreign_key="user.id", index=True, max_length=48)
+    items: str = Field(default="[]", sa_type=Text)
+    created_at: datetime = Field(default_factory=utc_now)
+    completed_at: datetime | None = Field(default=None)
+
+
+class DailyRevenue(SQLModel, table=True):
+    """Rollup of order revenue (cents) and order count per UTC day and currency."""
+
+    day: date = Field(primary_key=True)
+    currency: str = Field(primary_key=True, max_length=10)
+    revenue: int = Field(default=0)
+    orders: int = Field(default=0)
+
+
+class ItemSales(SQLModel, table=True):
+    """Rollup of units sold and orders containing each item."""
+
+    item_id: int = Field(primary_key=True)
+    units: int = Field(default=0, index=True)
+    orders: int = Field(default=0)
+
+
+class CustomerSpend(SQLModel, table=True):
+    """Rollup of order count and total spend (cents) per user and currency."""
+
+    user_id: str = Field(primary_key=True, max_length=48)
+    currency: str = Field(primary_key=True, max_length=10)
+    total: int = Field(default=0, index=True)
+    orders: int = Field(default=0)
+
+
 class OrderItemCreate(BaseModel):
     """Schema for creating order items with item ID and quantity."""
 
@@ -82,8 +169,84 @@ class OrderCreate(BaseModel):
     amount: int
     email: str
 
+
+class OrderSelection(BaseModel):
+    """Selects orders for bulk operations by explicit IDs and/or filters (ANDed)."""
+
+    ids: list[str] | None = None
+    user_id: str | None = None
+    email: str | None = None
+    before: datetime | None = None
+    after: datetime | None = None
+
+
+class OrderBulkUpdate(BaseModel):
+    """Schema for setting the given fields on every selected order."""
+
+    selection: OrderSelection
+    user_id: str | None = None
+    email: str | None = None
+    currency: str | None = None
+
+
+class UserSelection(BaseModel):
+    """Selects users for bulk operations by explicit IDs and/or email (ANDed)."""
+
+    ids: list[str] | None = None
+    email: str | None = None
+
+
+class UserBulkUpdate(BaseModel):
+    """Schema for setting the given fields on every selected user."""
+
+    selection: UserSelection
+    email: str | None = None
+
+
 class CartItem(BaseModel):
     """Cart item with product ID and quantity."""
 
     id: int
     qty: int
+
+
+class Cart(BaseModel):
+    """Shopping cart sent with assistant requests.
+
+    Keeps a private id index so batch adds are O(1) per item and a batch removal
+    rebuilds the items list once; the wire format stays a plain list of CartItems.
+    """
+
+    items: list[CartItem]
+    _index: dict[int, CartItem] | None = PrivateAttr(default=None)
+
+    def _get_index(self) -> dict[int, CartItem]:
+        if self._index is None or len(self._index) != len(self.items):
+            index: dict[int, CartItem] = {}
+            for cart_item in self.items:
+                if cart_item.id in index:
+                    index[cart_item.id].qty += cart_item.qty
+                else:
+                    index[cart_item.id] = cart_item
+            self.items = list(index.values())
+            self._index = index
+        return self._index
+
+    def add_items(self, item_quantities: Iterable[tuple[int, int]]) -> "Cart":
+        """Add (item id, quantity) pairs, merging into existing lines."""
+        index = self._get_index()
+        for item_id, qty in item_quantities:
+            if item_id in index:
+                index[item_id].qty += qty
+            else:
+                index[item_id] = CartItem(id=item_id, qty=qty)
+                self.items.append(index[item_id])
+        return self
+
+    def remove_items(self, item_ids: Iterable[int]) -> "Cart":
+        """Remove every line for the given item ids."""
+        index = self._get_index()
+        removed = [index.pop(item_id) for item_id in set(item_ids) if item_id in index]
+        if removed:
+            self.items = list(index.values())
+        return self
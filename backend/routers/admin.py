@@ -4,25 +4,98 @@ Provides endpoints for administrative actions.
 get:orders and get:users are configured as admin-level permissions on Auth0.
 """
 
-from fastapi import APIRouter, Depends
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
-from backend.database import get_db
+from backend.admission import admission_control
+from backend.database import get_db, get_read_db, select_read_engine
 from backend.auth import require_permissions
-from backend.services.order_services import get_orders_admin_service
-from backend.services.user_services import get_users_service
+from backend.services.order_services import get_orders_admin_json_service
+from backend.services.user_services import (
+    USER_PAGE_SIZE,
+    get_users_page_service,
+    iter_users_ndjson_service,
+)
+from backend.services.stats_services import (
+    get_revenue_by_day_service,
+    get_top_customers_service,
+    get_top_items_service,
+    rebuild_stats_service,
+)
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# Admission control depends on the permission check, so both run as one dependency.
+orders_admission = admission_control("admin", require_permissions(["get:orders"]))
+users_admission = admission_control("admin", require_permissions(["get:users"]))
+orders_write_admission = admission_control(
+    "admin", require_permissions(["modify:orders"])
+)
+
 
-@router.get("/orders/", dependencies=[Depends(require_permissions(["get:orders"]))])
-async def get_all_orders(db: Session = Depends(get_db)):
+# Plain def handlers run in the threadpool, so slow queries do not block the event loop.
+@router.get("/orders/", dependencies=[Depends(orders_admission)])
+def get_all_orders(
+    fields: str | None = Query(None, description="Comma-separated fields, e.g. items.name"),
+    db: Session = Depends(get_read_db),
+):
     """Get all orders for admin dashboard."""
-    orders = get_orders_admin_service(db)
-    return {"orders": orders}
+    body = get_orders_admin_json_service(db, fields)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/users/", dependencies=[Depends(users_admission)])
+def get_users(
+    limit: int = Query(USER_PAGE_SIZE, ge=1, le=500),
+    cursor: str | None = None,
+    email: str | None = Query(None, min_length=1, description="Email prefix"),
+    db: Session = Depends(get_read_db),
+):
+    """Get a page of users with order counts; pass the returned next cursor for more."""
+    return get_users_page_service(db, limit=limit, cursor=cursor, email_prefix=email)
+
+
+@router.get("/users/export", dependencies=[Depends(users_admission)])
+def export_users(email: str | None = Query(None, min_length=1)):
+    """Stream all users (optionally by email prefix) with order counts as NDJSON."""
+
+    def body():
+        # The stream outlives request dependencies, so it owns its session.
+        with Session(select_read_engine()) as db:
+            yield from iter_users_ndjson_service(db, email_prefix=email)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@router.get("/stats/revenue", dependencies=[Depends(orders_admission)])
+def get_revenue_stats(
+    start: date | None = None,
+    end: date | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """Revenue in cents and order count per day (last 30 days by default)."""
+    return {"revenue": get_revenue_by_day_service(db, start=start, end=end)}
+
+
+@router.get("/stats/items", dependencies=[Depends(orders_admission)])
+def get_item_stats(
+    limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_read_db)
+):
+    """Best-selling items by units sold."""
+    return {"items": get_top_items_service(db, limit=limit)}
+
+
+@router.get("/stats/customers", dependencies=[Depends(orders_admission)])
+def get_customer_stats(
+    limit: int = Query(20, ge=1, le=100), db: Session = Depends(get_read_db)
+):
+    """Customers with the highest total spend."""
+    return {"customers": get_top_customers_service(db, limit=limit)}
 
 
-@router.get("/users/", dependencies=[Depends(require_permissions(["get:users"]))])
-async def get_users(db: Session = Depends(get_db)):
-    """Get all users for admin management."""
-    users = get_users_service(db)
-    return {"users": users}
+@router.post("/stats/rebuild", dependencies=[Depends(orders_write_admission)])
+def rebuild_stats(db: Session = Depends(get_db)):
+    """Recompute the statistics rollups from all orders."""
+    return rebuild_stats_service(db)
@@ -1,10 +1,10 @@
 from pydantic import BaseModel
 from fastapi import APIRouter, Depends
-from backend.ai.app import ask_question
+from fastapi.concurrency import run_in_threadpool
+from backend.admission import admission_control
+from backend.ai.loader import get_assistant, get_warmup_status, is_assistant_loaded
 from backend.auth import get_current_user
-from backend.models import User
-from backend.ai.models import Cart
-from backend.ai.session import set_session_history
+from backend.models import User, Cart
 
 router = APIRouter(prefix="/assistant", tags=["assistant"])
 
@@ -14,17 +14,50 @@ class ChatMessage(BaseModel):
     cart: Cart
 
 
-@router.post("/ask/")
+@router.post(
+    "/ask/", dependencies=[Depends(admission_control("assistant", get_current_user))]
+)
 async def ask_assistant(
     request: ChatMessage,
     current_user: User = Depends(get_current_user),
 ):
-    return ask_question(
-        question=request.message, user_id=current_user.id, cart=request.cart
+    assistant = await run_in_threadpool(get_assistant)
+    # The graph blocks on model calls; keep it off the event loop.
+    return await run_in_threadpool(
+        assistant.ask_question,
+        question=request.message,
+        user_id=current_user.id,
+        cart=request.cart,
     )
 
 
 @router.delete("/ask/")
 async def clear_chat_history(current_user: User = Depends(get_current_user)):
-    set_session_history(user_id=current_user.id, messages=[])
+    # The history store needs no model, so clearing never waits for (or triggers) a
+    # warm-up; with the database backend it also clears histories kept for other workers.
+    from backend.ai.shared_state import history_store
+
+    await run_in_threadpool(history_store.set, current_user.id, [])
     return {"message": f"History for user id {current_user.id} deleted successfully"}
+
+
+@router.get("/ready")
+async def assistant_readiness():
+    """Report assistant warm-up progress; the store API does not depend on it."""
+    return get_warmup_status()
+
+
+@router.get("/indexing")
+async def assistant_indexing_status():
+    """Report background indexing queue depth and throughput."""
+    if not is_assistant_loaded():
+        return {"running": False, "queue_depth": 0}
+    return get_assistant().indexing_status()
+
+
+@router.get("/metrics")
+async def assistant_metrics():
+    """Per-node latency percentiles and LLM usage per chat turn."""
+    if not is_assistant_loaded():
+        return {"nodes": {}, "turns": 0}
+    return get_assistant().assistant_metrics()
@@ -4,36 +4,51 @@ Provides endpoints for item CRUD operations with permission-based access control
 modify:items is configured as an admin-level permission on Auth0.
 """
 
-from fastapi import APIRouter, Depends, Query
+import io
+import tempfile
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from backend.models import Item
-from backend.database import get_db
+from backend.database import get_db, get_read_db
 from backend.auth import require_permissions
 from backend.services.item_services import (
-    get_items_service,
+    get_items_json_service,
     get_item_service,
     create_item_service,
     delete_item_service,
     update_item_service,
+    bulk_import_items_service,
 )
 
 router = APIRouter(prefix="/items", tags=["items"])
 
+BULK_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
 
 @router.get("/")
 async def get_items(
-    search: str = Query("", description="Search items by name"),
-    db: Session = Depends(get_db),
+    search: str = Query(
+        "",
+        description="Search terms; every term must prefix-match a word of the name or description",
+    ),
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    db: Session = Depends(get_read_db),
 ):
     """Get all items with optional search filtering."""
-    items = get_items_service(search, db)
-    return {"items": items}
+    body = get_items_json_service(search, db, fields)
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{item_id}")
-async def get_item(item_id: int, db: Session = Depends(get_db)):
+async def get_item(
+    item_id: int,
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    db: Session = Depends(get_read_db),
+):
     """Get a single item by ID."""
-    item = get_item_service(item_id, db)
+    item = get_item_service(item_id, db, fields)
     return {"item": item}
 
 
@@ -47,6 +62,22 @@ async def create_item(
     return {"item": new_item}
 
 
+@router.post("/bulk", dependencies=[Depends(require_permissions(["modify:items"]))])
+async def bulk_import_items(
+    request: Request,
+    file_format: str = Query("ndjson", alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+):
+    """Upsert items from a streamed CSV or NDJSON body and report per-row errors."""
+    with tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_MAX_SIZE) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        stream = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+        # Parsing and upserting are synchronous; keep them off the event loop.
+        return await run_in_threadpool(bulk_import_items_service, stream, file_format, db)
+
+
 @router.delete(
     "/{item_id}", dependencies=[Depends(require_permissions(["modify:items"]))]
 )
@@ -4,35 +4,54 @@ Provides endpoints for order CRUD operations with permission-based access contro
 get:order and modify:orders are configured as admin-level permissions on Auth0
 """
 
-from fastapi import APIRouter, Depends
+from typing import Generator
+
+from fastapi import APIRouter, Depends, Query, Response
 from sqlmodel import Session
-from backend.models import OrderCreate, User
-from backend.database import get_db
+from backend.models import OrderCreate, User, OrderSelection, OrderBulkUpdate
+from backend.database import get_db, get_read_db_for
 from backend.auth import require_permissions, get_current_user
 from backend.services.order_services import (
-    get_user_orders_service,
+    get_user_orders_json_service,
     get_order_by_id_service,
     create_order_service,
     update_order_service,
     delete_order_service,
+    bulk_delete_orders_service,
+    bulk_update_orders_service,
 )
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
+def get_my_orders_db(
+    current_user: User = Depends(get_current_user),
+) -> Generator[Session, None, None]:
+    """Read session for the user's own orders, pinned to the primary after checkout."""
+    yield from get_read_db_for(current_user.id)
+
+
 @router.get("/")
 async def get_my_orders(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    fields: str | None = Query(None, description="Comma-separated fields, e.g. items.name"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_my_orders_db),
 ):
     """Get all orders for the authenticated user."""
-    orders = get_user_orders_service(current_user, db)
-    return {"orders": orders}
+    body = get_user_orders_json_service(current_user, db, fields)
+    return Response(content=body, media_type="application/json")
 
 
+# Plain def: the lookup, archive fallback and field selection are synchronous
+# database work, so FastAPI runs it in the threadpool instead of on the event loop.
 @router.get("/{order_id}", dependencies=[Depends(require_permissions(["get:order"]))])
-def get_order(order_id: int, db: Session = Depends(get_db)):
+def get_order(
+    order_id: int,
+    fields: str | None = Query(None, description="Comma-separated fields, e.g. items.name"),
+    db: Session = Depends(get_db),
+):
     """Get a single order by ID."""
-    order_details = get_order_by_id_service(order_id, db)
+    order_details = get_order_by_id_service(order_id, db, fields)
     return {"order": order_details}
 
 
@@ -43,6 +62,24 @@ async def create_order(order: OrderCreate, db: Session = Depends(get_db)):
     return {"order": order_details}
 
 
+@router.post(
+    "/bulk-delete", dependencies=[Depends(require_permissions(["modify:orders"]))]
+)
+async def bulk_delete_orders(selection: OrderSelection, db: Session = Depends(get_db)):
+    """Delete every order matching the selection."""
+    return bulk_delete_orders_service(selection, db)
+
+
+@router.post(
+    "/bulk-update", dependencies=[Depends(require_permissions(["modify:orders"]))]
+)
+async def bulk_update_orders(
+    order_update: OrderBulkUpdate, db: Session = Depends(get_db)
+):
+    """Set fields on every order matching the selection."""
+    return bulk_update_orders_service(order_update, db)
+
+
 @router.put(
     "/{order_id}", dependencies=[Depends(require_permissions(["modify:orders"]))]
 )
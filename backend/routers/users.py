@@ -4,17 +4,20 @@ Provides CRUD endpoints with permission-based access control.
 All permissions are configured as admin-level on Auth0.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlmodel import Session
-from backend.models import User
-from backend.database import get_db
+from backend.models import User, UserSelection, UserBulkUpdate
+from backend.database import get_db, get_read_db
 from backend.auth import require_permissions
 from backend.services.user_services import (
-    get_users_service,
+    USER_PAGE_SIZE,
+    get_users_page_service,
     get_user_service,
     create_user_service,
     update_user_service,
     delete_user_service,
+    bulk_delete_users_service,
+    bulk_update_users_service,
 )
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -23,10 +26,14 @@ router = APIRouter(prefix="/users", tags=["users"])
 @router.get(
     "/", dependencies=[Depends(require_permissions(["get:users"]))]
 )
-async def get_users(db: Session = Depends(get_db)):
-    """Get all users."""
-    users = get_users_service(db)
-    return {"users": users}
+def get_users(
+    limit: int = Query(USER_PAGE_SIZE, ge=1, le=500),
+    cursor: str | None = None,
+    email: str | None = Query(None, min_length=1, description="Email prefix"),
+    db: Session = Depends(get_read_db),
+):
+    """Get a page of users by email; pass the returned next cursor for more."""
+    return get_users_page_service(db, limit=limit, cursor=cursor, email_prefix=email)
 
 
 @router.get("/{user_id}", dependencies=[Depends(require_permissions(["get:user"]))])
@@ -43,6 +50,22 @@ async def create_user(user: User, db: Session = Depends(get_db)):
     return {"user": new_user}
 
 
+@router.post(
+    "/bulk-delete", dependencies=[Depends(require_permissions(["modify:users"]))]
+)
+async def bulk_delete_users(selection: UserSelection, db: Session = Depends(get_db)):
+    """Delete every user matching the selection, along with their orders."""
+    return bulk_delete_users_service(selection, db)
+
+
+@router.post(
+    "/bulk-update", dependencies=[Depends(require_permissions(["modify:users"]))]
+)
+async def bulk_update_users(user_update: UserBulkUpdate, db: Session = Depends(get_db)):
+    """Set fields on every user matching the selection."""
+    return bulk_update_users_service(user_update, db)
+
+
 @router.put("/{user_id}", dependencies=[Depends(require_permissions(["modify:users"]))])
 async def update_user(user_id: int, user: User, db: Session = Depends(get_db)):
     """Update an existing user."""
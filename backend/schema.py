@@ -0,0 +1,144 @@
+"""
+Schema migrations and index checks for the store database.
+Migrations live in backend/migrations (Alembic) and run as a deploy step via
+`python -m backend.cli migrate`; the app itself never issues DDL. Indexes on
+large tables are built with the online helpers below so they do not block
+writes, and QUERY_INDEXES lists the index each service query relies on so
+missing ones can be reported by `python -m backend.cli check-indexes` and at
+startup.
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Sequence
+
+import sqlalchemy as sa
+from alembic import command, op
+from alembic.config import Config
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "alembic.ini")
+
+# (table, leading columns, query relying on it). An index, primary key or unique
+# constraint whose columns start with the listed ones satisfies the requirement.
+QUERY_INDEXES = [
+    ("user", ("auth0_sub",), "auth.get_current_user lookup by Auth0 subject"),
+    ("user", ("email", "id"), "user pages, email prefix search and bulk selection"),
+    ("order", ("user_id", "date"), "get_user_orders_service and user bulk deletes"),
+    ("order", ("date",), "order bulk selection by date range"),
+    ("order", ("email",), "order bulk selection by email"),
+    ("orderitem", ("order_id", "item_id"), "order item loads and stats rollups"),
+    ("orderitem", ("item_id",), "item deletes and item sales lookups"),
+    ("orderarchive", ("user_id", "date"), "archived orders in get_user_orders_service"),
+    ("checkoutintent", ("user_id",), "user bulk deletes"),
+    ("itemsales", ("units",), "get_top_items_service"),
+    ("customerspend", ("total",), "get_top_customers_service"),
+    ("dailyrevenue", ("day",), "get_revenue_by_day_service"),
+    ("itemembedding", ("updated_at",), "shared assistant index polling"),
+    ("item", ("updated_at",), "search index polling for changes made by other workers"),
+]
+
+
+def alembic_config(connection: sa.Connection | None = None) -> Config:
+    """Alembic config for backend/migrations, optionally bound to a connection."""
+    config = Config(ALEMBIC_INI)
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(revision: str = "head", connection: sa.Connection | None = None) -> None:
+    """Apply migrations up to revision, against DATABASE_URL unless a connection is given.
+
+    A given connection must not be inside a transaction; each revision runs in its own.
+    """
+    command.upgrade(alembic_config(connection), revision)
+
+
+def _has_index(table: str, name: str) -> bool:
+    return any(
+        index["name"] == name for index in sa.inspect(op.get_bind()).get_indexes(table)
+    )
+
+
+def _drop_invalid_postgres_index(name: str) -> None:
+    # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind.
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def create_index_online(
+    name: str, table: str, columns: Sequence[str], unique: bool = False
+) -> None:
+    """Create an index inside a migration without blocking writes where supported.
+
+    PostgreSQL builds it with CREATE INDEX CONCURRENTLY, which must run outside
+    the migration transaction, so the statement runs in an autocommit block.
+    Re-running after a failed build replaces the invalid leftover.
+    """
+    context = op.get_context()
+    with context.autocommit_block():
+        if not context.as_sql:
+            if context.dialect.name == "postgresql":
+                _drop_invalid_postgres_index(name)
+            if _has_index(table, name):
+                return
+        op.create_index(name, table, list(columns), unique=unique, postgresql_concurrently=True)
+
+
+def drop_index_online(name: str, table: str) -> None:
+    """Drop an index inside a migration, with DROP INDEX CONCURRENTLY on PostgreSQL."""
+    context = op.get_context()
+    with context.autocommit_block():
+        if context.as_sql or _has_index(table, name):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def _covering_column_lists(inspector, table: str) -> List[List[str]]:
+    column_lists = [index["column_names"] for index in inspector.get_indexes(table)]
+    column_lists.append(inspector.get_pk_constraint(table)["constrained_columns"])
+    column_lists.extend(
+        constraint["column_names"] for constraint in inspector.get_unique_constraints(table)
+    )
+    return column_lists
+
+
+def missing_indexes(bind: sa.Engine | sa.Connection) -> List[Dict[str, Any]]:
+    """Return the QUERY_INDEXES entries not covered by an index in the database."""
+    inspector = sa.inspect(bind)
+    covering: Dict[str, List[List[str]]] = {}
+    missing = []
+    for table, columns, used_by in QUERY_INDEXES:
+        if table not in covering:
+            covering[table] = (
+                _covering_column_lists(inspector, table) if inspector.has_table(table) else []
+            )
+        if not any(
+            column_list[: len(columns)] == list(columns) for column_list in covering[table]
+        ):
+            missing.append({"table": table, "columns": list(columns), "used_by": used_by})
+    return missing
+
+
+def log_missing_indexes(bind: sa.Engine | sa.Connection) -> None:
+    """Warn about missing indexes; never fails, since it only runs as a startup hint."""
+    try:
+        missing = missing_indexes(bind)
+    except Exception:
+        logger.warning("Could not inspect database indexes", exc_info=True)
+        return
+    for entry in missing:
+        logger.warning(
+            "Missing index on %s(%s) used by %s; run `python -m backend.cli migrate`",
+            entry["table"],
+            ", ".join(entry["columns"]),
+            entry["used_by"],
+        )
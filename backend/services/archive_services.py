@@ -0,0 +1,105 @@
+"""
+Service functions for archiving historical orders.
+Moves orders older than a cutoff out of the order and orderitem tables into
+orderarchive, one row per order with its items as a compressed JSON snapshot,
+so the hot tables and their indexes stay bounded by the retention window.
+Archived orders are read back in the same shape as get_order_details and
+still count towards the statistics rollups.
+"""
+
+import os
+import zlib
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, List
+
+import orjson
+from sqlmodel import Session, select, delete
+from sqlalchemy.orm import selectinload
+from ..models import Order, OrderArchive, OrderItem
+from .cache import dump_json, orders_cache
+from .events import publish, ORDERS_CHANGED
+from .utils import get_order_details, BULK_CHUNK_SIZE
+
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "365"))
+
+
+def compress_items(items: List[Dict[str, Any]]) -> bytes:
+    return zlib.compress(dump_json(items))
+
+
+def decompress_items(payload: bytes) -> List[Dict[str, Any]]:
+    return orjson.loads(zlib.decompress(payload))
+
+
+def archive_order_row(order: Order) -> OrderArchive:
+    """Snapshot an order with eager-loaded items as an archive row."""
+    return OrderArchive(
+        id=order.id,
+        date=order.date,
+        user_id=order.user_id,
+        stripe_id=order.stripe_id,
+        currency=order.currency,
+        amount=order.amount,
+        email=order.email,
+        items=compress_items(get_order_details(order)["items"]),
+    )
+
+
+def get_archived_order_details(row: OrderArchive) -> Dict[str, Any]:
+    """Archived order in the get_order_details response format."""
+    return {
+        "id": row.id,
+        "date": row.date,
+        "user_id": row.user_id,
+        "stripe_id": row.stripe_id,
+        "items": decompress_items(row.items),
+    }
+
+
+def get_user_archived_orders_service(user_id: str, db: Session) -> List[Dict[str, Any]]:
+    """Retrieve a user's archived orders, newest first."""
+    rows = db.exec(
+        select(OrderArchive)
+        .where(OrderArchive.user_id == user_id)
+        .order_by(OrderArchive.date.desc())
+    ).all()
+    return [get_archived_order_details(row) for row in rows]
+
+
+def get_archived_order_service(order_id: str, db: Session) -> Dict[str, Any] | None:
+    """Retrieve one archived order, or None if it is not archived."""
+    row = db.get(OrderArchive, order_id)
+    return get_archived_order_details(row) if row else None
+
+
+def archive_orders_service(
+    db: Session, before: datetime | None = None, chunk_size: int = BULK_CHUNK_SIZE
+) -> Dict[str, int]:
+    """Move orders dated before the cutoff into the archive, committing per chunk.
+
+    The cutoff defaults to ORDER_ARCHIVE_AFTER_DAYS ago. Rollups are left as
+    they are, since archived orders keep counting towards the statistics.
+    """
+    before = before or datetime.now(UTC) - timedelta(days=ORDER_ARCHIVE_AFTER_DAYS)
+    archived = 0
+    while True:
+        orders = db.exec(
+            select(Order)
+            .where(Order.date < before)
+            .order_by(Order.date)
+            .limit(chunk_size)
+            .options(selectinload(Order.order_items).selectinload(OrderItem.item))
+        ).all()
+        if not orders:
+            break
+        order_ids = [order.id for order in orders]
+        db.add_all([archive_order_row(order) for order in orders])
+        db.flush()
+        db.exec(delete(OrderItem).where(OrderItem.order_id.in_(order_ids)))
+        db.exec(delete(Order).where(Order.id.in_(order_ids)))
+        db.commit()
+        archived += len(order_ids)
+        publish(ORDERS_CHANGED, order_ids)
+    if archived:
+        orders_cache.invalidate()
+    return {"archived": archived}
@@ -0,0 +1,90 @@
+"""
+In-process caches for pre-serialized JSON response bodies.
+List endpoints store orjson-encoded bytes so repeated reads skip per-object encoding.
+Each worker has its own caches. With several workers, invalidations are shared
+through the write-marker store (see share_invalidations); without one, the
+gunicorn config sets RESPONSE_CACHE_TTL=0, which turns caching off.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+import orjson
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize plain data (dicts, lists, datetimes) to JSON bytes with orjson."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class BytesCache:
+    """Bounded LRU cache of serialized bodies with a time-to-live per entry."""
+
+    def __init__(self, name: str, max_entries: int, ttl: float = RESPONSE_CACHE_TTL) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.markers = None
+        self._entries: OrderedDict[Hashable, tuple[float, bytes]] = OrderedDict()
+        self._lock = Lock()
+
+    def _changed_elsewhere(self) -> bool:
+        """Whether any worker invalidated this cache within the last ttl seconds.
+
+        Entries cached before that invalidation may still be live here, so the
+        body is rebuilt (and not stored) until they have all expired.
+        """
+        return self.markers is not None and self.markers.is_marked(f"cache:{self.name}")
+
+    def get_or_set(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        """Return the cached body for key, building and storing it on a miss."""
+        if self.ttl <= 0 or self._changed_elsewhere():
+            return build()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+        body = build()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+    def invalidate(self, predicate: Callable[[Hashable], bool] | None = None) -> None:
+        """Drop entries whose key matches predicate, or every entry if none is given."""
+        if self.markers is not None:
+            self.markers.mark(f"cache:{self.name}", self.ttl)
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+
+items_cache = BytesCache("items", max_entries=128)
+orders_cache = BytesCache("orders", max_entries=1024)
+
+
+def share_invalidations(markers) -> None:
+    """Let invalidations reach every worker through a shared write-marker store.
+
+    A worker that sees a cache invalidated elsewhere bypasses it for ttl seconds.
+    """
+    items_cache.markers = markers
+    orders_cache.markers = markers
+
+
+def clear_response_caches() -> None:
+    """Invalidate every cached response body."""
+    items_cache.invalidate()
+    orders_cache.invalidate()
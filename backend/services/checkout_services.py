@@ -0,0 +1,168 @@
+"""
+Checkout service functions.
+Persists the cart as a checkout intent, builds Stripe line items, creates
+checkout sessions through the shared async Stripe client and turns completed
+sessions into orders.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict
+
+import stripe
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, delete, update
+
+from ..models import (
+    CartItem,
+    CheckoutIntent,
+    Item,
+    OrderCreate,
+    OrderItemCreate,
+    User,
+    utc_now,
+)
+from .order_services import create_order_service
+
+
+def cart_quantities(cart: list[CartItem]) -> dict[int, int]:
+    """Item id to total quantity, merging duplicate lines."""
+    quantities: dict[int, int] = {}
+    for cart_item in cart:
+        quantities[cart_item.id] = quantities.get(cart_item.id, 0) + cart_item.qty
+    return quantities
+
+
+def create_checkout_intent_service(
+    user_id: str, item_id_to_qty: dict[int, int], db: Session
+) -> CheckoutIntent:
+    """Persist the cart being checked out."""
+    items = [{"id": item_id, "qty": qty} for item_id, qty in item_id_to_qty.items()]
+    intent = CheckoutIntent(user_id=user_id, items=json.dumps(items))
+    db.add(intent)
+    db.commit()
+    db.refresh(intent)
+    return intent
+
+
+def discard_checkout_intent_service(intent_id: str, db: Session) -> None:
+    """Delete an intent whose Stripe session could not be created."""
+    db.exec(delete(CheckoutIntent).where(CheckoutIntent.id == intent_id))
+    db.commit()
+
+
+def build_line_items(item_id_to_qty: dict[int, int], db: Session) -> list[dict]:
+    """Stripe line items for the cart; 400 if any item does not exist."""
+    items = db.exec(select(Item).where(Item.id.in_(list(item_id_to_qty)))).all()
+    if len(items) != len(item_id_to_qty):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Some items in the cart do not exist.",
+        )
+    return [
+        {
+            "price_data": {
+                "currency": "usd",
+                "product_data": {"name": item.name},
+                "unit_amount": int(item.price * 100),
+            },
+            "quantity": item_id_to_qty[item.id],
+        }
+        for item in items
+    ]
+
+
+async def create_checkout_session_service(
+    client: stripe.StripeClient,
+    line_items: list[dict],
+    user: User,
+    metadata: dict,
+    frontend_url: str,
+) -> str:
+    """Create a Stripe checkout session and return its hosted payment URL."""
+    try:
+        session = await client.v1.checkout.sessions.create_async(
+            params={
+                "payment_method_types": ["card"],
+                "line_items": line_items,
+                "mode": "payment",
+                "success_url": f"{frontend_url}/callback/",
+                "cancel_url": f"{frontend_url}/checkout",
+                "metadata": metadata,
+                "customer_email": user.email,
+            }
+        )
+    except stripe.StripeError as exc:
+        raise HTTPException(status_code=500, detail="Stripe error: " + str(exc)) from exc
+    return session.url
+
+
+def claim_checkout_intent(intent_id: str, db: Session) -> CheckoutIntent | None:
+    """Mark the intent completed in db's transaction; None if already completed.
+
+    The conditional UPDATE makes concurrent deliveries of the same webhook race
+    on the row, so only one of them creates the order.
+    """
+    claimed = db.exec(
+        update(CheckoutIntent)
+        .where(CheckoutIntent.id == intent_id, CheckoutIntent.completed_at.is_(None))
+        .values(completed_at=utc_now())
+    )
+    if claimed.rowcount == 1:
+        return db.get(CheckoutIntent, intent_id, populate_existing=True)
+    if db.get(CheckoutIntent, intent_id) is None:
+        raise HTTPException(status_code=404, detail="Checkout intent not found")
+    return None
+
+
+def claim_legacy_checkout(session: dict, db: Session) -> CheckoutIntent | None:
+    """Record a pre-intent session as a completed intent keyed by its Stripe id.
+
+    Sessions created before checkout intents carry the cart in metadata; a
+    redelivery collides on the derived primary key and returns None.
+    """
+    metadata = session["metadata"]
+    intent_id = "stripe-" + hashlib.sha256(session["id"].encode()).hexdigest()[:40]
+    intent = CheckoutIntent(
+        id=intent_id,
+        user_id=metadata["user_id"],
+        items=metadata["cart_items"],
+        completed_at=utc_now(),
+    )
+    db.add(intent)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        if db.get(CheckoutIntent, intent_id) is None:
+            raise
+        return None
+    return intent
+
+
+def complete_checkout_service(session: dict, db: Session) -> Dict[str, Any] | None:
+    """Create the order for a completed Stripe session from its checkout intent.
+
+    Returns None when the intent was already completed (a redelivered webhook).
+    """
+    metadata = session["metadata"]
+    if "checkout_intent_id" in metadata:
+        intent = claim_checkout_intent(metadata["checkout_intent_id"], db)
+    else:
+        intent = claim_legacy_checkout(session, db)
+    if intent is None:
+        return None
+    order_data = OrderCreate(
+        user_id=intent.user_id,
+        items=[
+            OrderItemCreate(item_id=item["id"], quantity=item["qty"])
+            for item in json.loads(intent.items)
+        ],
+        stripe_id=session["id"],
+        currency=session["currency"],
+        amount=session["amount_total"],
+        email=session["customer_email"],
+    )
+    # create_order_service commits the order and the claimed intent together.
+    return create_order_service(order_data=order_data, db=db)
@@ -0,0 +1,38 @@
+"""
+In-process publish/subscribe hooks for domain change events.
+Lets optional subsystems such as the assistant react to catalog changes
+without the service layer importing them.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+ITEMS_CHANGED = "items_changed"
+ORDER_CREATED = "order_created"
+ORDERS_CHANGED = "orders_changed"
+
+_listeners: defaultdict[str, list[Callable[[Any], None]]] = defaultdict(list)
+
+
+def subscribe(event: str, listener: Callable[[Any], None]) -> None:
+    """Register a listener to be called with the payload of every published event."""
+    if listener not in _listeners[event]:
+        _listeners[event].append(listener)
+
+
+def unsubscribe(event: str, listener: Callable[[Any], None]) -> None:
+    """Remove a previously registered listener."""
+    if listener in _listeners[event]:
+        _listeners[event].remove(listener)
+
+
+def publish(event: str, payload: Any) -> None:
+    """Call every listener for event; listener failures are logged, never raised."""
+    for listener in list(_listeners[event]):
+        try:
+            listener(payload)
+        except Exception:
+            logger.exception("Listener %r failed for event %s", listener, event)
@@ -3,22 +3,65 @@ Service functions for item management operations.
 Handles CRUD operations and search functionality for Item entities.
 """
 
+import csv
+import json
+from typing import Iterator, TextIO
+
+from fastapi import HTTPException
+from sqlalchemy import insert, text
 from sqlmodel import Session, select
 from ..models import Item
-from .utils import try_get_item, encode_item_fields
+from .utils import (
+    try_get_item,
+    encode_item_fields,
+    parse_item_row,
+    parse_item_fields,
+    select_fields,
+    ITEM_FIELDS,
+)
+from .cache import items_cache, clear_response_caches, dump_json
+from .events import publish, ITEMS_CHANGED
+from .search_index import catalog_index
+
+BULK_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
 
 
 def get_items_service(search: str, db: Session):
-    """Retrieve all items with optional search filtering."""
-    statement = select(Item)
-    if search:
-        statement = statement.where(Item.name.ilike(f"%{search}%"))
-    return db.exec(statement).all()
+    """Retrieve all items, or items matching search ranked by the BM25 catalog index."""
+    if not search:
+        return db.exec(select(Item)).all()
+    catalog_index.ensure_loaded(db)
+    ranked_ids = [item_id for item_id, _ in catalog_index.search(search)]
+    if not ranked_ids:
+        return []
+    found = {
+        item.id: item for item in db.exec(select(Item).where(Item.id.in_(ranked_ids)))
+    }
+    return [found[item_id] for item_id in ranked_ids if item_id in found]
+
+
+def get_items_json_service(search: str, db: Session, fields: str | None = None) -> bytes:
+    """Retrieve the item list as a pre-serialized {"items": [...]} JSON body.
+
+    fields is a comma-separated sparse fieldset, e.g. "id,name,price".
+    """
+    selected = parse_item_fields(fields)
+
+    def build() -> bytes:
+        items = get_items_service(search, db)
+        return dump_json(
+            {"items": [select_fields(item.model_dump(), selected) for item in items]}
+        )
 
+    return items_cache.get_or_set((search or "", selected), build)
 
-def get_item_service(item_id: int, db: Session):
-    """Retrieve a single item by ID."""
-    return try_get_item(item_id, db)
+
+def get_item_service(item_id: int, db: Session, fields: str | None = None):
+    """Retrieve a single item by ID, optionally trimmed to a sparse fieldset."""
+    item = try_get_item(item_id, db)
+    selected = parse_item_fields(fields)
+    return item if selected is None else select_fields(item.model_dump(), selected)
 
 
 def create_item_service(item: Item, db: Session):
@@ -27,6 +70,8 @@ def create_item_service(item: Item, db: Session):
     db.add(item)
     db.commit()
     db.refresh(item)
+    items_cache.invalidate()
+    publish(ITEMS_CHANGED, [item.id])
     return item
 
 
@@ -39,6 +84,8 @@ def update_item_service(item_id: int, new_item: Item, db: Session):
     existing.image_src = new_item.image_src
     db.commit()
     db.refresh(existing)
+    clear_response_caches()
+    publish(ITEMS_CHANGED, [existing.id])
     return existing
 
 
@@ -47,4 +94,140 @@ def delete_item_service(item_id: int, db: Session):
     existing = try_get_item(item_id, db)
     db.delete(existing)
     db.commit()
+    clear_response_caches()
+    publish(ITEMS_CHANGED, [item_id])
     return item_id
+
+
+def iter_item_rows(stream: TextIO, file_format: str) -> Iterator[tuple[int, dict]]:
+    """Yield (row number, raw row) pairs from a CSV or NDJSON text stream."""
+    if file_format == "csv":
+        yield from enumerate(csv.DictReader(stream), start=1)
+        return
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except json.JSONDecodeError:
+            yield row_number, None
+
+
+def _upsert_statement(db: Session):
+    """Build a dialect-specific INSERT ... ON CONFLICT (id) DO UPDATE statement."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    statement = dialect_insert(Item)
+    return statement.on_conflict_do_update(
+        index_elements=[Item.id],
+        set_={field: statement.excluded[field] for field in (*ITEM_FIELDS, "updated_at")},
+    )
+
+
+def _sync_item_id_sequence(db: Session) -> None:
+    """Move PostgreSQL's item id sequence past ids that were inserted explicitly.
+
+    INSERT ... ON CONFLICT with an explicit id does not advance the sequence,
+    so later inserts without an id would collide with imported rows. The
+    sequence only ever moves forward: concurrent inserts may hold ids above
+    max(id) that are not committed yet.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    connection = db.connection()
+    # A quoted, schema-qualified name from the catalog, safe to splice into SQL.
+    sequence = connection.execute(
+        text("SELECT pg_get_serial_sequence('item', 'id')")
+    ).scalar_one()
+    connection.execute(
+        text(
+            "SELECT setval(CAST(:sequence AS regclass), GREATEST("
+            f"(SELECT max(id) FROM item), (SELECT last_value FROM {sequence})))"
+        ),
+        {"sequence": sequence},
+    )
+
+
+def upsert_items_batch_service(items: list[Item], db: Session) -> dict:
+    """Insert or update a batch of validated items in one transaction.
+
+    Rows whose stored values already match are skipped, so only changed
+    item ids are returned and published.
+    """
+    keyed = {item.id: item for item in items if item.id is not None}
+    new_items = [item for item in items if item.id is None]
+    existing = {
+        item.id: tuple(getattr(item, field) for field in ITEM_FIELDS)
+        for item in db.exec(select(Item).where(Item.id.in_(keyed.keys())))
+    }
+    changed = [
+        item
+        for item_id, item in keyed.items()
+        if existing.get(item_id) != tuple(getattr(item, f) for f in ITEM_FIELDS)
+    ]
+
+    connection = db.connection()
+    upsert = _upsert_statement(db)
+    if changed and upsert is not None:
+        connection.execute(
+            upsert,
+            [item.model_dump(include={"id", "updated_at", *ITEM_FIELDS}) for item in changed],
+        )
+    elif changed:
+        for item in changed:
+            db.merge(item)
+    if changed:
+        _sync_item_id_sequence(db)
+    inserted_ids = []
+    if new_items:
+        result = connection.execute(
+            insert(Item).returning(Item.id, sort_by_parameter_order=True),
+            [item.model_dump(include={"updated_at", *ITEM_FIELDS}) for item in new_items],
+        )
+        inserted_ids = list(result.scalars())
+    db.commit()
+
+    changed_ids = [item.id for item in changed] + inserted_ids
+    if changed_ids:
+        clear_response_caches()
+        publish(ITEMS_CHANGED, changed_ids)
+    updated = sum(1 for item in changed if item.id in existing)
+    return {
+        "inserted": len(changed) - updated + len(inserted_ids),
+        "updated": updated,
+        "unchanged": len(keyed) - len(changed),
+        "changed_ids": changed_ids,
+    }
+
+
+def bulk_import_items_service(
+    stream: TextIO, file_format: str, db: Session, batch_size: int = BULK_BATCH_SIZE
+) -> dict:
+    """Validate and upsert items from a CSV or NDJSON stream in fixed-size batches."""
+    report = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0, "errors": []}
+    batch: list[Item] = []
+
+    def flush() -> None:
+        result = upsert_items_batch_service(batch, db)
+        for key in ("inserted", "updated", "unchanged"):
+            report[key] += result[key]
+        batch.clear()
+
+    for row_number, row in iter_item_rows(stream, file_format):
+        try:
+            batch.append(parse_item_row(row))
+        except HTTPException as exc:
+            report["failed"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"row": row_number, "detail": exc.detail})
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return report
@@ -5,33 +5,84 @@ Handles CRUD operations for Order entities with item relationships and user vali
 
 from typing import List, Dict, Any
 from fastapi import HTTPException
-from sqlmodel import Session, select, delete
+from sqlmodel import Session, select, delete, update
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
-from ..models import Order, OrderCreate, OrderItem, User
+from ..models import (
+    Order,
+    OrderCreate,
+    OrderItem,
+    User,
+    OrderSelection,
+    OrderBulkUpdate,
+)
 from .utils import (
     try_get_user,
     try_get_order,
     get_order_details,
     add_order_items,
+    parse_order_fields,
+    select_fields,
+    chunked,
+    bulk_update_values,
+    BULK_CHUNK_SIZE,
 )
+from .cache import orders_cache, dump_json
+from .stats_services import apply_order_stats
+from .events import publish, ORDER_CREATED, ORDERS_CHANGED
+from .archive_services import get_archived_order_service, get_user_archived_orders_service
+
+
+def invalidate_order_caches(*user_ids: str) -> None:
+    """Drop cached order lists for the given users and the admin listing."""
+    stale = {("user", user_id) for user_id in user_ids}
+    orders_cache.invalidate(lambda key: key[0] == "admin" or key[:2] in stale)
 
 
 def get_user_orders_service(current_user: User, db: Session) -> List[Dict[str, Any]]:
-    """Retrieve all orders for a specific user."""
+    """Retrieve all orders for a specific user, newest first, including archived ones."""
     statement = (
         select(Order)
         .where(Order.user_id == current_user.id)
+        .order_by(Order.date.desc())
         .options(selectinload(Order.order_items).selectinload(OrderItem.item))
     )
     orders = db.exec(statement).all()
-    return [get_order_details(order) for order in orders]
+    return [get_order_details(order) for order in orders] + get_user_archived_orders_service(
+        current_user.id, db
+    )
 
 
-def get_order_by_id_service(order_id: int, db: Session) -> Dict[str, Any]:
-    """Retrieve a single order by ID with detailed item information."""
-    order = try_get_order(order_id, db)
-    return get_order_details(order)
+def orders_json(orders: List[Dict[str, Any]], fields: tuple[str, ...] | None) -> bytes:
+    return dump_json({"orders": [select_fields(order, fields) for order in orders]})
+
+
+def get_user_orders_json_service(
+    current_user: User, db: Session, fields: str | None = None
+) -> bytes:
+    """Retrieve a user's orders as a pre-serialized {"orders": [...]} JSON body.
+
+    fields is a comma-separated sparse fieldset, e.g. "id,date,items.name".
+    """
+    selected = parse_order_fields(fields)
+    return orders_cache.get_or_set(
+        ("user", current_user.id, selected),
+        lambda: orders_json(get_user_orders_service(current_user, db), selected),
+    )
+
+
+def get_order_by_id_service(
+    order_id: int, db: Session, fields: str | None = None
+) -> Dict[str, Any]:
+    """Retrieve a single order by ID with detailed item information, archived or not."""
+    selected = parse_order_fields(fields)
+    try:
+        details = get_order_details(try_get_order(order_id, db))
+    except HTTPException:
+        details = get_archived_order_service(order_id, db)
+        if details is None:
+            raise
+    return select_fields(details, selected)
 
 
 def create_order_service(order_data: OrderCreate, db: Session) -> Dict[str, Any]:
@@ -48,10 +99,14 @@ def create_order_service(order_data: OrderCreate, db: Session) -> Dict[str, Any]
         db.add(new_order)
         db.flush()
         add_order_items(db, new_order.id, order_data.items)
+        db.flush()
+        apply_order_stats([new_order.id], db)
         db.commit()
     except IntegrityError as exc:
         raise HTTPException(400, "Item(s) do not exist") from exc
 
+    invalidate_order_caches(new_order.user_id)
+    publish(ORDER_CREATED, [order_item.item_id for order_item in order_data.items])
     db.refresh(new_order)
     return get_order_details(new_order)
 
@@ -62,6 +117,8 @@ def update_order_service(
     """Update an existing order and replace its items."""
     existing_order = try_get_order(order_id, db)
     try_get_user(order_data.user_id, db)
+    previous_user_id = existing_order.user_id
+    apply_order_stats([order_id], db, sign=-1)
     existing_order.user_id = order_data.user_id
     existing_order.stripe_id = order_data.stripe_id
     existing_order.currency = order_data.currency
@@ -69,7 +126,11 @@ def update_order_service(
     existing_order.email = order_data.email
     db.exec(delete(OrderItem).where(OrderItem.order_id == order_id))
     add_order_items(db, order_id, order_data.items)
+    db.flush()
+    apply_order_stats([order_id], db)
     db.commit()
+    invalidate_order_caches(previous_user_id, order_data.user_id)
+    publish(ORDERS_CHANGED, [order_id])
     db.refresh(existing_order, attribute_names=["order_items"])
     return get_order_details(existing_order)
 
@@ -77,9 +138,13 @@ def update_order_service(
 def delete_order_service(order_id: int, db: Session) -> None:
     """Delete an order and all associated order items."""
     order = try_get_order(order_id, db)
+    user_id = order.user_id
+    apply_order_stats([order_id], db, sign=-1)
     db.exec(delete(OrderItem).where(OrderItem.order_id == order_id))
-    db.commit()
     db.delete(order)
+    db.commit()
+    invalidate_order_caches(user_id)
+    publish(ORDERS_CHANGED, [order_id])
 
 
 def get_orders_admin_service(db: Session) -> List[Dict[str, Any]]:
@@ -90,3 +155,65 @@ def get_orders_admin_service(db: Session) -> List[Dict[str, Any]]:
         )
     ).all()
     return [get_order_details(order) for order in orders]
+
+
+def get_orders_admin_json_service(db: Session, fields: str | None = None) -> bytes:
+    """Retrieve all orders as a pre-serialized {"orders": [...]} JSON body."""
+    selected = parse_order_fields(fields)
+    return orders_cache.get_or_set(
+        ("admin", selected), lambda: orders_json(get_orders_admin_service(db), selected)
+    )
+
+
+def select_order_ids(selection: OrderSelection, db: Session) -> List[str]:
+    """Resolve a bulk selection to matching order IDs; empty selections are rejected."""
+    conditions = []
+    if selection.ids is not None:
+        conditions.append(Order.id.in_(selection.ids))
+    if selection.user_id is not None:
+        conditions.append(Order.user_id == selection.user_id)
+    if selection.email is not None:
+        conditions.append(Order.email == selection.email)
+    if selection.before is not None:
+        conditions.append(Order.date < selection.before)
+    if selection.after is not None:
+        conditions.append(Order.date >= selection.after)
+    if not conditions:
+        raise HTTPException(400, "Selection must include ids or a filter")
+    return list(db.exec(select(Order.id).where(*conditions)).all())
+
+
+def bulk_delete_orders_service(
+    selection: OrderSelection, db: Session, chunk_size: int = BULK_CHUNK_SIZE
+) -> Dict[str, int]:
+    """Delete selected orders and their items, committing once per chunk."""
+    order_ids = select_order_ids(selection, db)
+    for chunk in chunked(order_ids, chunk_size):
+        apply_order_stats(chunk, db, sign=-1)
+        db.exec(delete(OrderItem).where(OrderItem.order_id.in_(chunk)))
+        db.exec(delete(Order).where(Order.id.in_(chunk)))
+        db.commit()
+    orders_cache.invalidate()
+    publish(ORDERS_CHANGED, order_ids)
+    return {"matched": len(order_ids), "deleted": len(order_ids)}
+
+
+def bulk_update_orders_service(
+    order_update: OrderBulkUpdate, db: Session, chunk_size: int = BULK_CHUNK_SIZE
+) -> Dict[str, int]:
+    """Set the given fields on selected orders, committing once per chunk."""
+    values = bulk_update_values(order_update)
+    if "user_id" in values:
+        try_get_user(values["user_id"], db)
+    order_ids = select_order_ids(order_update.selection, db)
+    # Only the customer and currency keys of the rollups depend on these fields.
+    affects_stats = bool({"user_id", "currency"} & set(values))
+    for chunk in chunked(order_ids, chunk_size):
+        if affects_stats:
+            apply_order_stats(chunk, db, sign=-1)
+        db.exec(update(Order).where(Order.id.in_(chunk)).values(**values))
+        if affects_stats:
+            apply_order_stats(chunk, db)
+        db.commit()
+    orders_cache.invalidate()
+    return {"matched": len(order_ids), "updated": len(order_ids)}
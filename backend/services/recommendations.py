@@ -0,0 +1,177 @@
+"""
+In-process co-purchase index over the orderitem table.
+Keeps per-item order counts and a sparse item-by-item co-occurrence matrix, with
+the top-N popular items and top-N companions per item precomputed so lookups
+are dictionary reads. New orders are folded in incrementally through events.
+Edits, deletes and archiving mark the index stale. The first lookup loads the
+index synchronously; later rebuilds (after edits, or once older than
+RECOMMENDATION_INDEX_MAX_AGE) run in one background thread while lookups keep
+using the old contents. Only live orders are counted: archived orders (see
+archive_services) drop out of the popularity and co-occurrence counts.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from heapq import nlargest
+from itertools import groupby
+from threading import RLock
+from typing import Iterable, List
+
+from sqlmodel import Session, select
+
+from ..models import OrderItem
+from .events import subscribe, ORDER_CREATED, ORDERS_CHANGED
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATION_INDEX_MAX_AGE = float(os.getenv("RECOMMENDATION_INDEX_MAX_AGE", "600"))
+TOP_N = 10
+
+
+def _rank(entry: tuple[int, int]) -> tuple[int, int]:
+    item_id, count = entry
+    return count, -item_id
+
+
+class CoPurchaseIndex:
+    """Popularity counts and top-N co-purchased items per item."""
+
+    def __init__(self, top_n: int = TOP_N) -> None:
+        self.top_n = top_n
+        self._lock = RLock()
+        self._load_lock = threading.Lock()
+        self._bind = None
+        self._loaded_at = 0.0
+        self._stale = True
+        self._reloading = False
+        self._changed_during_reload = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._popularity: Counter = Counter()
+        self._co_counts: defaultdict[int, Counter] = defaultdict(Counter)
+        self._top_popular: tuple[int, ...] = ()
+        self._top_with: dict[int, tuple[tuple[int, int], ...]] = {}
+
+    def _add_order(self, item_ids: Iterable[int]) -> set[int]:
+        distinct = set(item_ids)
+        self._popularity.update(distinct)
+        for item_id in distinct:
+            self._co_counts[item_id].update(distinct - {item_id})
+        return distinct
+
+    def _most_common(self, counts: Counter) -> tuple[tuple[int, int], ...]:
+        # Ties go to the lower item id so rankings do not depend on load order.
+        return tuple(nlargest(self.top_n, counts.items(), key=_rank))
+
+    def _refresh_tops(self, item_ids: Iterable[int]) -> None:
+        for item_id in item_ids:
+            self._top_with[item_id] = self._most_common(self._co_counts[item_id])
+        self._top_popular = tuple(
+            item_id for item_id, _ in self._most_common(self._popularity)
+        )
+
+    def load(self, db: Session) -> None:
+        """Rebuild from every order, streaming order items grouped by order.
+
+        The counts are built aside and swapped in, so lookups during a rebuild
+        keep answering from the previous contents.
+        """
+        rows = db.exec(
+            select(OrderItem.order_id, OrderItem.item_id).order_by(OrderItem.order_id)
+        )
+        fresh = CoPurchaseIndex(self.top_n)
+        for _, order_rows in groupby(rows, key=lambda row: row[0]):
+            fresh._add_order(item_id for _, item_id in order_rows)
+        fresh._refresh_tops(list(fresh._co_counts))
+        with self._lock:
+            self._popularity = fresh._popularity
+            self._co_counts = fresh._co_counts
+            self._top_popular = fresh._top_popular
+            self._top_with = fresh._top_with
+            self._bind = db.get_bind()
+            self._loaded_at = time.monotonic()
+            self._stale = False
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Load on first use; rebuild in the background after edits or once older than max age."""
+        if self._bind is None:
+            with self._load_lock:
+                if self._bind is None:
+                    self.load(db)
+            return
+        expired = time.monotonic() - self._loaded_at > RECOMMENDATION_INDEX_MAX_AGE
+        if self._stale or expired:
+            self._reload_in_background()
+
+    def _reload_in_background(self) -> None:
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+            self._changed_during_reload = False
+        threading.Thread(
+            target=self._reload, name="recommendation-index-reload", daemon=True
+        ).start()
+
+    def _reload(self) -> None:
+        try:
+            with Session(self._bind) as db:
+                self.load(db)
+        except Exception:
+            logger.exception("Recommendation index reload failed")
+        finally:
+            with self._lock:
+                self._reloading = False
+                # The rebuild may have read order items from before these changes.
+                if self._changed_during_reload:
+                    self._stale = True
+
+    def add_order(self, item_ids: List[int]) -> None:
+        """Fold one new order into the counts and its items' top lists."""
+        with self._lock:
+            if self._reloading:
+                self._changed_during_reload = True
+            if self._stale or self._reloading:
+                return
+            self._refresh_tops(self._add_order(item_ids))
+
+    def mark_stale(self, _payload=None) -> None:
+        with self._lock:
+            self._stale = True
+            if self._reloading:
+                self._changed_during_reload = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+            self._bind = None
+            self._loaded_at = 0.0
+            self._stale = True
+
+    def popular(self, limit: int = TOP_N) -> List[int]:
+        """Item ids in most orders first."""
+        return list(self._top_popular[:limit])
+
+    def bought_with(self, item_ids: Iterable[int], limit: int = TOP_N) -> List[int]:
+        """Items most often bought together with any of item_ids, excluding them."""
+        given = set(item_ids)
+        if len(given) == 1:
+            (item_id,) = given
+            companions = self._top_with.get(item_id, ())
+            return [other for other, _ in companions[:limit]]
+        scores: Counter = Counter()
+        for item_id in given:
+            for other, count in self._top_with.get(item_id, ()):
+                if other not in given:
+                    scores[other] += count
+        return [other for other, _ in nlargest(limit, scores.items(), key=_rank)]
+
+
+copurchase_index = CoPurchaseIndex()
+
+subscribe(ORDER_CREATED, copurchase_index.add_order)
+subscribe(ORDERS_CHANGED, copurchase_index.mark_stale)
@@ -0,0 +1,273 @@
+"""
+In-process BM25 inverted index over item names and descriptions.
+Shared by catalog search (get_items_service) and the assistant's hybrid retriever.
+The index loads lazily from the database and follows items_changed events.
+Loads and refreshes read from the primary set with set_primary, so they never
+see a lagging replica; once older than SEARCH_INDEX_MAX_AGE the index is
+rebuilt by one background thread while searches keep using the old contents.
+Items changed by other workers are found by polling item.updated_at at most
+every SEARCH_INDEX_SYNC_SECONDS; deleted items are dropped by the caller's
+database lookup and disappear from the index at the next rebuild.
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from threading import RLock
+from typing import Iterable, List
+
+from sqlmodel import Session, select
+
+from ..models import Item, utc_now
+from .events import subscribe, ITEMS_CHANGED
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_MAX_AGE = float(os.getenv("SEARCH_INDEX_MAX_AGE", "300"))
+SEARCH_INDEX_SYNC_SECONDS = float(os.getenv("SEARCH_INDEX_SYNC_SECONDS", "1"))
+# Re-read rows this far behind the watermark; transactions commit out of order.
+SYNC_OVERLAP = timedelta(seconds=10)
+NAME_BOOST = 2
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str | None) -> List[str]:
+    """Lowercase alphanumeric terms of text."""
+    return _TOKEN_PATTERN.findall((text or "").lower())
+
+
+def normalize_name(name: str | None) -> str:
+    return " ".join(tokenize(name))
+
+
+class BM25Index:
+    """BM25 ranking with prefix expansion of query terms; names count NAME_BOOST times."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._lock = RLock()
+        self._load_lock = threading.Lock()
+        self._primary = None
+        self._bind = None
+        self._loaded_at = 0.0
+        self._reloading = False
+        self._changed_during_reload: set[int] = set()
+        self._sync_lock = threading.Lock()
+        self._synced_at = 0.0
+        self._watermark: datetime | None = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._versions: dict[int, datetime | None] = {}
+        self._doc_terms: dict[int, Counter] = {}
+        self._doc_lengths: dict[int, int] = {}
+        self._postings: defaultdict[str, dict[int, int]] = defaultdict(dict)
+        self._names: defaultdict[str, set[int]] = defaultdict(set)
+        self._item_names: dict[int, str] = {}
+        self._total_length = 0
+        self._vocabulary: List[str] | None = None
+
+    def _add(self, item: Item) -> None:
+        terms = Counter(tokenize(item.name) * NAME_BOOST + tokenize(item.description))
+        self._doc_terms[item.id] = terms
+        self._doc_lengths[item.id] = sum(terms.values())
+        self._total_length += self._doc_lengths[item.id]
+        for term, frequency in terms.items():
+            self._postings[term][item.id] = frequency
+        name = normalize_name(item.name)
+        self._item_names[item.id] = name
+        self._names[name].add(item.id)
+        self._versions[item.id] = item.updated_at
+        self._vocabulary = None
+
+    def _remove(self, item_id: int) -> None:
+        self._versions.pop(item_id, None)
+        terms = self._doc_terms.pop(item_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(item_id)
+        for term in terms:
+            self._postings[term].pop(item_id, None)
+            if not self._postings[term]:
+                del self._postings[term]
+        name = self._item_names.pop(item_id)
+        self._names[name].discard(item_id)
+        if not self._names[name]:
+            del self._names[name]
+        self._vocabulary = None
+
+    def load(self, items: Iterable[Item], bind=None, watermark: datetime | None = None) -> None:
+        """Replace the index contents with items read at watermark (default: now)."""
+        with self._lock:
+            self._reset()
+            for item in items:
+                self._add(item)
+            self._bind = bind
+            self._loaded_at = time.monotonic()
+            self._synced_at = self._loaded_at
+            self._watermark = watermark or utc_now()
+
+    def set_primary(self, bind) -> None:
+        """Read loads and refreshes from bind (the primary) instead of the caller's session."""
+        self._primary = bind
+
+    def _build(self, bind) -> None:
+        watermark = utc_now()
+        with Session(self._primary or bind) as db:
+            items = db.exec(select(Item)).all()
+        self.load(items, bind=bind, watermark=watermark)
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Build the index from db on first use; rebuild it in the background once stale.
+
+        Between rebuilds, items changed by other workers are picked up by sync().
+        """
+        if self._bind is None:
+            with self._load_lock:
+                if self._bind is None:
+                    self._build(db.get_bind())
+            return
+        if time.monotonic() - self._loaded_at > SEARCH_INDEX_MAX_AGE:
+            self._reload_in_background()
+        if time.monotonic() - self._synced_at > SEARCH_INDEX_SYNC_SECONDS:
+            self.sync()
+
+    def sync(self) -> None:
+        """Refresh items whose updated_at moved since the last poll.
+
+        One caller polls at a time; concurrent callers keep searching the current
+        contents instead of waiting.
+        """
+        if self._bind is None or not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._synced_at = time.monotonic()
+            since = self._watermark
+            with Session(self._primary or self._bind) as db:
+                rows = db.exec(
+                    select(Item.id, Item.updated_at).where(
+                        Item.updated_at > since - SYNC_OVERLAP
+                    )
+                ).all()
+            with self._lock:
+                changed = [
+                    item_id
+                    for item_id, updated_at in rows
+                    if self._versions.get(item_id) != updated_at
+                ]
+            if changed:
+                self.refresh(changed)
+            self._watermark = max((updated_at for _, updated_at in rows), default=since)
+        except Exception:
+            logger.exception("Search index sync failed")
+        finally:
+            self._sync_lock.release()
+
+    def _reload_in_background(self) -> None:
+        with self._lock:
+            if self._reloading:
+                return
+            self._reloading = True
+            self._changed_during_reload.clear()
+        threading.Thread(target=self._reload, name="search-index-reload", daemon=True).start()
+
+    def _reload(self) -> None:
+        try:
+            self._build(self._bind)
+        except Exception:
+            logger.exception("Search index reload failed")
+        finally:
+            with self._lock:
+                self._reloading = False
+                changed = list(self._changed_during_reload)
+                self._changed_during_reload.clear()
+        # The reload may have read rows from before these changes.
+        if changed:
+            self.refresh(changed)
+
+    def clear(self) -> None:
+        """Drop all contents so the next search reloads from the database."""
+        with self._lock:
+            self._reset()
+            self._bind = None
+            self._loaded_at = 0.0
+            self._synced_at = 0.0
+            self._watermark = None
+
+    def refresh(self, item_ids: List[int]) -> None:
+        """Reload the given items from the primary; missing ones are removed."""
+        if self._bind is None:
+            return
+        with self._lock:
+            if self._reloading:
+                self._changed_during_reload.update(item_ids)
+        with Session(self._primary or self._bind) as db:
+            fresh = db.exec(select(Item).where(Item.id.in_(item_ids))).all()
+        with self._lock:
+            for item_id in item_ids:
+                self._remove(item_id)
+            for item in fresh:
+                self._add(item)
+
+    def _expand(self, term: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect_left(self._vocabulary, term)
+        expanded = []
+        for candidate in self._vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            expanded.append(candidate)
+        return expanded
+
+    def search(self, query: str, limit: int | None = None) -> List[tuple[int, float]]:
+        """Return (item id, score) pairs for items matching every query term (or a prefix)."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            n_docs = len(self._doc_terms)
+            if not n_docs:
+                return []
+            avg_length = self._total_length / n_docs
+            scores: dict[int, float] = {}
+            matched: Counter = Counter()
+            for term in dict.fromkeys(terms):
+                term_docs: set[int] = set()
+                for candidate in self._expand(term):
+                    postings = self._postings[candidate]
+                    df = len(postings)
+                    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                    for item_id, frequency in postings.items():
+                        length = self._doc_lengths[item_id]
+                        norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+                        weight = idf * frequency * (self.k1 + 1) / (frequency + norm)
+                        scores[item_id] = scores.get(item_id, 0.0) + weight
+                        term_docs.add(item_id)
+                matched.update(term_docs)
+            required = len(dict.fromkeys(terms))
+            hits = [
+                (item_id, score)
+                for item_id, score in scores.items()
+                if matched[item_id] == required
+            ]
+        ranked = sorted(hits, key=lambda entry: entry[1], reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def exact_name_matches(self, query: str) -> List[int]:
+        """IDs of items whose normalized name equals the normalized query."""
+        with self._lock:
+            return sorted(self._names.get(normalize_name(query), ()))
+
+
+catalog_index = BM25Index()
+
+subscribe(ITEMS_CHANGED, catalog_index.refresh)
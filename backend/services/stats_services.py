@@ -0,0 +1,224 @@
+"""
+Service functions for admin sales statistics.
+Keeps rollup tables (revenue per day, units per item, spend per customer) up to
+date incrementally as orders change, so dashboard queries scan rollup rows
+instead of every order.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, UTC
+from typing import Any, Dict, Iterable, List, Sequence
+
+from sqlmodel import Session, SQLModel, select, delete
+from ..models import (
+    CustomerSpend,
+    DailyRevenue,
+    Item,
+    ItemSales,
+    Order,
+    OrderArchive,
+    OrderItem,
+    User,
+)
+from .archive_services import decompress_items
+from .utils import chunked, BULK_CHUNK_SIZE
+
+DEFAULT_REVENUE_DAYS = 30
+
+
+class StatsDelta:
+    """Rollup increments for a set of orders, keyed by each table's primary key."""
+
+    def __init__(self) -> None:
+        self.revenue: defaultdict[tuple, dict] = defaultdict(
+            lambda: {"revenue": 0, "orders": 0}
+        )
+        self.items: defaultdict[tuple, dict] = defaultdict(
+            lambda: {"units": 0, "orders": 0}
+        )
+        self.customers: defaultdict[tuple, dict] = defaultdict(
+            lambda: {"total": 0, "orders": 0}
+        )
+
+    def add_order(self, user_id: str, day: date, currency: str, amount: int) -> None:
+        revenue = self.revenue[(day, currency)]
+        revenue["revenue"] += amount
+        revenue["orders"] += 1
+        customer = self.customers[(user_id, currency)]
+        customer["total"] += amount
+        customer["orders"] += 1
+
+    def add_order_items(self, lines: Iterable[tuple[int, int]]) -> None:
+        """Add one order's (item id, quantity) lines; each item counts the order once."""
+        seen = set()
+        for item_id, quantity in lines:
+            item = self.items[(item_id,)]
+            item["units"] += quantity
+            if item_id not in seen:
+                item["orders"] += 1
+                seen.add(item_id)
+
+
+def normalize_currency(currency: str | None) -> str:
+    return (currency or "usd").lower()
+
+
+def collect_order_stats(order_ids: Sequence[str], db: Session) -> StatsDelta:
+    """Sum the rollup contributions of the given orders with two queries."""
+    delta = StatsDelta()
+    if not order_ids:
+        return delta
+    orders = db.exec(
+        select(Order.user_id, Order.date, Order.currency, Order.amount).where(
+            Order.id.in_(order_ids)
+        )
+    ).all()
+    for user_id, order_date, currency, amount in orders:
+        delta.add_order(
+            user_id, order_date.date(), normalize_currency(currency), amount or 0
+        )
+    order_items = db.exec(
+        select(OrderItem.order_id, OrderItem.item_id, OrderItem.quantity).where(
+            OrderItem.order_id.in_(order_ids)
+        )
+    ).all()
+    lines_by_order: defaultdict[str, list] = defaultdict(list)
+    for order_id, item_id, quantity in order_items:
+        lines_by_order[order_id].append((item_id, quantity))
+    for lines in lines_by_order.values():
+        delta.add_order_items(lines)
+    return delta
+
+
+def collect_archived_order_stats(order_ids: Sequence[str], db: Session) -> StatsDelta:
+    """Sum the rollup contributions of archived orders from their item snapshots."""
+    delta = StatsDelta()
+    for row in db.exec(select(OrderArchive).where(OrderArchive.id.in_(order_ids))):
+        delta.add_order(
+            row.user_id, row.date.date(), normalize_currency(row.currency), row.amount or 0
+        )
+        delta.add_order_items(
+            (item["item_id"], item["quantity"]) for item in decompress_items(row.items)
+        )
+    return delta
+
+
+def _increment_statement(db: Session, model: type[SQLModel], columns: List[str]):
+    """INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col, if supported."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    table = model.__table__
+    statement = dialect_insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=list(table.primary_key.columns),
+        set_={column: table.c[column] + statement.excluded[column] for column in columns},
+    )
+
+
+def _apply_increments(
+    db: Session, model: type[SQLModel], deltas: Dict[tuple, dict], sign: int
+) -> None:
+    if not deltas:
+        return
+    key_names = [column.name for column in model.__table__.primary_key.columns]
+    value_names = list(next(iter(deltas.values())))
+    # Rows go in primary key order so concurrent upserts lock rows in the same
+    # order and cannot deadlock each other.
+    rows = [
+        {
+            **dict(zip(key_names, key)),
+            **{name: sign * values[name] for name in value_names},
+        }
+        for key, values in sorted(deltas.items())
+    ]
+    statement = _increment_statement(db, model, value_names)
+    if statement is not None:
+        db.exec(statement, params=rows)
+        return
+    for row in rows:
+        key = tuple(row[name] for name in key_names)
+        existing = db.get(model, key, with_for_update=True)
+        if existing is None:
+            db.add(model(**row))
+        else:
+            for name in value_names:
+                setattr(existing, name, getattr(existing, name) + row[name])
+    db.flush()
+
+
+def apply_order_stats(order_ids: Sequence[str], db: Session, sign: int = 1) -> None:
+    """Add (sign=1) or subtract (sign=-1) orders from the rollups in db's transaction.
+
+    Call with -1 before orders are changed or deleted and with 1 after they are
+    created or changed (and flushed), then commit with the order change.
+    """
+    _apply_delta(db, collect_order_stats(order_ids, db), sign)
+
+
+def apply_archived_order_stats(order_ids: Sequence[str], db: Session, sign: int = 1) -> None:
+    """apply_order_stats for archived orders; call with -1 before deleting them."""
+    _apply_delta(db, collect_archived_order_stats(order_ids, db), sign)
+
+
+def _apply_delta(db: Session, delta: StatsDelta, sign: int = 1) -> None:
+    _apply_increments(db, DailyRevenue, delta.revenue, sign)
+    _apply_increments(db, ItemSales, delta.items, sign)
+    _apply_increments(db, CustomerSpend, delta.customers, sign)
+
+
+def rebuild_stats_service(db: Session, chunk_size: int = BULK_CHUNK_SIZE) -> Dict[str, int]:
+    """Recompute every rollup from live and archived orders (backfill or drift repair)."""
+    for model in (DailyRevenue, ItemSales, CustomerSpend):
+        db.exec(delete(model))
+    order_ids = list(db.exec(select(Order.id)).all())
+    for chunk in chunked(order_ids, chunk_size):
+        apply_order_stats(chunk, db)
+    archived_ids = list(db.exec(select(OrderArchive.id)).all())
+    for chunk in chunked(archived_ids, chunk_size):
+        apply_archived_order_stats(chunk, db)
+    db.commit()
+    return {"orders": len(order_ids) + len(archived_ids)}
+
+
+def get_revenue_by_day_service(
+    db: Session, start: date | None = None, end: date | None = None
+) -> List[Dict[str, Any]]:
+    """Revenue (cents) and order counts per day and currency, start and end inclusive."""
+    end = end or datetime.now(UTC).date()
+    start = start or end - timedelta(days=DEFAULT_REVENUE_DAYS - 1)
+    rows = db.exec(
+        select(DailyRevenue)
+        .where(DailyRevenue.day >= start, DailyRevenue.day <= end)
+        .where(DailyRevenue.orders > 0)
+        .order_by(DailyRevenue.day, DailyRevenue.currency)
+    ).all()
+    return [row.model_dump() for row in rows]
+
+
+def get_top_items_service(db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+    """Best-selling items by units sold."""
+    rows = db.exec(
+        select(ItemSales, Item.name)
+        .join(Item, Item.id == ItemSales.item_id, isouter=True)
+        .where(ItemSales.units > 0)
+        .order_by(ItemSales.units.desc())
+        .limit(limit)
+    ).all()
+    return [{**sales.model_dump(), "name": name} for sales, name in rows]
+
+
+def get_top_customers_service(db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+    """Customers with the highest total spend (cents) per currency."""
+    rows = db.exec(
+        select(CustomerSpend, User.email)
+        .join(User, User.id == CustomerSpend.user_id, isouter=True)
+        .where(CustomerSpend.orders > 0)
+        .order_by(CustomerSpend.total.desc())
+        .limit(limit)
+    ).all()
+    return [{**spend.model_dump(), "email": email} for spend, email in rows]
@@ -3,9 +3,28 @@ Service functions for user management operations.
 Handles CRUD operations for User entities using SQLModel sessions.
 """
 
-from sqlmodel import Session, select
-from ..models import User
-from .utils import try_get_user
+import base64
+import binascii
+import json
+from typing import Any, Dict, Iterator, List
+
+from fastapi import HTTPException
+from sqlalchemy import func, tuple_, union_all
+from sqlmodel import Session, select, delete, update
+from ..models import (
+    User,
+    Order,
+    OrderArchive,
+    OrderItem,
+    ChatSession,
+    CheckoutIntent,
+    UserSelection,
+    UserBulkUpdate,
+)
+from .utils import try_get_user, chunked, bulk_update_values, BULK_CHUNK_SIZE
+from .cache import orders_cache, dump_json
+from .stats_services import apply_archived_order_stats, apply_order_stats
+from .events import publish, ORDERS_CHANGED
 
 
 def get_users_service(db: Session):
@@ -14,6 +33,92 @@ def get_users_service(db: Session):
     return db.exec(statement).all()
 
 
+USER_PAGE_SIZE = 50
+USER_EXPORT_BATCH_SIZE = 1000
+
+
+def encode_user_cursor(user: User) -> str:
+    """Opaque keyset cursor pointing just after user in (email, id) order."""
+    return base64.urlsafe_b64encode(json.dumps([user.email, user.id]).encode()).decode()
+
+
+def decode_user_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        email, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(email), str(user_id)
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise HTTPException(400, "Invalid cursor") from exc
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def count_orders_by_user(user_ids: List[str], db: Session) -> Dict[str, int]:
+    """Live and archived order counts for the given users in one grouped query."""
+    if not user_ids:
+        return {}
+    order_users = union_all(
+        select(Order.user_id).where(Order.user_id.in_(user_ids)),
+        select(OrderArchive.user_id).where(OrderArchive.user_id.in_(user_ids)),
+    ).subquery()
+    rows = db.exec(
+        select(order_users.c.user_id, func.count()).group_by(order_users.c.user_id)
+    ).all()
+    return dict(rows)
+
+
+def _select_users_page(
+    db: Session, limit: int, after: tuple[str, str] | None, email_prefix: str | None
+) -> List[User]:
+    # Ordered by (email, id) so pages and prefix ranges both walk ix_user_email.
+    statement = select(User).order_by(User.email, User.id).limit(limit)
+    if email_prefix:
+        statement = statement.where(
+            User.email >= email_prefix, User.email < prefix_upper_bound(email_prefix)
+        )
+    if after:
+        statement = statement.where(tuple_(User.email, User.id) > after)
+    return list(db.exec(statement).all())
+
+
+def get_users_page_service(
+    db: Session,
+    limit: int = USER_PAGE_SIZE,
+    cursor: str | None = None,
+    email_prefix: str | None = None,
+) -> Dict[str, Any]:
+    """One page of users by email with their order counts, and the next page's cursor."""
+    after = decode_user_cursor(cursor) if cursor else None
+    users = _select_users_page(db, limit + 1, after, email_prefix)
+    has_more = len(users) > limit
+    users = users[:limit]
+    counts = count_orders_by_user([user.id for user in users], db)
+    return {
+        "users": [{**user.model_dump(), "orders": counts.get(user.id, 0)} for user in users],
+        "next": encode_user_cursor(users[-1]) if has_more else None,
+    }
+
+
+def iter_users_ndjson_service(
+    db: Session, email_prefix: str | None = None, batch_size: int = USER_EXPORT_BATCH_SIZE
+) -> Iterator[bytes]:
+    """Stream every (matching) user with order counts as NDJSON, one keyset batch at a time."""
+    after = None
+    while True:
+        users = _select_users_page(db, batch_size, after, email_prefix)
+        if not users:
+            return
+        counts = count_orders_by_user([user.id for user in users], db)
+        yield b"".join(
+            dump_json({**user.model_dump(), "orders": counts.get(user.id, 0)}) + b"\n"
+            for user in users
+        )
+        after = (users[-1].email, users[-1].id)
+        db.expunge_all()
+
+
 def get_user_service(user_id: int, db: Session):
     """Retrieve a single user by ID."""
     return try_get_user(user_id, db)
@@ -43,3 +148,53 @@ def delete_user_service(user_id: int, db: Session) -> User:
     db.delete(user)
     db.commit()
     return user
+
+
+def select_user_ids(selection: UserSelection, db: Session) -> List[str]:
+    """Resolve a bulk selection to matching user IDs; empty selections are rejected."""
+    conditions = []
+    if selection.ids is not None:
+        conditions.append(User.id.in_(selection.ids))
+    if selection.email is not None:
+        conditions.append(User.email == selection.email)
+    if not conditions:
+        raise HTTPException(400, "Selection must include ids or a filter")
+    return list(db.exec(select(User.id).where(*conditions)).all())
+
+
+def bulk_delete_users_service(
+    selection: UserSelection, db: Session, chunk_size: int = BULK_CHUNK_SIZE
+) -> Dict[str, int]:
+    """Delete selected users with their (archived) orders and chat history, one commit per chunk."""
+    user_ids = select_user_ids(selection, db)
+    for chunk in chunked(user_ids, chunk_size):
+        user_orders = select(Order.id).where(Order.user_id.in_(chunk))
+        deleted_order_ids = db.exec(user_orders).all()
+        apply_order_stats(deleted_order_ids, db, sign=-1)
+        archived_ids = db.exec(
+            select(OrderArchive.id).where(OrderArchive.user_id.in_(chunk))
+        ).all()
+        apply_archived_order_stats(archived_ids, db, sign=-1)
+        db.exec(delete(OrderItem).where(OrderItem.order_id.in_(user_orders)))
+        db.exec(delete(Order).where(Order.user_id.in_(chunk)))
+        db.exec(delete(OrderArchive).where(OrderArchive.user_id.in_(chunk)))
+        db.exec(delete(ChatSession).where(ChatSession.user_id.in_(chunk)))
+        db.exec(delete(CheckoutIntent).where(CheckoutIntent.user_id.in_(chunk)))
+        db.exec(delete(User).where(User.id.in_(chunk)))
+        db.commit()
+        if deleted_order_ids:
+            publish(ORDERS_CHANGED, list(deleted_order_ids))
+    orders_cache.invalidate()
+    return {"matched": len(user_ids), "deleted": len(user_ids)}
+
+
+def bulk_update_users_service(
+    user_update: UserBulkUpdate, db: Session, chunk_size: int = BULK_CHUNK_SIZE
+) -> Dict[str, int]:
+    """Set the given fields on selected users, committing once per chunk."""
+    values = bulk_update_values(user_update)
+    user_ids = select_user_ids(user_update.selection, db)
+    for chunk in chunked(user_ids, chunk_size):
+        db.exec(update(User).where(User.id.in_(chunk)).values(**values))
+        db.commit()
+    return {"matched": len(user_ids), "updated": len(user_ids)}
@@ -5,9 +5,10 @@ Provides helpers for item encoding, entity retrieval, and order processing.
 
 import urllib.parse
 
-from typing import List
+from typing import Any, Dict, List, Iterator, Sequence, TypeVar
 from sqlmodel import Session, select
 from fastapi import HTTPException
+from pydantic import ValidationError
 from sqlalchemy.orm import selectinload
 
 from backend.models import User, Item, Order, OrderItem, OrderItemCreate
@@ -28,6 +29,91 @@ def encode_item_fields(item: Item) -> Item:
     return item
 
 
+ITEM_FIELDS = ("name", "description", "price", "image_src")
+ORDER_FIELDS = ("id", "date", "user_id", "stripe_id", "items")
+ORDER_ITEM_FIELDS = ("item_id", "name", "description", "price", "image_src", "quantity")
+BULK_CHUNK_SIZE = 1000
+
+Fields = tuple[str, ...] | None
+
+T = TypeVar("T")
+
+
+def chunked(values: Sequence[T], size: int = BULK_CHUNK_SIZE) -> Iterator[Sequence[T]]:
+    """Yield consecutive slices of at most size elements."""
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def bulk_update_values(update) -> dict:
+    """Extract the fields to set from a bulk update schema, rejecting empty updates."""
+    values = update.model_dump(exclude={"selection"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    return values
+
+
+def parse_fields(fields: str | None, allowed: Sequence[str]) -> Fields:
+    """Validate a comma-separated sparse fieldset; None selects every field."""
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = sorted(set(names) - set(allowed))
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(unknown)}")
+    return names or None
+
+
+def select_fields(record: Dict[str, Any], fields: Fields) -> Dict[str, Any]:
+    """Keep the named fields of record; "items.name" keeps name in each entry of items."""
+    if fields is None:
+        return record
+    nested: Dict[str, List[str]] = {}
+    for name in fields:
+        head, _, rest = name.partition(".")
+        nested.setdefault(head, [])
+        if rest:
+            nested[head].append(rest)
+    trimmed = {}
+    for head, rest in nested.items():
+        value = record[head]
+        if rest and isinstance(value, list):
+            value = [select_fields(entry, tuple(rest)) for entry in value]
+        trimmed[head] = value
+    return trimmed
+
+
+def parse_item_fields(fields: str | None) -> Fields:
+    return parse_fields(fields, ("id",) + ITEM_FIELDS)
+
+
+def parse_order_fields(fields: str | None) -> Fields:
+    return parse_fields(
+        fields, ORDER_FIELDS + tuple(f"items.{name}" for name in ORDER_ITEM_FIELDS)
+    )
+
+
+def parse_item_row(row: dict) -> Item:
+    """Build a validated, encoded item from a raw import row; blank cells become None."""
+    if not isinstance(row, dict):
+        raise HTTPException(400, "Row must be an object")
+    values = {
+        field: None if row.get(field) == "" else row.get(field)
+        for field in ("id", *ITEM_FIELDS)
+    }
+    try:
+        item = Item.model_validate(values)
+        return encode_item_fields(item)
+    except ValidationError as exc:
+        detail = "; ".join(
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+            for error in exc.errors()
+        )
+        raise HTTPException(400, detail) from exc
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(400, "Price must be a number") from exc
+
+
 def try_get_user(user_id: int, db: Session) -> User:
     """Retrieve user by ID or raise 404 if not found."""
     user = db.get(User, user_id)
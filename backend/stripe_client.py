@@ -0,0 +1,61 @@
+"""
+Shared async Stripe client for checkout.
+One HTTPX connection pool with keep-alive is reused for every Stripe call.
+Timeouts are bounded. The Stripe library retries with jittered backoff and
+idempotency keys. STRIPE_API_BASE points the client at another host, such as
+the fake Stripe server used in tests.
+"""
+
+import os
+
+import httpx
+import stripe
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
+STRIPE_API_BASE = os.getenv("STRIPE_API_BASE")
+STRIPE_TIMEOUT_SECONDS = float(os.getenv("STRIPE_TIMEOUT_SECONDS", "10"))
+STRIPE_CONNECT_TIMEOUT_SECONDS = float(os.getenv("STRIPE_CONNECT_TIMEOUT_SECONDS", "3"))
+STRIPE_MAX_RETRIES = int(os.getenv("STRIPE_MAX_RETRIES", "2"))
+
+_client: stripe.StripeClient | None = None
+_http_client: stripe.HTTPXClient | None = None
+
+
+def build_http_client(timeout: float = STRIPE_TIMEOUT_SECONDS) -> stripe.HTTPXClient:
+    return stripe.HTTPXClient(
+        timeout=httpx.Timeout(timeout, connect=STRIPE_CONNECT_TIMEOUT_SECONDS)
+    )
+
+
+def build_stripe_client(
+    api_key: str,
+    http_client: stripe.HTTPXClient,
+    api_base: str | None = None,
+    max_retries: int = STRIPE_MAX_RETRIES,
+) -> stripe.StripeClient:
+    return stripe.StripeClient(
+        api_key,
+        http_client=http_client,
+        max_network_retries=max_retries,
+        base_addresses={"api": api_base} if api_base else None,
+    )
+
+
+def get_stripe_client() -> stripe.StripeClient:
+    """Return the process-wide client, creating it on first use."""
+    global _client, _http_client
+    if _client is None:
+        _http_client = build_http_client()
+        _client = build_stripe_client(STRIPE_SECRET_KEY, _http_client, STRIPE_API_BASE)
+    return _client
+
+
+async def close_stripe_client() -> None:
+    """Close the pooled connections (called on application shutdown)."""
+    global _client, _http_client
+    if _http_client is not None:
+        await _http_client.close_async()
+    _client = _http_client = None
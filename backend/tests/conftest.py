@@ -2,7 +2,18 @@
 Pytest configuration and fixtures for tests.
 """
 
+import os
+
+# backend.database and the Google clients read these at import; tests never
+# connect through them, so placeholders are enough to import the assistant.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
 import pytest
+from backend.services.cache import clear_response_caches
+from backend.services.recommendations import copurchase_index
+from backend.services.search_index import catalog_index
+from .fake_stripe import FakeStripe
 from .helpers import get_test_session
 
 
@@ -14,3 +25,25 @@ def db_session():
         yield session
     finally:
         session.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_response_caches():
+    """Keep cached bodies and in-memory indexes from leaking between test databases."""
+    clear_response_caches()
+    catalog_index.clear()
+    copurchase_index.clear()
+    yield
+    clear_response_caches()
+    catalog_index.clear()
+    copurchase_index.clear()
+
+
+@pytest.fixture
+def fake_stripe():
+    """Run a local fake Stripe API for the duration of a test."""
+    server = FakeStripe().start()
+    try:
+        yield server
+    finally:
+        server.stop()
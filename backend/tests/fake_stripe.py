@@ -0,0 +1,79 @@
+"""
+Local fake of the Stripe API for tests.
+Serves POST /v1/checkout/sessions on a random localhost port, records every
+request and can be told to fail the next calls to exercise client retries.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+class FakeStripe:
+    def __init__(self) -> None:
+        self.requests: list[dict] = []
+        self.failures: list[int] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeStripe":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def fail_next(self, *status_codes: int) -> None:
+        """Answer the next requests with these status codes, in order."""
+        self.failures.extend(status_codes)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                fake.requests.append(
+                    {
+                        "path": self.path,
+                        "params": dict(parse_qsl(body.decode())),
+                        "idempotency_key": self.headers.get("Idempotency-Key"),
+                    }
+                )
+                if fake.failures:
+                    status = fake.failures.pop(0)
+                    self._reply(status, {"error": {"message": "fake failure"}})
+                elif self.path == "/v1/checkout/sessions":
+                    session_id = f"cs_test_{len(fake.requests)}"
+                    self._reply(
+                        200,
+                        {
+                            "id": session_id,
+                            "object": "checkout.session",
+                            "url": f"https://checkout.stripe.test/{session_id}",
+                        },
+                    )
+                else:
+                    self._reply(404, {"error": {"message": "unknown endpoint"}})
+
+            def _reply(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status >= 500:
+                    self.send_header("Stripe-Should-Retry", "true")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,250 @@
+"""
+Query-plan test harness.
+
+Seeds a database large enough for the planner to prefer indexes, records the
+SQL a service call issues, and explains each statement:
+- SQLite: EXPLAIN QUERY PLAN, checked for full table scans and ORDER BY sorts.
+- PostgreSQL (when TEST_POSTGRES_URL points at a scratch database): EXPLAIN
+  (FORMAT JSON), checked for sequential scans, sorts and the planner's row
+  estimate. Postgres rightly prefers a seq scan or sort for a few hundred rows,
+  so those only count above PG_SMALL_ROWS.
+"""
+
+import json
+import re
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event, insert, text
+from sqlmodel import SQLModel, create_engine
+from sqlalchemy.pool import StaticPool
+
+from backend.models import (
+    CheckoutIntent,
+    CustomerSpend,
+    DailyRevenue,
+    Item,
+    ItemSales,
+    Order,
+    OrderItem,
+    User,
+)
+
+USERS = 2000
+ITEMS = 500
+ORDERS_PER_USER = 10
+ITEMS_PER_ORDER = 3
+DAYS = 730
+START_DATE = datetime(2024, 1, 1)
+PG_SMALL_ROWS = 1000
+
+# Tables that grow with traffic; a full scan of any of these is a regression.
+LARGE_TABLES = {
+    "user",
+    "item",
+    "order",
+    "orderitem",
+    "orderarchive",
+    "checkoutintent",
+    "dailyrevenue",
+    "itemsales",
+    "customerspend",
+}
+
+# A SCAN reads the whole table, or the whole index when one is named.
+_SQLITE_SCAN = re.compile(
+    r'^SCAN (?:TABLE )?"?(\w+)"?(?: AS \w+)?(?: USING (?:COVERING )?INDEX \w+)?$'
+)
+
+
+def user_id(n: int) -> str:
+    return f"user-{n:05d}"
+
+
+def order_id(user: int, n: int) -> str:
+    return f"order-{user:05d}-{n:02d}"
+
+
+def _chunks(rows: list, size: int = 5000):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def seed(engine) -> None:
+    """Create the schema and bulk insert a few hundred thousand rows."""
+    SQLModel.metadata.create_all(engine)
+    users = [
+        {"id": user_id(n), "auth0_sub": f"auth0|{n}", "email": f"user{n}@example.com"}
+        for n in range(USERS)
+    ]
+    items = [
+        {"id": n + 1, "name": f"Item {n}", "description": f"Thing number {n}", "price": 1.0 + n}
+        for n in range(ITEMS)
+    ]
+    orders, order_items = [], []
+    for user in range(USERS):
+        for n in range(ORDERS_PER_USER):
+            day = (user * ORDERS_PER_USER + n) % DAYS
+            orders.append(
+                {
+                    "id": order_id(user, n),
+                    "date": START_DATE + timedelta(days=day),
+                    "stripe_id": f"cs_{user}_{n}",
+                    "currency": "usd",
+                    "amount": 1000,
+                    "user_id": user_id(user),
+                    "email": f"user{user}@example.com",
+                }
+            )
+            for k in range(ITEMS_PER_ORDER):
+                order_items.append(
+                    {
+                        "order_id": order_id(user, n),
+                        "item_id": (user * 7 + n * 3 + k) % ITEMS + 1,
+                        "quantity": 1,
+                    }
+                )
+    intents = [
+        {"id": f"intent-{n:05d}", "user_id": user_id(n), "items": "[]", "created_at": START_DATE}
+        for n in range(USERS)
+    ]
+    revenue = [
+        {"day": date(2024, 1, 1) + timedelta(days=n), "currency": "usd", "revenue": 1, "orders": 1}
+        for n in range(DAYS)
+    ]
+    item_sales = [{"item_id": n + 1, "units": n, "orders": n} for n in range(ITEMS)]
+    spend = [
+        {"user_id": user_id(n), "currency": "usd", "total": n, "orders": 1}
+        for n in range(USERS)
+    ]
+    with engine.begin() as connection:
+        for model, rows in (
+            (User, users),
+            (Item, items),
+            (Order, orders),
+            (OrderItem, order_items),
+            (CheckoutIntent, intents),
+            (DailyRevenue, revenue),
+            (ItemSales, item_sales),
+            (CustomerSpend, spend),
+        ):
+            for chunk in _chunks(rows):
+                connection.execute(insert(model), chunk)
+        connection.execute(text("ANALYZE"))
+
+
+def sqlite_engine():
+    return create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def postgres_engine(url: str):
+    engine = create_engine(url)
+    SQLModel.metadata.drop_all(engine)
+    return engine
+
+
+@contextmanager
+def capture_statements(engine):
+    """Record (statement, parameters) of the queries run on engine inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if not executemany and verb in ("SELECT", "UPDATE", "DELETE", "WITH"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def explain_sqlite(connection, statement, parameters) -> dict:
+    rows = connection.exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + statement, parameters
+    ).all()
+    details = [row[-1] for row in rows]
+    scans = set()
+    for detail in details:
+        match = _SQLITE_SCAN.match(detail)
+        if match:
+            scans.add(match.group(1))
+    return {
+        "plan": details,
+        "full_scans": scans,
+        "indexes": {
+            index for detail in details for index in re.findall(r"INDEX (\w+)", detail)
+        },
+        "sorts": any(
+            detail.startswith("USE TEMP B-TREE") and "ORDER BY" in detail
+            for detail in details
+        ),
+        "rows": None,
+    }
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def explain_postgres(connection, statement, parameters) -> dict:
+    (raw,) = connection.exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + statement, parameters
+    ).one()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    nodes = list(_walk(plan))
+    scanned = {node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"}
+    return {
+        "plan": nodes,
+        "full_scans": {
+            table for table in scanned if _pg_table_rows(connection, table) > PG_SMALL_ROWS
+        },
+        "indexes": {node["Index Name"] for node in nodes if "Index Name" in node},
+        "sorts": any(
+            node["Node Type"] == "Sort" and node["Plan Rows"] > PG_SMALL_ROWS
+            for node in nodes
+        ),
+        "rows": plan["Plan Rows"],
+    }
+
+
+def _pg_table_rows(connection, table: str) -> float:
+    return connection.execute(
+        text("SELECT reltuples FROM pg_class WHERE relname = :table"), {"table": table}
+    ).scalar_one()
+
+
+def explain_all(engine, statements) -> list[dict]:
+    explain = explain_postgres if engine.dialect.name == "postgresql" else explain_sqlite
+    with engine.connect() as connection:
+        return [
+            {"statement": statement, **explain(connection, statement, parameters)}
+            for statement, parameters in statements
+        ]
+
+
+def plan_violations(
+    plans: list[dict],
+    allow_scans: set[str] = frozenset(),
+    allow_sort: bool = False,
+    max_rows: int | None = None,
+) -> list[str]:
+    """Describe each full scan, sort or over-estimate that the case does not allow."""
+    violations = []
+    for plan in plans:
+        for table in (plan["full_scans"] & LARGE_TABLES) - allow_scans:
+            violations.append(f"full scan of {table}: {plan['statement']}\n{plan['plan']}")
+        if plan["sorts"] and not allow_sort:
+            violations.append(f"sort without index: {plan['statement']}\n{plan['plan']}")
+        if max_rows is not None and plan["rows"] is not None and plan["rows"] > max_rows:
+            violations.append(
+                f"estimated {plan['rows']} rows > {max_rows}: {plan['statement']}"
+            )
+    return violations
@@ -0,0 +1,83 @@
+"""
+Unit tests for admission control on expensive endpoints.
+Tests token bucket refill and the bounded concurrency queue.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from backend.admission import ConcurrencyLimiter, MemoryTokenBuckets
+
+
+def test_token_bucket_rejects_burst_then_refills(monkeypatch):
+    """A bucket admits its capacity, then asks callers to wait for the refill."""
+    clock = [100.0]
+    monkeypatch.setattr("backend.admission.time.monotonic", lambda: clock[0])
+    buckets = MemoryTokenBuckets()
+
+    async def take(key):
+        return await buckets.take(key, capacity=2, refill_per_second=0.5)
+
+    assert asyncio.run(take("assistant:a")) == 0
+    assert asyncio.run(take("assistant:a")) == 0
+    assert asyncio.run(take("assistant:a")) == pytest.approx(2.0)
+    assert asyncio.run(take("assistant:b")) == 0
+
+    clock[0] += 2
+    assert asyncio.run(take("assistant:a")) == 0
+
+
+def test_token_buckets_stay_within_max_keys(monkeypatch):
+    """Refilled buckets are evicted by their own policy's window, else the oldest go."""
+    clock = [100.0]
+    monkeypatch.setattr("backend.admission.time.monotonic", lambda: clock[0])
+    buckets = MemoryTokenBuckets(max_keys=3)
+
+    def take(key, capacity, refill_per_second):
+        return asyncio.run(buckets.take(key, capacity, refill_per_second))
+
+    take("checkout:slow", capacity=1, refill_per_second=0.01)
+    take("assistant:a", capacity=10, refill_per_second=10)
+    take("assistant:b", capacity=10, refill_per_second=10)
+    clock[0] += 2
+    take("assistant:c", capacity=10, refill_per_second=10)
+    assert set(buckets._buckets) == {"checkout:slow", "assistant:c"}
+    assert take("checkout:slow", capacity=1, refill_per_second=0.01) > 0
+
+    take("assistant:d", capacity=10, refill_per_second=10)
+    take("assistant:e", capacity=10, refill_per_second=10)
+    assert list(buckets._buckets) == ["checkout:slow", "assistant:d", "assistant:e"]
+
+
+def test_concurrency_limiter_rejects_when_queue_is_full():
+    """Requests beyond the running and queued limits get a fast 429."""
+    limiter = ConcurrencyLimiter(limit=1, max_queue=1, timeout=1)
+
+    async def scenario():
+        release = asyncio.Event()
+        results = []
+
+        async def request(name):
+            try:
+                async with limiter.slot():
+                    await release.wait()
+                results.append((name, "done"))
+            except HTTPException as exc:
+                results.append((name, exc.status_code))
+
+        running = asyncio.create_task(request("running"))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(request("queued"))
+        await asyncio.sleep(0)
+        await request("rejected")
+        release.set()
+        await asyncio.gather(running, queued)
+        return results
+
+    assert asyncio.run(scenario()) == [
+        ("rejected", 429),
+        ("running", "done"),
+        ("queued", "done"),
+    ]
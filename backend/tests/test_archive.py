@@ -0,0 +1,65 @@
+"""
+Unit tests for order archival.
+Tests that old orders move to the archive and read back in the same shape,
+and that statistics and user deletes account for archived orders.
+"""
+
+from datetime import datetime, timedelta, UTC
+
+from sqlmodel import select, update
+
+from backend.models import Order, OrderArchive, OrderItem, UserSelection
+from backend.services.archive_services import archive_orders_service
+from backend.services.order_services import (
+    get_order_by_id_service,
+    get_user_orders_service,
+)
+from backend.services.stats_services import get_top_items_service, rebuild_stats_service
+from backend.services.user_services import bulk_delete_users_service
+from .helpers import create_test_user, create_test_item, create_test_order
+
+
+def create_old_order(db_session, user, *item_quantities, days_ago=400):
+    order = create_test_order(db_session, user.id, *item_quantities)
+    old_date = datetime.now(UTC) - timedelta(days=days_ago)
+    db_session.exec(update(Order).where(Order.id == order["id"]).values(date=old_date))
+    db_session.commit()
+    return get_order_by_id_service(order["id"], db_session)
+
+
+def test_archive_moves_old_orders_and_keeps_read_shape(db_session):
+    """Archived orders leave the hot tables but read back unchanged."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=5.0)
+    old_order = create_old_order(db_session, user, (mug, 2))
+    recent_order = create_test_order(db_session, user.id, (mug, 1))
+
+    result = archive_orders_service(db_session, chunk_size=1)
+
+    assert result == {"archived": 1}
+    assert db_session.exec(select(Order.id)).all() == [recent_order["id"]]
+    assert db_session.exec(
+        select(OrderItem).where(OrderItem.order_id == old_order["id"])
+    ).all() == []
+    assert get_order_by_id_service(old_order["id"], db_session) == old_order
+    assert [order["id"] for order in get_user_orders_service(user, db_session)] == [
+        recent_order["id"],
+        old_order["id"],
+    ]
+    assert archive_orders_service(db_session) == {"archived": 0}
+
+
+def test_archived_orders_count_in_stats_and_user_deletes(db_session):
+    """Rebuilt rollups include archived orders; deleting a user removes its archive."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=5.0)
+    create_old_order(db_session, user, (mug, 2))
+    create_test_order(db_session, user.id, (mug, 1))
+    archive_orders_service(db_session)
+
+    assert get_top_items_service(db_session)[0]["units"] == 3
+    rebuild_stats_service(db_session)
+    assert get_top_items_service(db_session)[0]["units"] == 3
+
+    bulk_delete_users_service(UserSelection(ids=[user.id]), db_session)
+    assert db_session.exec(select(OrderArchive)).all() == []
@@ -0,0 +1,180 @@
+"""
+Graph-level tests for the assistant's tool loop, driven by a scripted model.
+Tests local cart edits, tool results going back to the model, the round limit
+and malformed tool arguments.
+"""
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, ToolMessage
+
+from backend.ai import app as assistant
+from backend.ai import tools
+from backend.ai.tools import apply_cart_tool_calls
+from backend.models import Cart, CartItem, Item
+
+ITEMS = {
+    1: Item(id=1, name="Pen", price=1.0, description="Blue ink pen"),
+    2: Item(id=2, name="Notebook", price=3.0, description="Lined notebook"),
+}
+
+
+def call(name: str, n: int = 0, **args) -> dict:
+    return {"name": name, "args": args, "id": f"call-{name}-{n}"}
+
+
+class ScriptedLLM:
+    """Returns copies of the scripted responses in order (repeating the last) and keeps the prompts."""
+
+    def __init__(self, *responses: AIMessage) -> None:
+        self.responses = list(responses)
+        self.prompts = []
+
+    def invoke(self, prompt, *args, **kwargs):
+        self.prompts.append(prompt)
+        # A fresh message per call, as from a real model; the graph assigns message ids.
+        return self.responses[min(len(self.prompts), len(self.responses)) - 1].model_copy()
+
+
+class QueryLLM:
+    def invoke(self, question, *args, **kwargs):
+        return {"query": question, "section": "middle"}
+
+
+@pytest.fixture
+def scripted(monkeypatch):
+    """Install a scripted model and a fixed two-item catalog in the assistant."""
+
+    def install(*responses: AIMessage) -> ScriptedLLM:
+        llm = ScriptedLLM(*responses)
+        monkeypatch.setattr(assistant, "llm", llm)
+        return llm
+
+    def similar_items(query, k=3, section=None):
+        return [Document(page_content=ITEMS[1].description, metadata={"id": 1, "name": "Pen"})]
+
+    monkeypatch.setattr(assistant, "query_llm", QueryLLM())
+    monkeypatch.setattr(assistant, "retrieve_context", lambda *args, **kwargs: [])
+    monkeypatch.setattr(assistant, "get_items_dict", lambda: dict(ITEMS))
+    monkeypatch.setattr(tools, "retrieve_context", similar_items)
+    return install
+
+
+def ask(question: str, cart: Cart | None = None) -> dict:
+    return assistant.ask_question(question, user_id=f"test-{question}", cart=cart)
+
+
+def test_cart_only_calls_answer_without_second_model_call(scripted):
+    """Add/remove calls are applied locally and the reply is composed without the model."""
+    llm = scripted(
+        AIMessage(
+            content="",
+            tool_calls=[
+                call("add_item_to_cart", item_id=2, quantity=2),
+                call("remove_items_from_cart", item_ids=[1]),
+            ],
+        )
+    )
+
+    reply = ask("Swap the pen for two notebooks", Cart(items=[CartItem(id=1, qty=1)]))
+
+    assert len(llm.prompts) == 1
+    assert reply["cart"].model_dump() == {"items": [{"id": 2, "qty": 2}]}
+    assert reply["answer"] == (
+        "Thanks for asking! Added Notebook to your cart. Removed Pen from your cart."
+    )
+
+
+def test_remote_call_results_go_back_to_the_model(scripted):
+    """A recommendation is answered by a second generate round that sees the tool result."""
+    llm = scripted(
+        AIMessage(content="", tool_calls=[call("recommend_similar_items", query="pen")]),
+        AIMessage(content="Thanks for asking! Try the Pen."),
+    )
+
+    reply = ask("What pen do you have?")
+
+    assert reply["answer"] == "Thanks for asking! Try the Pen."
+    assert len(llm.prompts) == 2
+    tool_result = llm.prompts[1][-1]
+    assert isinstance(tool_result, ToolMessage)
+    assert tool_result.tool_call_id == "call-recommend_similar_items-0"
+    assert '"name": "Pen"' in tool_result.content
+
+
+def test_tool_loop_stops_at_max_rounds(scripted):
+    """A model that keeps calling tools gets a locally composed reply after MAX_TOOL_ROUNDS."""
+    llm = scripted(
+        AIMessage(content="", tool_calls=[call("recommend_similar_items", query="pen")])
+    )
+
+    reply = ask("Recommend pens forever")
+
+    assert len(llm.prompts) == assistant.MAX_TOOL_ROUNDS
+    assert reply["answer"] == "Thanks for asking! I recommend Pen."
+
+
+def test_unknown_and_malformed_item_ids_are_reported(scripted):
+    """Unknown or malformed ids leave the cart alone and get the unavailable reply."""
+    llm = scripted(
+        AIMessage(
+            content="",
+            tool_calls=[
+                call("add_item_to_cart", 0, item_id=99),
+                call("add_item_to_cart", 1, item_id="pen"),
+                call("add_item_to_cart", 2, item_id=1, quantity=-1),
+                call("remove_items_from_cart", item_ids="1"),
+            ],
+        )
+    )
+
+    reply = ask("Add the unicorn", Cart(items=[CartItem(id=1, qty=1)]))
+
+    assert len(llm.prompts) == 1
+    assert reply["cart"].model_dump() == {"items": [{"id": 1, "qty": 1}]}
+    assert reply["answer"] == "Thanks for asking! Unfortunately, we don't have that product."
+
+
+def test_apply_cart_tool_calls_validates_arguments():
+    """Numeric strings are accepted; bad values are unknown; removals only list cart items."""
+    cart = Cart(items=[CartItem(id=1, qty=1)])
+
+    added, removed, unknown = apply_cart_tool_calls(
+        cart,
+        [
+            call("add_item_to_cart", item_id="2", quantity=2.0),
+            call("add_item_to_cart", item_id=True),
+            call("remove_items_from_cart", item_ids=[1, 2, 3, "x", None]),
+        ],
+        known_item_ids=set(ITEMS),
+    )
+
+    assert (added, removed, unknown) == ([2], [1, 2], [True, "x", None])
+    assert cart.model_dump() == {"items": []}
+
+
+def test_mixed_recommend_and_add_returns_to_the_model(scripted):
+    """With a recommendation in the same message, the cart edit is applied and both results go back."""
+    llm = scripted(
+        AIMessage(
+            content="",
+            tool_calls=[
+                call("recommend_similar_items", query="pen"),
+                call("add_item_to_cart", item_id=2),
+            ],
+        ),
+        AIMessage(content="Thanks for asking! Try the Pen; I added a Notebook."),
+    )
+
+    reply = ask("Recommend a pen and add a notebook")
+
+    assert reply["answer"] == "Thanks for asking! Try the Pen; I added a Notebook."
+    assert reply["cart"].model_dump() == {"items": [{"id": 2, "qty": 1}]}
+    assert len(llm.prompts) == 2
+    results = {
+        msg.tool_call_id: msg.content
+        for msg in llm.prompts[1]
+        if isinstance(msg, ToolMessage)
+    }
+    assert results["call-add_item_to_cart-0"] == "done"
+    assert '"name": "Pen"' in results["call-recommend_similar_items-0"]
@@ -0,0 +1,35 @@
+"""
+Unit tests for the indexed cart model used by the assistant tools.
+Tests batch add/remove operations and the plain CartItem wire format.
+"""
+
+from backend.models import Cart, CartItem
+
+
+def test_cart_add_items_merges_quantities():
+    """Adding an existing item increases its quantity instead of adding a line."""
+    cart = Cart(items=[CartItem(id=1, qty=1)])
+
+    cart.add_items([(1, 2), (2, 1), (2, 3)])
+
+    assert cart.model_dump() == {"items": [{"id": 1, "qty": 3}, {"id": 2, "qty": 4}]}
+
+
+def test_cart_remove_items_batch():
+    """Removing several ids drops every matching line and ignores unknown ids."""
+    cart = Cart(items=[CartItem(id=item_id, qty=1) for item_id in range(1, 6)])
+
+    cart.remove_items([2, 4, 99])
+
+    assert [cart_item.id for cart_item in cart.items] == [1, 3, 5]
+    cart.add_items([(2, 1)])
+    assert [cart_item.id for cart_item in cart.items] == [1, 3, 5, 2]
+
+
+def test_cart_normalizes_duplicate_lines():
+    """Duplicate lines from the client are merged when the index is built."""
+    cart = Cart(items=[CartItem(id=7, qty=1), CartItem(id=7, qty=2)])
+
+    cart.add_items([(8, 1)])
+
+    assert cart.model_dump() == {"items": [{"id": 7, "qty": 3}, {"id": 8, "qty": 1}]}
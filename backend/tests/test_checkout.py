@@ -0,0 +1,170 @@
+"""
+Unit tests for checkout services.
+Tests line item building, checkout session creation against a fake Stripe API
+and turning stored checkout intents into orders.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session
+
+from backend.models import CartItem
+from backend.services.checkout_services import (
+    build_line_items,
+    cart_quantities,
+    complete_checkout_service,
+    create_checkout_intent_service,
+    create_checkout_session_service,
+)
+from backend.services.order_services import get_orders_admin_service
+from backend.stripe_client import build_http_client, build_stripe_client
+from .helpers import create_test_item, create_test_user
+
+
+def create_session(fake_stripe, line_items, user, max_retries=2):
+    async def run():
+        http_client = build_http_client(timeout=5)
+        client = build_stripe_client(
+            "sk_test_fake", http_client, api_base=fake_stripe.url, max_retries=max_retries
+        )
+        try:
+            return await create_checkout_session_service(
+                client=client,
+                line_items=line_items,
+                user=user,
+                metadata={"user_id": str(user.id)},
+                frontend_url="http://frontend.test",
+            )
+        finally:
+            await http_client.close_async()
+
+    return asyncio.run(run())
+
+
+def test_build_line_items_rejects_unknown_items(db_session):
+    """Carts referencing missing items are rejected before calling Stripe."""
+    mug = create_test_item(db_session, name="Mug", price=9.5)
+
+    line_items = build_line_items({mug.id: 2}, db_session)
+    assert line_items == [
+        {
+            "price_data": {
+                "currency": "usd",
+                "product_data": {"name": "Mug"},
+                "unit_amount": 950,
+            },
+            "quantity": 2,
+        }
+    ]
+
+    with pytest.raises(HTTPException) as exc_info:
+        build_line_items({mug.id: 1, 999: 1}, db_session)
+    assert exc_info.value.status_code == 400
+
+
+def test_checkout_session_created_through_async_client(db_session, fake_stripe):
+    """The session is created with the cart's line items and the user's email."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=9.5)
+
+    url = create_session(fake_stripe, build_line_items({mug.id: 2}, db_session), user)
+
+    assert url == "https://checkout.stripe.test/cs_test_1"
+    params = fake_stripe.requests[0]["params"]
+    assert params["line_items[0][price_data][unit_amount]"] == "950"
+    assert params["line_items[0][quantity]"] == "2"
+    assert params["customer_email"] == user.email
+    assert params["metadata[user_id]"] == str(user.id)
+
+
+def test_checkout_retries_with_same_idempotency_key(db_session, fake_stripe):
+    """Transient Stripe failures are retried with the same idempotency key."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=9.5)
+    fake_stripe.fail_next(503)
+
+    url = create_session(fake_stripe, build_line_items({mug.id: 1}, db_session), user)
+
+    assert url.startswith("https://checkout.stripe.test/")
+    assert len(fake_stripe.requests) == 2
+    first, second = fake_stripe.requests
+    assert first["idempotency_key"] and first["idempotency_key"] == second["idempotency_key"]
+
+
+def test_checkout_stripe_failure_is_reported(db_session, fake_stripe):
+    """Failures that outlast the retries surface as a Stripe error response."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=9.5)
+    fake_stripe.fail_next(400)
+
+    with pytest.raises(HTTPException) as exc_info:
+        create_session(fake_stripe, build_line_items({mug.id: 1}, db_session), user)
+    assert exc_info.value.status_code == 500
+    assert len(fake_stripe.requests) == 1
+
+
+def completed_session(intent_id, stripe_id="cs_test_1"):
+    return {
+        "id": stripe_id,
+        "metadata": {"checkout_intent_id": intent_id},
+        "currency": "usd",
+        "amount_total": 1900,
+        "customer_email": "test@example.com",
+    }
+
+
+def test_checkout_intent_completes_into_one_order(db_session):
+    """The webhook builds the order from the stored intent, once per intent."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=9.5)
+    cart = [CartItem(id=mug.id, qty=1), CartItem(id=mug.id, qty=1)]
+    intent = create_checkout_intent_service(user.id, cart_quantities(cart), db_session)
+
+    order = complete_checkout_service(completed_session(intent.id), db_session)
+
+    assert order["user_id"] == user.id
+    assert order["stripe_id"] == "cs_test_1"
+    assert [(i["item_id"], i["quantity"]) for i in order["items"]] == [(mug.id, 2)]
+    assert complete_checkout_service(completed_session(intent.id), db_session) is None
+    assert len(get_orders_admin_service(db_session)) == 1
+
+
+def test_checkout_unknown_intent_is_rejected(db_session):
+    """Sessions pointing at a missing intent do not create orders."""
+    with pytest.raises(HTTPException) as exc_info:
+        complete_checkout_service(completed_session("missing"), db_session)
+    assert exc_info.value.status_code == 404
+
+
+def test_checkout_completion_is_claimed_once(db_session):
+    """A delivery holding a stale copy of the intent does not create a second order."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=9.5)
+    intent = create_checkout_intent_service(user.id, {mug.id: 1}, db_session)
+
+    with Session(db_session.get_bind()) as other:
+        assert complete_checkout_service(completed_session(intent.id), other)
+
+    assert intent.completed_at is None
+    assert complete_checkout_service(completed_session(intent.id), db_session) is None
+    assert len(get_orders_admin_service(db_session)) == 1
+
+
+def test_legacy_checkout_redelivery_creates_one_order(db_session):
+    """Sessions carrying the cart in metadata are deduplicated by Stripe session id."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=9.5)
+    session = {
+        **completed_session(None, stripe_id="cs_legacy"),
+        "metadata": {
+            "user_id": user.id,
+            "cart_items": json.dumps([{"id": mug.id, "qty": 2}]),
+        },
+    }
+
+    assert complete_checkout_service(session, db_session)["stripe_id"] == "cs_legacy"
+    assert complete_checkout_service(session, db_session) is None
+    assert len(get_orders_admin_service(db_session)) == 1
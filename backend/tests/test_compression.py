@@ -0,0 +1,61 @@
+"""
+Unit tests for the response compression middleware.
+Tests encoding negotiation, the size threshold and streamed responses.
+"""
+
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.compression import CompressionMiddleware, negotiate_encoding
+
+
+def test_negotiate_encoding_respects_quality_and_preference():
+    """The client's q-values win; ties fall back to the server's order."""
+    preferred = ["zstd", "br", "gzip"]
+    assert negotiate_encoding("gzip, br", preferred) == "br"
+    assert negotiate_encoding("br;q=0.5, gzip", preferred) == "gzip"
+    assert negotiate_encoding("*", preferred) == "zstd"
+    assert negotiate_encoding("identity", preferred) is None
+    assert negotiate_encoding("gzip;q=0", preferred) is None
+
+
+def test_middleware_compresses_large_and_streamed_bodies():
+    """Small bodies pass through; large and streamed ones are gzip encoded."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100, encodings=["gzip"])
+    large = b'{"name": "apple"}' * 50
+
+    @app.get("/small")
+    def small():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @app.get("/large")
+    def large_body():
+        return Response(large, media_type="application/json")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            (b'{"n": %d}\n' % n for n in range(3)), media_type="application/x-ndjson"
+        )
+
+    client = TestClient(app)
+    headers = {"Accept-Encoding": "gzip"}
+
+    response = client.get("/small", headers=headers)
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/large", headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(large)
+    assert response.content == large
+
+    response = client.get("/stream", headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.splitlines() == ['{"n": 0}', '{"n": 1}', '{"n": 2}']
+
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == large
@@ -0,0 +1,105 @@
+"""
+Unit tests for the assistant's background indexing pipeline.
+Tests queue coalescing, embedding retries with backoff and item deletes,
+with a fake embedder and inline chunking (no process pool, no worker thread).
+"""
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from backend.ai import indexer as indexing
+from backend.ai import vectorstore
+from backend.ai.indexer import IndexingWorker, embed_with_retry
+from backend.models import Item
+
+
+class FlakyEmbeddings(DeterministicFakeEmbedding):
+    """Fails the first `failures` calls with the given error, then embeds."""
+
+    failures: int = 0
+    error: str = "503 Service Unavailable"
+    calls: int = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError(self.error)
+        return super().embed_documents(texts)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping; jitter is pinned to zero."""
+    delays = []
+    monkeypatch.setattr(indexing.time, "sleep", delays.append)
+    monkeypatch.setattr(indexing.random, "uniform", lambda low, high: 0.0)
+    monkeypatch.setattr(indexing, "EMBED_RETRY_BASE_SECONDS", 1.0)
+    return delays
+
+
+@pytest.fixture
+def fake_store(monkeypatch):
+    """An empty vector store; embeddings come from a fake embedder."""
+    embeddings = FlakyEmbeddings(size=8)
+    monkeypatch.setattr(vectorstore, "embeddings", embeddings)
+    monkeypatch.setattr(vectorstore.vector_store, "embedding", embeddings)
+    monkeypatch.setattr(vectorstore.vector_store, "store", {})
+    monkeypatch.setattr(vectorstore, "item_doc_ids", {})
+    return embeddings
+
+
+def test_enqueue_coalesces_pending_ids():
+    """Ids queued again before they are taken are indexed once, in first-queued order."""
+    worker = IndexingWorker(batch_size=2)
+
+    worker.enqueue([1, 2, 1])
+    worker.enqueue([2, 3])
+
+    assert worker.status()["queue_depth"] == 3
+    assert worker._take_batch() == [1, 2]
+    assert worker.status()["in_flight"] == 2
+    worker.enqueue([1])
+    assert worker._take_batch() == [3, 1]
+    assert worker.status()["queue_depth"] == 0
+
+
+def test_embed_with_retry_backs_off_longer_when_rate_limited(fake_store, sleeps):
+    """Delays double per attempt, and double again for rate-limit errors."""
+    retries_before = indexing.indexer.status()["embed_retries"]
+    fake_store.failures, fake_store.error = 2, "429 RESOURCE_EXHAUSTED"
+
+    vectors = embed_with_retry(["a", "b"])
+
+    assert len(vectors) == 2
+    assert sleeps == [2.0, 4.0]
+    assert indexing.indexer.status()["embed_retries"] == retries_before + 2
+
+
+def test_embed_with_retry_gives_up_after_max_retries(fake_store, sleeps, monkeypatch):
+    """The last error is raised once EMBED_MAX_RETRIES retries have failed."""
+    monkeypatch.setattr(indexing, "EMBED_MAX_RETRIES", 2)
+    fake_store.failures = 10
+
+    with pytest.raises(RuntimeError, match="503"):
+        embed_with_retry(["a"])
+
+    assert sleeps == [1.0, 2.0]
+    assert fake_store.calls == 3
+
+
+def test_process_indexes_fresh_items_and_removes_deleted_ones(fake_store, monkeypatch):
+    """Items missing from the database are dropped from the vector store in the same commit."""
+    pen = Item(id=1, name="Pen", description="Blue ink", price=1.0)
+    mug = Item(id=2, name="Mug", description="Ceramic", price=5.0)
+    worker = IndexingWorker()
+    monkeypatch.setattr(indexing, "refresh_items", lambda item_ids: [pen, mug])
+    worker.process([1, 2])
+    assert set(vectorstore.item_doc_ids) == {1, 2}
+
+    pen.description = "Red ink"
+    monkeypatch.setattr(indexing, "refresh_items", lambda item_ids: [pen])
+    worker.process([1, 2])
+
+    assert set(vectorstore.item_doc_ids) == {1}
+    texts = [entry["text"] for entry in vectorstore.vector_store.store.values()]
+    assert texts == ["Item Name: Pen, Item Description: Red ink"]
@@ -3,16 +3,26 @@ Unit tests for item service functions.
 Tests CRUD operations and search functionality using database fixtures.
 """
 
+import io
+import json
+import threading
+import time
+
 import pytest
 from backend.services.item_services import (
     get_items_service,
+    get_items_json_service,
     get_item_service,
     create_item_service,
     update_item_service,
     delete_item_service,
+    bulk_import_items_service,
 )
+from backend.services import search_index
+from backend.services.events import subscribe, unsubscribe, ITEMS_CHANGED
+from backend.services.search_index import BM25Index
 from backend.models import Item
-from .helpers import create_test_item
+from .helpers import create_test_item, get_test_session
 
 
 def test_get_items_service(db_session):
@@ -76,3 +86,147 @@ def test_delete_item_service(db_session):
     with pytest.raises(Exception):  # Expected item not found
         get_item_service(created_item.id, db_session)
 
+
+def test_get_items_json_service_invalidated_on_create(db_session):
+    """Test cached item list bodies are refreshed after an item is created."""
+    create_test_item(db_session, "Apple", 2.99, "Fresh apple")
+
+    body = json.loads(get_items_json_service(search="", db=db_session))
+    assert [item["name"] for item in body["items"]] == ["Apple"]
+
+    create_test_item(db_session, "Banana", 1.99, "Yellow banana")
+
+    body = json.loads(get_items_json_service(search="", db=db_session))
+    assert len(body["items"]) == 2
+
+
+def test_bulk_import_items_service_upserts_and_reports_errors(db_session):
+    """Test bulk import inserts new rows, updates changed rows and reports bad rows."""
+    existing = create_test_item(db_session, "Apple", 2.99, "Fresh apple")
+    unchanged = create_test_item(db_session, "Banana", 1.99, "Yellow banana")
+    feed = io.StringIO(
+        "id,name,description,price,image_src\n"
+        f"{existing.id},Green Apple,Tart apple,3.49,\n"
+        f"{unchanged.id},Banana,Yellow banana,1.99,\n"
+        ",Cherry,Red cherry,0.99,\n"
+        ",Broken,Bad price,abc,\n"
+        ",Negative,Bad price,-1,\n"
+    )
+
+    report = bulk_import_items_service(feed, "csv", db_session, batch_size=2)
+
+    assert report["inserted"] == 1
+    assert report["updated"] == 1
+    assert report["unchanged"] == 1
+    assert report["failed"] == 2
+    assert [error["row"] for error in report["errors"]] == [4, 5]
+    assert get_item_service(existing.id, db_session).name == "Green Apple"
+    names = {item.name for item in get_items_service(search="", db=db_session)}
+    assert names == {"Green Apple", "Banana", "Cherry"}
+
+
+def test_bulk_import_items_service_publishes_changed_ids_only(db_session):
+    """Test only inserted or modified items are published as changed."""
+    existing = create_test_item(db_session, "Apple", 2.99, "Fresh apple")
+    published = []
+    subscribe(ITEMS_CHANGED, published.append)
+    try:
+        feed = io.StringIO(
+            json.dumps(
+                {
+                    "id": existing.id,
+                    "name": "Apple",
+                    "description": "Fresh apple",
+                    "price": 2.99,
+                }
+            )
+            + "\n"
+            + json.dumps({"name": "Kiwi", "price": 1.25})
+            + "\n"
+        )
+        bulk_import_items_service(feed, "ndjson", db_session)
+    finally:
+        unsubscribe(ITEMS_CHANGED, published.append)
+
+    assert len(published) == 1
+    assert existing.id not in published[0]
+    assert len(published[0]) == 1
+
+
+def test_get_items_service_search_ranks_prefix_and_description(db_session):
+    """Test search matches term prefixes across name and description, best match first."""
+    create_test_item(db_session, "Blue Pen", 1.99, "Smooth ink pen")
+    create_test_item(db_session, "Notebook", 3.99, "Pairs well with a pen")
+    create_test_item(db_session, "Red Mug", 7.99, "Ceramic mug")
+
+    items = get_items_service(search="pe", db=db_session)
+
+    assert [item.name for item in items] == ["Blue Pen", "Notebook"]
+
+
+def test_get_items_service_search_follows_item_updates(db_session):
+    """Test the search index is refreshed when items change."""
+    created = create_test_item(db_session, "Pear", 4.99, "Green pear")
+    assert len(get_items_service(search="pear", db=db_session)) == 1
+
+    update_item_service(
+        created.id, Item(name="Quince", description="Yellow", price=4.99), db_session
+    )
+
+    assert get_items_service(search="pear", db=db_session) == []
+    assert [item.id for item in get_items_service("quince", db_session)] == [created.id]
+
+
+def test_search_index_picks_up_changes_from_other_workers(db_session, monkeypatch):
+    """Items added or renamed without an event in this worker are found by polling updated_at."""
+    pear = create_test_item(db_session, "Pear", 4.99, "Green pear")
+    assert [item.id for item in get_items_service("pear", db_session)] == [pear.id]
+
+    # Another worker's writes: committed, but no items_changed event here.
+    pear.name = "Medlar"
+    db_session.add(pear)
+    quince = Item(name="Quince", description="Yellow", price=2.5)
+    db_session.add(quince)
+    db_session.commit()
+    assert get_items_service("quince", db_session) == []
+
+    monkeypatch.setattr(search_index, "SEARCH_INDEX_SYNC_SECONDS", -1)
+    assert [item.id for item in get_items_service("quince", db_session)] == [quince.id]
+    assert [item.id for item in get_items_service("medlar", db_session)] == [pear.id]
+
+
+def test_search_index_reads_from_primary_and_reloads_once(db_session, monkeypatch):
+    """Loads and refreshes ignore a lagging replica; stale rebuilds run single-flight."""
+    item = create_test_item(db_session, "Quince", 4.99, "Yellow")
+    replica = get_test_session()
+    create_test_item(replica, "Pear", 4.99, "Green pear")
+    index = BM25Index()
+    index.set_primary(db_session.get_bind())
+
+    index.ensure_loaded(replica)
+    assert [item_id for item_id, _ in index.search("quince")] == [item.id]
+
+    item.name = "Medlar"
+    db_session.add(item)
+    db_session.commit()
+    index.refresh([item.id])
+    assert [item_id for item_id, _ in index.search("medlar")] == [item.id]
+
+    monkeypatch.setattr(search_index, "SEARCH_INDEX_MAX_AGE", -1)
+    release = threading.Event()
+    builds = []
+    build = index._build
+
+    def slow_build(bind):
+        builds.append(bind)
+        release.wait(5)
+        build(bind)
+
+    monkeypatch.setattr(index, "_build", slow_build)
+    index.ensure_loaded(replica)
+    index.ensure_loaded(replica)
+    release.set()
+    while index._reloading:
+        time.sleep(0.01)
+    assert len(builds) == 1
+    assert [item_id for item_id, _ in index.search("medlar")] == [item.id]
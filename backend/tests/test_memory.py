@@ -0,0 +1,61 @@
+"""
+Unit tests for the assistant's rolling conversation memory.
+Tests that old turns fold into a bounded summary that keeps cart actions.
+"""
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from backend.ai.memory import compact_history, is_summary
+from backend.ai.utils import estimate_tokens
+from backend.models import Item
+
+
+def turn(n: int) -> list:
+    return [
+        HumanMessage(content=f"Question {n}"),
+        AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": "add_item_to_cart",
+                    "args": {"item_id": 1, "quantity": n},
+                    "id": f"c{n}",
+                }
+            ],
+        ),
+        ToolMessage(content="x" * 500, tool_call_id=f"c{n}", name="add_item_to_cart"),
+        HumanMessage(content=f"Thanks {n}"),
+        AIMessage(content=f"Thanks for asking! Answer {n}."),
+    ]
+
+
+def test_compact_history_summarizes_older_turns():
+    """Older turns become one summary line each, with tool calls and item names."""
+    lookup = {1: Item(id=1, name="Notebook", price=3.0)}
+    messages = turn(1) + turn(2)
+
+    compacted = compact_history(messages, lookup, keep=4, budget=300)
+
+    summary, *recent = compacted
+    assert is_summary(summary)
+    assert summary.content.splitlines()[1:] == [
+        "User: Question 1 | Actions: add_item_to_cart(item_id=1 Notebook, quantity=1)",
+        "User: Thanks 1 | Assistant: Thanks for asking! Answer 1.",
+    ]
+    assert [msg.content for msg in recent] == [
+        "Question 2", "", "Thanks 2", "Thanks for asking! Answer 2."
+    ]
+    assert not any(isinstance(msg, ToolMessage) for msg in compacted)
+
+
+def test_compact_history_stays_bounded_over_long_sessions():
+    """Repeated compaction keeps the stored history and summary within budget."""
+    history = []
+    for n in range(50):
+        history = compact_history(history + turn(n), {}, keep=4, budget=100)
+
+    summary = history[0]
+    assert is_summary(summary)
+    assert estimate_tokens(summary.content) <= 100
+    assert "Thanks 48" in summary.content
+    assert len(history) == 5
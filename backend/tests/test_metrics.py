@@ -0,0 +1,52 @@
+"""
+Unit tests for the assistant's in-process latency and usage metrics.
+Tests percentile math, node timing and per-turn usage accounting.
+"""
+
+from backend.ai.metrics import (
+    current_turn,
+    finish_turn,
+    metrics_snapshot,
+    percentile,
+    record_llm_call,
+    reset_metrics,
+    start_turn,
+    timed_node,
+)
+
+
+def test_percentile_nearest_rank():
+    """p50/p95 use the nearest-rank method and empty samples have no percentile."""
+    values = [float(n) for n in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([], 50) is None
+
+
+def test_turn_usage_and_node_timing():
+    """Timed nodes and LLM calls made during a turn show up in the snapshot."""
+    reset_metrics()
+
+    @timed_node
+    def generate(state):
+        record_llm_call(100, 20)
+        return state
+
+    turn = start_turn()
+    generate({})
+    record_llm_call(10, 5)
+    finish_turn(turn, 0.25)
+
+    assert current_turn() == {
+        "llm_calls": 2,
+        "input_tokens": 110,
+        "output_tokens": 25,
+        "seconds": 0.25,
+    }
+    snapshot = metrics_snapshot()
+    assert snapshot["nodes"]["generate"]["count"] == 1
+    assert snapshot["turns"] == 1
+    assert snapshot["llm_calls_per_turn"] == 2
+    assert snapshot["tokens_per_turn"] == 135
+    assert snapshot["turn"]["p50_ms"] == 250.0
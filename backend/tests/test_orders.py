@@ -3,17 +3,33 @@ Unit tests for order service functions.
 Tests order creation, retrieval, and user order management.
 """
 
+import json
+
 import pytest
 from backend.services.order_services import (
     get_user_orders_service,
+    get_user_orders_json_service,
     get_order_by_id_service,
     create_order_service,
     get_orders_admin_service,
     update_order_service,
     delete_order_service,
     get_order_by_id_service,
+    bulk_delete_orders_service,
+    bulk_update_orders_service,
+)
+from fastapi import HTTPException
+from sqlmodel import select
+from backend.database import MemoryWriteMarkers
+from backend.services.cache import BytesCache
+from backend.models import (
+    OrderCreate,
+    OrderItemCreate,
+    Order,
+    OrderItem,
+    OrderSelection,
+    OrderBulkUpdate,
 )
-from backend.models import OrderCreate, OrderItemCreate, Order, OrderItem
 from .helpers import create_test_user, create_test_item, create_test_order
 
 
@@ -134,3 +150,95 @@ def test_delete_order_service_removes_order_and_items(db_session):
 
     with pytest.raises(Exception):
         get_order_by_id_service(order_id, db_session)
+
+
+def test_get_user_orders_json_service_matches_service(db_session):
+    """Test the pre-serialized order list matches the dict service and refreshes."""
+    user = create_test_user(db_session, "Ada")
+    item = create_test_item(db_session, "Plum", 1.50, "Purple plum")
+    create_test_order(db_session, user.id, (item, 2))
+
+    body = json.loads(get_user_orders_json_service(user, db_session))
+    assert len(body["orders"]) == 1
+    assert body["orders"][0]["items"][0]["quantity"] == 2
+
+    create_test_order(db_session, user.id, (item, 1))
+
+    body = json.loads(get_user_orders_json_service(user, db_session))
+    assert len(body["orders"]) == 2
+
+
+def test_response_cache_invalidation_reaches_other_workers():
+    """A write on one worker makes the others rebuild until their old entries expire."""
+    markers = MemoryWriteMarkers()
+    worker_a, worker_b = BytesCache("orders", 8), BytesCache("orders", 8)
+    worker_a.markers = worker_b.markers = markers
+    assert worker_b.get_or_set("orders", lambda: b"old") == b"old"
+
+    worker_a.invalidate()
+
+    assert worker_b.get_or_set("orders", lambda: b"new") == b"new"
+    uncached = BytesCache("orders", 8, ttl=0)
+    assert uncached.get_or_set("orders", lambda: b"one") == b"one"
+    assert uncached.get_or_set("orders", lambda: b"two") == b"two"
+
+
+def test_order_services_return_requested_fields(db_session):
+    """A sparse fieldset trims orders and nested items; unknown fields are rejected."""
+    user = create_test_user(db_session, "Ada")
+    item = create_test_item(db_session, "Plum", 1.50, "Purple plum")
+    created = create_test_order(db_session, user.id, (item, 2))
+
+    body = json.loads(get_user_orders_json_service(user, db_session, "id,items.name"))
+    assert body["orders"] == [{"id": created["id"], "items": [{"name": "Plum"}]}]
+
+    order = get_order_by_id_service(created["id"], db_session, "date")
+    assert list(order) == ["date"]
+
+    with pytest.raises(HTTPException) as exc:
+        get_order_by_id_service(created["id"], db_session, "id,secret")
+    assert exc.value.status_code == 400
+
+
+def test_bulk_delete_orders_service_by_user_filter(db_session):
+    """Bulk delete removes only the selected user's orders and their items."""
+    keep_user = create_test_user(db_session, auth0_sub="auth0|keep")
+    drop_user = create_test_user(db_session, auth0_sub="auth0|drop")
+    item = create_test_item(db_session, "Fig", 1.00, "Fig")
+    kept = create_test_order(db_session, keep_user.id, (item, 1))
+    create_test_order(db_session, drop_user.id, (item, 1))
+    create_test_order(db_session, drop_user.id, (item, 2))
+
+    result = bulk_delete_orders_service(
+        OrderSelection(user_id=drop_user.id), db_session, chunk_size=1
+    )
+
+    assert result == {"matched": 2, "deleted": 2}
+    remaining = get_orders_admin_service(db_session)
+    assert [order["id"] for order in remaining] == [kept["id"]]
+    assert len(db_session.exec(select(OrderItem)).all()) == 1
+
+
+def test_bulk_update_orders_service_by_ids(db_session):
+    """Bulk update sets fields on the listed orders only."""
+    user = create_test_user(db_session, "Ivy")
+    item = create_test_item(db_session, "Lime", 0.50, "Lime")
+    first = create_test_order(db_session, user.id, (item, 1))
+    second = create_test_order(db_session, user.id, (item, 1))
+
+    result = bulk_update_orders_service(
+        OrderBulkUpdate(
+            selection=OrderSelection(ids=[first["id"]]), email="ivy@example.com"
+        ),
+        db_session,
+    )
+
+    assert result == {"matched": 1, "updated": 1}
+    assert db_session.get(Order, first["id"]).email == "ivy@example.com"
+    assert db_session.get(Order, second["id"]).email == "test@example.com"
+
+
+def test_bulk_orders_service_rejects_empty_selection(db_session):
+    """An empty selection must not match every order."""
+    with pytest.raises(HTTPException):
+        bulk_delete_orders_service(OrderSelection(), db_session)
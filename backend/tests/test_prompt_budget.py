@@ -0,0 +1,52 @@
+"""
+Unit tests for the assistant's prompt token budgeting.
+Tests the order in which history and retrieved context are trimmed.
+"""
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, HumanMessage
+
+from backend.ai.utils import estimate_tokens, fit_to_budget
+
+
+def message(n: int):
+    kind = HumanMessage if n % 2 == 0 else AIMessage
+    return kind(content=f"message {n} " + "x" * 36)
+
+
+def doc(n: int) -> Document:
+    return Document(page_content=f"doc {n} " + "y" * 36, metadata={"id": n})
+
+
+def test_fit_to_budget_trims_oldest_history_first():
+    """Older messages go before any context; the newest ones are kept in order."""
+    history = [message(n) for n in range(4)]
+    context = [doc(n) for n in range(2)]
+    per_entry = estimate_tokens(history[0].content)
+
+    kept, docs = fit_to_budget(history, context, budget=4 * per_entry)
+
+    assert kept == history[2:]
+    assert docs == context
+    assert [msg.content for msg in history] == [message(n).content for n in range(4)]
+
+
+def test_fit_to_budget_drops_context_before_latest_question():
+    """Once only the question is left, the lowest-ranked documents are dropped."""
+    history = [message(0), message(1), message(2)]
+    context = [doc(n) for n in range(3)]
+    per_entry = estimate_tokens(history[0].content)
+
+    kept, docs = fit_to_budget(history, context, budget=2 * per_entry)
+
+    assert kept == [history[-1]]
+    assert docs == context[:1]
+
+
+def test_fit_to_budget_without_room_keeps_only_the_question():
+    """A zero or negative budget still sends the latest message and no context."""
+    history = [message(0), message(1), message(2)]
+
+    for budget in (0, -50):
+        assert fit_to_budget(history, [doc(0)], budget) == ([history[-1]], [])
+    assert fit_to_budget([], [doc(0)], 0) == ([], [])
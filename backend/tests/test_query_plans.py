@@ -0,0 +1,217 @@
+"""
+Query-plan regression tests for service queries.
+Every statement a service issues against the seeded database must use an index
+on the large tables; dropping an index or rewriting a query into a full scan
+fails here. Whole-table listings (admin order/user lists, index loads) scan by
+design and are not covered. Set TEST_POSTGRES_URL to a scratch database to run
+the same cases against PostgreSQL, which also checks row estimates.
+"""
+
+import os
+from datetime import date, datetime
+
+import pytest
+from sqlmodel import Session
+
+from backend.models import OrderSelection, User, UserSelection
+from backend.services.archive_services import archive_orders_service
+from backend.services.checkout_services import build_line_items, complete_checkout_service
+from backend.services.item_services import get_items_service
+from backend.services.order_services import (
+    delete_order_service,
+    get_order_by_id_service,
+    get_user_orders_service,
+    select_order_ids,
+)
+from backend.services.search_index import catalog_index
+from backend.services.stats_services import (
+    collect_order_stats,
+    get_revenue_by_day_service,
+    get_top_customers_service,
+    get_top_items_service,
+)
+from backend.services.user_services import (
+    bulk_delete_users_service,
+    encode_user_cursor,
+    get_users_page_service,
+    select_user_ids,
+)
+from .query_plans import (
+    capture_statements,
+    explain_all,
+    order_id,
+    plan_violations,
+    postgres_engine,
+    seed,
+    sqlite_engine,
+    user_id,
+)
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+@pytest.fixture(scope="module", params=["sqlite", "postgresql"])
+def plan_engine(request):
+    """A seeded engine per dialect; PostgreSQL only when TEST_POSTGRES_URL is set."""
+    if request.param == "postgresql":
+        if not TEST_POSTGRES_URL:
+            pytest.skip("TEST_POSTGRES_URL not set")
+        engine = postgres_engine(TEST_POSTGRES_URL)
+    else:
+        engine = sqlite_engine()
+    seed(engine)
+    yield engine
+    engine.dispose()
+
+
+def warm_catalog_index(db):
+    catalog_index.ensure_loaded(db)
+
+
+CHECKOUT_SESSION = {
+    "id": "cs_plan",
+    "metadata": {"checkout_intent_id": "intent-00007"},
+    "currency": "usd",
+    "amount_total": 1000,
+    "customer_email": "user7@example.com",
+}
+
+
+def case(case_id, call, indexes=(), max_rows=None, setup=None, allow_scans=()):
+    """A service call, the indexes its plans must use and its row estimate bound.
+
+    allow_scans names tables the call may walk in index order, e.g. top-N
+    listings that stop after LIMIT rows.
+    """
+    return pytest.param(call, set(indexes), max_rows, setup, set(allow_scans), id=case_id)
+
+
+CASES = [
+    case(
+        "user_orders",
+        lambda db: get_user_orders_service(User(id=user_id(5)), db),
+        indexes={
+            "ix_order_user_id_date",
+            "ix_orderitem_order_id_item_id",
+            "ix_orderarchive_user_id_date",
+        },
+        max_rows=100,
+    ),
+    case(
+        "order_by_id",
+        lambda db: get_order_by_id_service(order_id(5, 1), db),
+        indexes={"ix_orderitem_order_id_item_id"},
+        max_rows=10,
+    ),
+    case(
+        "orders_by_user",
+        lambda db: select_order_ids(OrderSelection(user_id=user_id(6)), db),
+        indexes={"ix_order_user_id_date"},
+        max_rows=50,
+    ),
+    case(
+        "orders_by_email",
+        lambda db: select_order_ids(OrderSelection(email="user6@example.com"), db),
+        indexes={"ix_order_email"},
+        max_rows=50,
+    ),
+    case(
+        "orders_by_date",
+        lambda db: select_order_ids(
+            OrderSelection(after=datetime(2024, 3, 1), before=datetime(2024, 3, 2)), db
+        ),
+        indexes={"ix_order_date"},
+        max_rows=200,
+    ),
+    case(
+        "users_by_email",
+        lambda db: select_user_ids(UserSelection(email="user8@example.com"), db),
+        indexes={"ix_user_email_id"},
+        max_rows=5,
+    ),
+    case(
+        "users_page",
+        lambda db: get_users_page_service(
+            db,
+            cursor=encode_user_cursor(User(id=user_id(100), email="user100@example.com")),
+        ),
+        indexes={"ix_user_email_id", "ix_order_user_id_date", "ix_orderarchive_user_id_date"},
+        max_rows=200,
+    ),
+    case(
+        "users_by_prefix",
+        lambda db: get_users_page_service(db, email_prefix="user12"),
+        indexes={"ix_user_email_id"},
+        max_rows=200,
+    ),
+    case(
+        "order_stats",
+        lambda db: collect_order_stats([order_id(3, 0), order_id(4, 1)], db),
+        indexes={"ix_orderitem_order_id_item_id"},
+        max_rows=20,
+    ),
+    case(
+        "revenue_by_day",
+        lambda db: get_revenue_by_day_service(db, date(2024, 2, 1), date(2024, 2, 29)),
+        max_rows=100,
+    ),
+    case(
+        "top_items",
+        lambda db: get_top_items_service(db, 20),
+        indexes={"ix_itemsales_units"},
+        max_rows=20,
+        allow_scans={"itemsales"},
+    ),
+    case(
+        "top_customers",
+        lambda db: get_top_customers_service(db, 20),
+        indexes={"ix_customerspend_total"},
+        max_rows=20,
+        allow_scans={"customerspend"},
+    ),
+    case("line_items", lambda db: build_line_items({1: 1, 2: 2}, db), max_rows=5),
+    case(
+        "search_items",
+        lambda db: get_items_service("item 42", db),
+        max_rows=50,
+        setup=warm_catalog_index,
+    ),
+    case(
+        "complete_checkout",
+        lambda db: complete_checkout_service(CHECKOUT_SESSION, db),
+        max_rows=10,
+    ),
+    case(
+        "delete_order",
+        lambda db: delete_order_service(order_id(9, 0), db),
+        indexes={"ix_orderitem_order_id_item_id"},
+        max_rows=10,
+    ),
+    case(
+        "archive_orders",
+        lambda db: archive_orders_service(db, before=datetime(2024, 1, 2), chunk_size=20),
+        indexes={"ix_order_date", "ix_orderitem_order_id_item_id"},
+        max_rows=50,
+    ),
+    case(
+        "bulk_delete_users",
+        lambda db: bulk_delete_users_service(UserSelection(ids=[user_id(11)]), db),
+        indexes={"ix_order_user_id_date", "ix_checkoutintent_user_id"},
+        max_rows=50,
+    ),
+]
+
+
+@pytest.mark.parametrize("call, indexes, max_rows, setup, allow_scans", CASES)
+def test_service_query_plans(plan_engine, call, indexes, max_rows, setup, allow_scans):
+    """Service queries use indexes on large tables and stay within row estimates."""
+    with Session(plan_engine) as db:
+        if setup:
+            setup(db)
+        with capture_statements(plan_engine) as statements:
+            call(db)
+    assert statements
+    plans = explain_all(plan_engine, statements)
+    assert plan_violations(plans, allow_scans=allow_scans, max_rows=max_rows) == []
+    used = set().union(*(plan["indexes"] for plan in plans))
+    assert indexes <= used, f"expected {indexes - used} in {[p['plan'] for p in plans]}"
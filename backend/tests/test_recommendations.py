@@ -0,0 +1,86 @@
+"""
+Unit tests for the co-purchase recommendation index.
+Tests popularity and bought-together lookups and incremental order updates.
+"""
+
+import threading
+import time
+
+from backend.services.order_services import delete_order_service
+from backend.services.recommendations import copurchase_index
+from .helpers import create_test_user, create_test_item, create_test_order
+
+
+def wait_for_reload() -> None:
+    deadline = time.monotonic() + 5
+    while copurchase_index._reloading and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_copurchase_index_popular_and_bought_with(db_session):
+    """Items are ranked by order count and by co-occurrence with the given items."""
+    user = create_test_user(db_session)
+    mug, tea, pen, pad = (
+        create_test_item(db_session, name=name, price=1.0)
+        for name in ("Mug", "Tea", "Pen", "Pad")
+    )
+    create_test_order(db_session, user.id, (mug, 1), (tea, 2))
+    create_test_order(db_session, user.id, (mug, 1), (tea, 1), (pen, 1))
+    create_test_order(db_session, user.id, (pen, 1), (pad, 1))
+    create_test_order(db_session, user.id, (mug, 3))
+
+    copurchase_index.ensure_loaded(db_session)
+
+    assert copurchase_index.popular(2) == [mug.id, tea.id]
+    assert copurchase_index.bought_with([mug.id]) == [tea.id, pen.id]
+    assert copurchase_index.bought_with([mug.id, pen.id]) == [tea.id, pad.id]
+    assert copurchase_index.bought_with([999]) == []
+
+
+def test_copurchase_index_follows_new_and_deleted_orders(db_session):
+    """New orders are folded in without a rebuild; deletes trigger one in the background."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=1.0)
+    tea = create_test_item(db_session, name="Tea", price=1.0)
+    pen = create_test_item(db_session, name="Pen", price=1.0)
+    create_test_order(db_session, user.id, (mug, 1), (tea, 1))
+    copurchase_index.ensure_loaded(db_session)
+
+    order = create_test_order(db_session, user.id, (mug, 1), (pen, 1))
+    assert set(copurchase_index.bought_with([mug.id])) == {tea.id, pen.id}
+
+    delete_order_service(order["id"], db_session)
+    copurchase_index.ensure_loaded(db_session)
+    wait_for_reload()
+    assert copurchase_index.bought_with([mug.id]) == [tea.id]
+
+
+def test_copurchase_rebuild_keeps_serving_old_counts(db_session, monkeypatch):
+    """A stale index answers from its old contents while one background rebuild runs."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=1.0)
+    tea = create_test_item(db_session, name="Tea", price=1.0)
+    pen = create_test_item(db_session, name="Pen", price=1.0)
+    create_test_order(db_session, user.id, (mug, 1), (tea, 1))
+    copurchase_index.ensure_loaded(db_session)
+    copurchase_index.mark_stale()
+    create_test_order(db_session, user.id, (mug, 1), (pen, 1))
+
+    release = threading.Event()
+    loads = []
+    load = copurchase_index.load
+
+    def slow_load(db):
+        loads.append(db)
+        release.wait(5)
+        load(db)
+
+    monkeypatch.setattr(copurchase_index, "load", slow_load)
+    copurchase_index.ensure_loaded(db_session)
+    copurchase_index.ensure_loaded(db_session)
+    assert copurchase_index.bought_with([mug.id]) == [tea.id]
+
+    release.set()
+    wait_for_reload()
+    assert len(loads) == 1
+    assert set(copurchase_index.bought_with([mug.id])) == {tea.id, pen.id}
@@ -0,0 +1,125 @@
+"""
+Unit tests for the assistant's retrieval stage.
+Tests per-item re-ranking with the section bonus, reciprocal rank fusion and
+exact product-name lookups, using a counting fake embedder instead of the
+Google client.
+"""
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from backend.ai import vectorstore
+from backend.ai.retrieval import reciprocal_rank_fusion, rerank, retrieve_context
+from backend.services.search_index import catalog_index
+from .helpers import create_test_item
+
+
+def chunk_doc(item_id: int, section: str, text: str = "plain text") -> Document:
+    return Document(
+        page_content=text, metadata={"id": item_id, "name": f"Item {item_id}", "section": section}
+    )
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    query_calls: int = 0
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return super().embed_query(text)
+
+
+@pytest.fixture
+def fake_store(monkeypatch):
+    """An empty vector store backed by a counting fake embedder."""
+    embeddings = CountingEmbeddings(size=16)
+    monkeypatch.setattr(vectorstore.vector_store, "embedding", embeddings)
+    monkeypatch.setattr(vectorstore.vector_store, "store", {})
+    monkeypatch.setattr(vectorstore, "item_doc_ids", {})
+    return embeddings
+
+
+def index_chunks(embeddings, items) -> None:
+    vectorstore.vectorstore_commit(
+        {
+            item.id: [
+                {
+                    "vector": embeddings.embed_documents([text])[0],
+                    "text": text,
+                    "metadata": {"id": item.id, "name": item.name, "section": section},
+                }
+                for section, text in (("beginning", item.name), ("end", item.description))
+            ]
+            for item in items
+        }
+    )
+
+
+def test_rerank_keeps_best_chunk_per_item():
+    """Each item appears once, represented by its best-scoring chunk."""
+    scored = [
+        (chunk_doc(1, "beginning"), 0.50),
+        (chunk_doc(2, "beginning"), 0.49),
+        (chunk_doc(1, "end"), 0.30),
+        (chunk_doc(2, "end"), 0.45),
+    ]
+
+    ranked = rerank("unrelated", scored)
+
+    assert [(doc.metadata["id"], doc.metadata["section"]) for doc in ranked] == [
+        (1, "beginning"),
+        (2, "beginning"),
+    ]
+
+
+def test_rerank_section_bonus_reorders_close_items():
+    """Chunks from the requested section win close calls, within and across items."""
+    scored = [
+        (chunk_doc(1, "beginning"), 0.50),
+        (chunk_doc(1, "end"), 0.48),
+        (chunk_doc(2, "middle"), 0.47),
+    ]
+
+    ranked = rerank("unrelated", scored, section="end")
+    assert [(doc.metadata["id"], doc.metadata["section"]) for doc in ranked] == [
+        (1, "end"),
+        (2, "middle"),
+    ]
+
+    ranked = rerank("unrelated", scored, section="middle", k=1)
+    assert [(doc.metadata["id"], doc.metadata["section"]) for doc in ranked] == [
+        (2, "middle")
+    ]
+
+
+def test_reciprocal_rank_fusion_merges_disjoint_lists():
+    """Without overlap, equal ranks tie and keep the order the lists were given in."""
+    assert reciprocal_rank_fusion([1, 2], [3, 4]) == [1, 3, 2, 4]
+    assert reciprocal_rank_fusion([], [5]) == [5]
+
+
+def test_reciprocal_rank_fusion_rewards_ids_in_both_lists():
+    """An id ranked in both lists beats ids that only one list ranks first."""
+    fused = reciprocal_rank_fusion([1, 2, 3], [3, 2], k=60)
+
+    assert fused == [3, 2, 1]
+    assert reciprocal_rank_fusion([7, 8], [8, 7], k=1) == [7, 8]
+
+
+def test_exact_name_query_skips_embedding(db_session, fake_store):
+    """A query equal to a product name is answered from the index without embedding it."""
+    pen = create_test_item(db_session, "Blue Pen", 1.99, "Smooth ink pen")
+    mug = create_test_item(db_session, "Red Mug", 7.99, "Ceramic mug")
+    catalog_index.ensure_loaded(db_session)
+    index_chunks(fake_store, [pen, mug])
+
+    docs = retrieve_context("  blue PEN ", section="end")
+
+    assert fake_store.query_calls == 0
+    assert [(doc.metadata["id"], doc.page_content) for doc in docs] == [
+        (pen.id, "Smooth ink pen")
+    ]
+
+    docs = retrieve_context("ceramic")
+    assert fake_store.query_calls == 1
+    assert docs[0].metadata["id"] == mug.id
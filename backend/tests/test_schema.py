@@ -0,0 +1,41 @@
+"""
+Unit tests for schema migrations and the query index check.
+"""
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlmodel import SQLModel
+
+from backend.schema import missing_indexes, upgrade_database
+from .helpers import get_test_engine
+
+
+def test_migrations_match_models():
+    """Upgrading an empty database yields the models' schema with every query index."""
+    engine = get_test_engine()
+    with engine.connect() as connection:
+        upgrade_database(connection=connection)
+    with engine.connect() as connection:
+        diff = compare_metadata(MigrationContext.configure(connection), SQLModel.metadata)
+        assert diff == []
+        assert missing_indexes(connection) == []
+
+
+def test_missing_indexes_reported_until_migrated():
+    """A database at the baseline lacks later indexes until upgraded."""
+    engine = get_test_engine()
+    with engine.connect() as connection:
+        upgrade_database("0001", connection=connection)
+    missing = {(entry["table"], tuple(entry["columns"])) for entry in missing_indexes(engine)}
+    assert missing == {
+        ("order", ("user_id", "date")),
+        ("orderitem", ("order_id", "item_id")),
+        ("orderarchive", ("user_id", "date")),
+        ("user", ("email", "id")),
+        ("itemembedding", ("updated_at",)),
+        ("item", ("updated_at",)),
+    }
+
+    with engine.connect() as connection:
+        upgrade_database(connection=connection)
+    assert missing_indexes(engine) == []
@@ -0,0 +1,145 @@
+"""
+Unit tests for admin statistics rollups.
+Tests that order create/update/delete and bulk operations keep the rollups
+equal to a full recomputation, and the stats queries built on them.
+"""
+
+from datetime import datetime, timedelta, UTC
+
+from backend.models import (
+    OrderCreate,
+    OrderItemCreate,
+    OrderSelection,
+    OrderBulkUpdate,
+    UserSelection,
+)
+from backend.services.archive_services import archive_orders_service
+from backend.services.order_services import (
+    update_order_service,
+    delete_order_service,
+    bulk_delete_orders_service,
+    bulk_update_orders_service,
+)
+from backend.services.stats_services import (
+    get_revenue_by_day_service,
+    get_top_customers_service,
+    get_top_items_service,
+    rebuild_stats_service,
+)
+from backend.services.user_services import bulk_delete_users_service
+from .helpers import create_test_user, create_test_item, create_test_order
+
+
+def stats_snapshot(db_session):
+    today = datetime.now(UTC).date()
+    return (
+        get_revenue_by_day_service(db_session, start=today, end=today),
+        get_top_items_service(db_session),
+        get_top_customers_service(db_session),
+    )
+
+
+def assert_matches_rebuild(db_session):
+    incremental = stats_snapshot(db_session)
+    rebuild_stats_service(db_session)
+    assert stats_snapshot(db_session) == incremental
+
+
+def test_stats_follow_order_changes(db_session):
+    """Rollups track creates, updates and deletes and match a full rebuild."""
+    alice = create_test_user(db_session, email="alice@example.com", auth0_sub="a")
+    bob = create_test_user(db_session, email="bob@example.com", auth0_sub="b")
+    mug = create_test_item(db_session, name="Mug", price=10.0)
+    pen = create_test_item(db_session, name="Pen", price=2.0)
+
+    first = create_test_order(db_session, alice.id, (mug, 2), (pen, 1))
+    create_test_order(db_session, bob.id, (pen, 5))
+
+    revenue, items, customers = stats_snapshot(db_session)
+    assert [(r["revenue"], r["orders"]) for r in revenue] == [(3200, 2)]
+    assert [(i["name"], i["units"]) for i in items] == [("Pen", 6), ("Mug", 2)]
+    assert [(c["email"], c["total"]) for c in customers] == [
+        ("alice@example.com", 2200),
+        ("bob@example.com", 1000),
+    ]
+    assert_matches_rebuild(db_session)
+
+    update_order_service(
+        first["id"],
+        OrderCreate(
+            user_id=bob.id,
+            items=[OrderItemCreate(item_id=mug.id, quantity=1)],
+            stripe_id="test_stripe_id",
+            currency="usd",
+            amount=1000,
+            email="bob@example.com",
+        ),
+        db_session,
+    )
+    revenue, items, customers = stats_snapshot(db_session)
+    assert [(r["revenue"], r["orders"]) for r in revenue] == [(2000, 2)]
+    assert [(i["name"], i["units"]) for i in items] == [("Pen", 5), ("Mug", 1)]
+    assert [(c["email"], c["total"], c["orders"]) for c in customers] == [
+        ("bob@example.com", 2000, 2)
+    ]
+    assert_matches_rebuild(db_session)
+
+    delete_order_service(first["id"], db_session)
+    assert [i["units"] for i in stats_snapshot(db_session)[1]] == [5]
+    assert_matches_rebuild(db_session)
+
+
+def test_stats_follow_bulk_order_operations(db_session):
+    """Bulk currency changes and bulk deletes are reflected per chunk."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=10.0)
+    orders = [create_test_order(db_session, user.id, (mug, 1)) for _ in range(5)]
+
+    bulk_update_orders_service(
+        OrderBulkUpdate(
+            selection=OrderSelection(ids=[orders[0]["id"], orders[1]["id"]]),
+            currency="EUR",
+        ),
+        db_session,
+        chunk_size=1,
+    )
+    revenue = stats_snapshot(db_session)[0]
+    assert [(r["currency"], r["revenue"]) for r in revenue] == [
+        ("eur", 2000),
+        ("usd", 3000),
+    ]
+    assert_matches_rebuild(db_session)
+
+    bulk_delete_orders_service(OrderSelection(user_id=user.id), db_session, chunk_size=2)
+    assert stats_snapshot(db_session) == ([], [], [])
+    assert_matches_rebuild(db_session)
+
+
+def test_stats_follow_bulk_user_delete_with_archived_orders(db_session):
+    """Deleting users removes their live and archived orders from the rollups."""
+    keep = create_test_user(db_session, email="keep@example.com", auth0_sub="keep")
+    drop = create_test_user(db_session, email="drop@example.com", auth0_sub="drop")
+    mug = create_test_item(db_session, name="Mug", price=10.0)
+    create_test_order(db_session, keep.id, (mug, 1))
+    create_test_order(db_session, drop.id, (mug, 2))
+    archive_orders_service(db_session, before=datetime.now(UTC) + timedelta(days=1))
+    create_test_order(db_session, drop.id, (mug, 3))
+
+    bulk_delete_users_service(UserSelection(ids=[drop.id]), db_session)
+
+    revenue, items, customers = stats_snapshot(db_session)
+    assert [(r["revenue"], r["orders"]) for r in revenue] == [(1000, 1)]
+    assert [(i["name"], i["units"]) for i in items] == [("Mug", 1)]
+    assert [c["email"] for c in customers] == ["keep@example.com"]
+    assert_matches_rebuild(db_session)
+
+
+def test_item_sales_count_each_order_once(db_session):
+    """An order with repeated lines for one item adds its units but one order."""
+    user = create_test_user(db_session)
+    mug = create_test_item(db_session, name="Mug", price=10.0)
+    create_test_order(db_session, user.id, (mug, 1), (mug, 2))
+
+    items = stats_snapshot(db_session)[1]
+    assert [(i["units"], i["orders"]) for i in items] == [(3, 1)]
+    assert_matches_rebuild(db_session)
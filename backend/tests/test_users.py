@@ -10,9 +10,15 @@ from backend.services.user_services import (
     create_user_service,
     update_user_service,
     delete_user_service,
+    bulk_delete_users_service,
+    bulk_update_users_service,
+    get_users_page_service,
+    iter_users_ndjson_service,
 )
-from backend.models import User
-from .helpers import create_test_user
+import json
+from sqlmodel import select
+from backend.models import User, Order, UserSelection, UserBulkUpdate
+from .helpers import create_test_user, create_test_item, create_test_order
 
 
 def test_get_users_service(db_session):
@@ -107,3 +113,74 @@ def test_delete_nonexistent_user_service(db_session):
 
     with pytest.raises(Exception):  # Expected user not found
         delete_user_service(nonexistent_id, db_session)
+
+
+def test_bulk_delete_users_service_removes_orders(db_session):
+    """Bulk delete removes selected users together with their orders."""
+    doomed = create_test_user(
+        db_session, email="old@example.com", auth0_sub="auth0|old"
+    )
+    kept = create_test_user(
+        db_session, email="new@example.com", auth0_sub="auth0|new"
+    )
+    item = create_test_item(db_session, "Pen", 1.00)
+    create_test_order(db_session, doomed.id, (item, 1))
+
+    result = bulk_delete_users_service(
+        UserSelection(email="old@example.com"), db_session
+    )
+
+    assert result == {"matched": 1, "deleted": 1}
+    assert [user.id for user in get_users_service(db_session)] == [kept.id]
+    assert db_session.exec(select(Order)).all() == []
+
+
+def test_bulk_update_users_service(db_session):
+    """Bulk update sets fields on the listed users."""
+    user = create_test_user(db_session, email="a@example.com", auth0_sub="auth0|a")
+
+    result = bulk_update_users_service(
+        UserBulkUpdate(selection=UserSelection(ids=[user.id]), email="b@example.com"),
+        db_session,
+    )
+
+    assert result == {"matched": 1, "updated": 1}
+    assert get_user_service(user.id, db_session).email == "b@example.com"
+
+
+def test_get_users_page_service(db_session):
+    """Users are paged by email with a cursor, filtered by prefix, with order counts."""
+    item = create_test_item(db_session, name="Mug", price=5.0)
+    emails = ["ann@a.com", "bob@b.com", "bobby@b.com", "cat@c.com", "dan@d.com"]
+    users = {email: create_test_user(db_session, email=email, auth0_sub=email) for email in emails}
+    create_test_order(db_session, users["bob@b.com"].id, (item, 1))
+    create_test_order(db_session, users["bob@b.com"].id, (item, 2))
+
+    first = get_users_page_service(db_session, limit=2)
+    second = get_users_page_service(db_session, limit=2, cursor=first["next"])
+    last = get_users_page_service(db_session, limit=2, cursor=second["next"])
+    paged = [user["email"] for page in (first, second, last) for user in page["users"]]
+    assert paged == emails
+    assert last["next"] is None
+    assert first["users"][1]["orders"] == 2
+
+    matched = get_users_page_service(db_session, email_prefix="bob")
+    assert [user["email"] for user in matched["users"]] == ["bob@b.com", "bobby@b.com"]
+
+    with pytest.raises(Exception) as exc_info:
+        get_users_page_service(db_session, cursor="not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+
+def test_iter_users_ndjson_service(db_session):
+    """The export streams every user once, in batches, as NDJSON lines."""
+    for n in range(5):
+        create_test_user(db_session, email=f"user{n}@example.com", auth0_sub=f"auth0|{n}")
+
+    chunks = list(iter_users_ndjson_service(db_session, batch_size=2))
+    lines = b"".join(chunks).splitlines()
+
+    assert len(chunks) == 3
+    assert [json.loads(line)["email"] for line in lines] == [
+        f"user{n}@example.com" for n in range(5)
+    ]
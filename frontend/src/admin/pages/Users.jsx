@@ -1,18 +1,72 @@
-import { useMemo } from "react";
-import AdminViewTable from "../components/AdminViewTable";
+import { useCallback, useEffect, useMemo, useState } from "react";
+import ObjectViewTable from "../components/ObjectViewTable";
 import { AdminLinkNavigation } from "../components/AdminLinkNavigation";
+import { useAuthenticatedApi } from "../../hooks/useApi";
+import FormField from "../../components/FormField";
+import LoadingIcon from "../../components/LoadingIcon";
 import Main from "../../components/Main";
 
+const PAGE_SIZE = 50;
+
 export default function Users() {
+    const { callApi } = useAuthenticatedApi();
+    const [email, setEmail] = useState("");
+    const [users, setUsers] = useState([]);
+    const [next, setNext] = useState(null);
+    const [isLoading, setIsLoading] = useState(true);
+    const [error, setError] = useState(null);
+
     const columns = useMemo(() => [
         { key: 'id', label: 'ID' },
         { key: 'email', label: 'Email' },
-        { key: 'auth0_sub', label: 'Auth0 ID' }
+        { key: 'auth0_sub', label: 'Auth0 ID' },
+        { key: 'orders', label: 'Orders' }
     ], []);
+
+    const loadPage = useCallback(async (cursor) => {
+        setIsLoading(true);
+        setError(null);
+        const params = new URLSearchParams({ limit: PAGE_SIZE });
+        if (email) params.set("email", email);
+        if (cursor) params.set("cursor", cursor);
+        try {
+            const page = await callApi(`/admin/users/?${params}`, "GET");
+            setUsers(previous => cursor ? [...previous, ...page.users] : page.users);
+            setNext(page.next);
+        } catch (err) {
+            setError(err);
+        } finally {
+            setIsLoading(false);
+        }
+    }, [callApi, email]);
+
+    useEffect(() => {
+        const timer = setTimeout(() => loadPage(null), 250);
+        return () => clearTimeout(timer);
+    }, [loadPage]);
+
     return (
         <Main>
             <h1 className="font-display text-2xl md:text-3xl font-bold text-text-primary mb-6 tracking-tight">Users</h1>
-            <AdminViewTable endpoint="/admin/users/" columns={columns} dataKey="users" />
+            <FormField
+                id="user-email-search"
+                type="search"
+                placeholder="Search by email prefix"
+                value={email}
+                onChange={e => setEmail(e.target.value.trim())}
+                width="w-full sm:w-80"
+            />
+            {error && <div className="text-text-primary">Error: {error.message || "Unknown error"}</div>}
+            <ObjectViewTable data={users} columns={columns} />
+            {isLoading && <LoadingIcon />}
+            {next && !isLoading && (
+                <button
+                    className="mt-4 px-3 py-1 btn-transition text-text-white text-display font-semibold"
+                    onClick={() => loadPage(next)}
+                >
+                    Load more
+                </button>
+            )}
             <AdminLinkNavigation/>
         </Main>
     );
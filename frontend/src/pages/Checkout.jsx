@@ -87,7 +87,7 @@ export function CheckoutButton() {
         if (!isAuthenticated) return;
         setProcessing(true);
         const response = await callApi("/create-checkout-session/", "POST",
-            JSON.stringify(cart.map(item => ({ id: item.id, qty: item.quantity })))
+            cart.map(item => ({ id: item.id, qty: item.quantity }))
         );
         setProcessing(false);
         window.location.href = response.url;